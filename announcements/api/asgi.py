@@ -2,6 +2,8 @@
 ASGI config for api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests to the announcements event stream are answered here; everything else
+is handed to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
@@ -13,4 +15,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from announcements.realtime import router
+
+application = router(django_application)
@@ -23,6 +23,36 @@ DATABASES = {
 
 ALLOWED_HOSTS = ['*']
 
+# Feed versions, resolver entries, throttle counters and the signed token denylist live here. In production set
+# CACHE_LOCATION to a memcached server (needs pylibmc) so every worker shares them, otherwise each process keeps its
+# own, which is enough for development and tests.
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION')
+
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyLibMCCache',
+            'LOCATION': CACHE_LOCATION,
+        },
+        'signed_tokens': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyLibMCCache',
+            'LOCATION': CACHE_LOCATION,
+            'KEY_PREFIX': 'signed_tokens',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'signed_tokens': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'signed_tokens',
+        },
+    }
+
+SIGNED_TOKEN_CACHE = 'signed_tokens'
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -31,6 +61,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
 
     'allauth',
     'allauth.account',
@@ -47,14 +78,14 @@ INSTALLED_APPS = [
     'drf_yasg2',
 
     'classes',
-    'departments',
+    'departments.apps.DepartmentsConfig',
     'events',
     'organizations',
     'sections',
     'students',
     'subjects',
     'teachers',
-    'announcements',
+    'announcements.apps.AnnouncementsConfig',
     'users',
 
     'django_quiz',
@@ -73,7 +104,11 @@ ACCOUNT_USERNAME_REQUIRED = False
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework.authentication.TokenAuthentication'],
-    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly']
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'],
+    'DEFAULT_RENDERER_CLASSES': ['utils.renderers.FastJSONRenderer', 'rest_framework.renderers.BrowsableAPIRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['utils.renderers.FastJSONParser', 'rest_framework.parsers.FormParser', 'rest_framework.parsers.MultiPartParser'],
+    # Proxies in front of the app; with 0, clients are throttled by REMOTE_ADDR and X-Forwarded-For is ignored.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 SWAGGER_SETTINGS = {
@@ -159,6 +194,12 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Hand attachment downloads to the web server, e.g. 'X-Accel-Redirect' for nginx.
+ANNOUNCEMENT_FILES_SENDFILE_HEADER = os.environ.get('ANNOUNCEMENT_FILES_SENDFILE_HEADER') or None
+
 
 AUTH_USER_MODEL = 'users.User'
 
@@ -9,6 +9,9 @@ from rest_framework import permissions
 from drf_yasg2.views import get_schema_view
 from drf_yasg2 import openapi
 
+from api import views as api_views
+from departments import views as departments_views
+
 schema_view = get_schema_view(
     openapi.Info(
         title="MyDesk API docs.",
@@ -20,6 +23,9 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('auth/token/', api_views.IssueSignedToken.as_view()),
+    path('auth/token/refresh/', api_views.RefreshSignedToken.as_view()),
+    path('auth/token/revoke/', api_views.RevokeSignedToken.as_view()),
     path('auth/', include('dj_rest_auth.urls')),
     path('auth/registration/', include('dj_rest_auth.registration.urls')),
 
@@ -27,6 +33,7 @@ urlpatterns = [
     path('classes/', include('classes.urls')),
     path('sections/', include('sections.urls')),
     path('subjects/', include('subjects.urls')),
+    path('organizations/<str:org_id>/tree/', departments_views.OrganizationTree.as_view()),
     path('organizations/', include('organizations.urls')),
     path('teachers/', include('teachers.urls')),
     path('students/', include('students.urls')),
@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status, permissions, authentication, views, exceptions
+from rest_framework.response import Response
+
+# Swagger
+from drf_yasg2.utils import swagger_auto_schema
+from drf_yasg2 import openapi
+
+# Utils
+from utils import signed_tokens
+
+
+class IssueSignedToken(views.APIView):
+
+    authentication_classes = (authentication.TokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        return Response({'details': [signed_tokens.issue_tokens(request.user)]}, status.HTTP_200_OK)
+
+
+class RefreshSignedToken(views.APIView):
+
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            title="Refresh signed token",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'refresh': openapi.Schema(type=openapi.TYPE_STRING),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            422: openapi.Response("Unprocessable Entity- Make sure that all the required field values are passed"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        refresh = request.data.get('refresh', None)
+
+        if not refresh:
+            errors = [
+                'refresh is not passed'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            claims = signed_tokens.read_token(str(refresh), signed_tokens.REFRESH)
+        except exceptions.AuthenticationFailed as e:
+            errors = [
+                str(e.detail)
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        user = get_user_model().objects.filter(pk=claims['uid'], is_active=True).first()
+        if user is None:
+            errors = [
+                'Invalid token.'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        # Refresh tokens are single use, the pair is rotated and the roles read again.
+        signed_tokens.deny(claims)
+        return Response({'details': [signed_tokens.issue_tokens(user)]}, status.HTTP_200_OK)
+
+
+class RevokeSignedToken(views.APIView):
+
+    authentication_classes = (signed_tokens.SignedTokenAuthentication, authentication.TokenAuthentication)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            title="Revoke signed tokens",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'refresh': openapi.Schema(type=openapi.TYPE_STRING),
+                'all': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        data = request.data
+        refresh = data.get('refresh', None)
+
+        if str(data.get('all', False)).lower() == "true":
+            signed_tokens.revoke_user(request.user.pk)
+            msgs = [
+                'All tokens revoked'
+            ]
+            return Response({'details': msgs}, status.HTTP_200_OK)
+
+        if isinstance(request.auth, dict):
+            signed_tokens.deny(request.auth)
+
+        if refresh:
+            try:
+                claims = signed_tokens.read_token(str(refresh), signed_tokens.REFRESH)
+            except exceptions.AuthenticationFailed:
+                claims = None
+
+            if claims is not None and claims['uid'] == request.user.pk:
+                signed_tokens.deny(claims)
+
+        msgs = [
+            'Tokens revoked'
+        ]
+        return Response({'details': msgs}, status.HTTP_200_OK)
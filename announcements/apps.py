@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class AnnouncementsConfig(AppConfig):
     name = 'announcements'
+
+    def ready(self):
+        from . import signals
+        from utils import signed_tokens
+
+        checks.register(signed_tokens.check_denylist_cache, checks.Tags.security)
@@ -0,0 +1,142 @@
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Min, Q
+
+from . import models
+
+
+COMPRESSION_LEVEL = 9
+BATCH_SIZE = 500
+
+# Columns copied next to the compressed payload so archived rows can be filtered like live ones.
+ARCHIVE_FIELDS = (
+    'id', 'user_id', 'organization_id', 'date', 'sender_department_id', 'sender_class_id',
+    'sender_teacher_id', 'is_public', 'status', 'is_active', 'created_at',
+)
+
+
+def compress(data):
+    return zlib.compress(json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode(), COMPRESSION_LEVEL)
+
+
+def decompress(payload):
+    return json.loads(zlib.decompress(bytes(payload)).decode())
+
+
+# Payload keys holding the rows that referenced an archived announcement, left out of API responses.
+DEPENDENT_KEYS = ('file_rows', 'inbox', 'acknowledgements')
+
+
+def decompress_announcement(payload):
+    data = decompress(payload)
+    for key in DEPENDENT_KEYS:
+        data.pop(key, None)
+    return data
+
+
+def _group(qs, fields):
+    rows = {}
+    for row in qs.order_by('id').values('announcement_id', *fields):
+        rows.setdefault(row.pop('announcement_id'), []).append(row)
+    return rows
+
+
+def archive_announcements(announcements):
+    """
+    Copies `announcements` into AnnouncementArchive and deletes them from the
+    hot table.
+
+    The payload also keeps the rows that go with them, the file rows, inbox
+    rows and acknowledgements, which the delete cascades to. The stored files
+    themselves are kept, their names travel in the payload. An announcement
+    archived before, say by a run that was interrupted, has its archive row
+    overwritten with the current copy rather than being dropped.
+    """
+    from . import serializers
+
+    announcements = list(announcements)
+    if not announcements:
+        return 0
+
+    ids = [announcement.id for announcement in announcements]
+    file_rows = _group(
+        models.AnnouncementFile.objects.filter(announcement_id__in=ids),
+        ('file', 'content_hash', 'size', 'created_at', 'is_active'),
+    )
+    inbox = _group(
+        models.AnnouncementInbox.objects.filter(announcement_id__in=ids),
+        ('user_id', 'created_at', 'is_active'),
+    )
+    acknowledgements = _group(
+        models.AnnouncementAcknowledgement.objects.filter(announcement_id__in=ids),
+        ('user_id', 'created_at'),
+    )
+
+    archives = []
+    for announcement, data in zip(announcements, serializers.AnnouncementSerializer(announcements, many=True).data):
+        data["files"] = [row["file"] for row in file_rows.get(announcement.id, [])]
+        data["file_rows"] = file_rows.get(announcement.id, [])
+        data["inbox"] = inbox.get(announcement.id, [])
+        data["acknowledgements"] = acknowledgements.get(announcement.id, [])
+        archives.append(models.AnnouncementArchive(
+            payload=compress(data),
+            **{field: getattr(announcement, field) for field in ARCHIVE_FIELDS}
+        ))
+
+    with transaction.atomic():
+        existing = set(models.AnnouncementArchive.objects.select_for_update().filter(id__in=ids).values_list('id', flat=True))
+
+        models.AnnouncementArchive.objects.bulk_create(
+            [row for row in archives if row.id not in existing], batch_size=BATCH_SIZE,
+        )
+        models.AnnouncementArchive.objects.bulk_update(
+            [row for row in archives if row.id in existing],
+            [field for field in ARCHIVE_FIELDS if field != 'id'] + ['payload'],
+            batch_size=BATCH_SIZE,
+        )
+        models.Announcement.objects.filter(id__in=[row.id for row in archives]).delete()
+
+    return len(archives)
+
+
+def months(start, end):
+    """
+    Yields (month_start, next_month_start) for every calendar month from the
+    one holding `start` up to `end`.
+    """
+    month = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month < end:
+        following = month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+        yield month, following
+        month = following
+
+
+def archive(before, inactive_before=None, batch_size=BATCH_SIZE):
+    """
+    Moves announcements created before `before`, and soft-deleted ones created
+    before `inactive_before`, into the archive one created_at month at a time
+    so every pass is a bounded range scan. Returns the number of rows moved.
+    """
+    condition = Q(created_at__lt=before)
+    end = before
+    if inactive_before is not None:
+        condition |= Q(is_active=False, created_at__lt=inactive_before)
+        end = max(before, inactive_before)
+
+    oldest = models.Announcement.objects.filter(condition).aggregate(oldest=Min('created_at'))['oldest']
+    if oldest is None:
+        return 0
+
+    moved = 0
+    for month_start, month_end in months(oldest, end):
+        qs = models.Announcement.objects.filter(condition, created_at__gte=month_start, created_at__lt=month_end)
+        while True:
+            batch = list(qs.select_related('organization').order_by('created_at', 'id')[:batch_size])
+            if not batch:
+                break
+            moved += archive_announcements(batch)
+
+    return moved
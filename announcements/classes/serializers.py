@@ -1,17 +1,27 @@
 from rest_framework import serializers
 from . import models
 from departments import serializers as departments_serializers
+from utils.fieldsets import SparseFieldsetMixin
+from utils.prefetching import PlannedListSerializer
+
+class ClassSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    computed_fields = {
+        "department_name": ("department",),
+        "department_id": ("department",),
+    }
 
-class ClassSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Class
         fields = "__all__"
+        list_serializer_class = PlannedListSerializer
 
     def to_representation(self, instance):
         response = super().to_representation(instance)
 
-        response["department_name"] = instance.department.name
-        response["department_id"] = instance.department.department_id if instance.department.department_id else ""
+        if "department_name" in self.selected_computed_fields:
+            response["department_name"] = instance.department.name
+        if "department_id" in self.selected_computed_fields:
+            response["department_id"] = instance.department.department_id if instance.department.department_id else ""
 
         return response
 
@@ -1,3 +1,84 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import models, serializers
+from departments import models as departments_models
+from organizations import models as organizations_models
+from utils import prefetching, signed_tokens
+from utils.streaming import iter_json_list
+
+
+class ClassTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(email='owner@example.com', password='password')
+        cls.outsider = User.objects.create_user(email='outsider@example.com', password='password')
+        cls.organization = organizations_models.Organization.objects.create(user=cls.owner, name='Example school')
+        department = departments_models.Department.objects.create(name='Science', organization=cls.organization)
+        for i in range(3):
+            models.Class.objects.create(title=f'Class {i}', department=department)
+
+
+class StreamLazyLoadTests(ClassTestCase):
+
+    def stream(self, qs):
+        with mock.patch.object(prefetching, 'LAZY_LOAD_WARNINGS', True), \
+                mock.patch.object(prefetching.logger, 'warning') as warning:
+            ''.join(iter_json_list(qs.order_by('id'), serializers.ClassSerializer(), chunk_size=2))
+        return warning
+
+    def test_fetching_rows_is_not_reported(self):
+        self.stream(models.Class.objects.select_related('department')).assert_not_called()
+
+    def test_lazy_relations_are_reported(self):
+        warning = self.stream(models.Class.objects.all())
+        warning.assert_called_once()
+        self.assertEqual(warning.call_args[0][2], 3)
+
+
+class SignedTokenTests(ClassTestCase):
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {signed_tokens.issue_tokens(user)['access']}")
+        return client
+
+    def test_org_admin_lists_classes(self):
+        response = self.client_for(self.owner).get(f'/classes/?org_id={self.organization.org_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 3)
+
+    def test_token_without_the_role_is_forbidden(self):
+        response = self.client_for(self.outsider).get(f'/classes/?org_id={self.organization.org_id}')
+        self.assertEqual(response.status_code, 403)
+
+    def test_revoked_token_is_refused(self):
+        client = self.client_for(self.owner)
+        signed_tokens.revoke_user(self.owner.id)
+        response = client.get(f'/classes/?org_id={self.organization.org_id}')
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_user_loads_once(self):
+        user = signed_tokens.token_user(self.owner.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.pk, self.owner.id)
+            self.assertTrue(user.is_authenticated)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, self.owner.email)
+            self.assertEqual(user.is_active, self.owner.is_active)
+
+
+class DenylistCacheCheckTests(SimpleTestCase):
+
+    @override_settings(CACHES={signed_tokens.CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual([message.id for message in signed_tokens.check_denylist_cache(None)], ['signed_tokens.W001'])
+
+    @override_settings(CACHES={signed_tokens.CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.memcached.PyLibMCCache', 'LOCATION': '127.0.0.1:11211'}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(signed_tokens.check_denylist_cache(None), [])
@@ -12,12 +12,17 @@ from . import models, serializers
 
 # Utils
 import json
+from utils.fieldsets import sparse_queryset
+from utils.prefetching import plan_queryset
+from utils.streaming import is_streaming, stream_list
+from utils.signed_tokens import SignedTokenAuthentication, HasOrganizationRole, signed_roles
 from utils.decorators import validate_org, validate_dept, is_organization, is_department
 
 class ClassViewSet(views.APIView):
 
-    authentication_classes = (authentication.TokenAuthentication,)
-    permission_classes = (permissions.IsAuthenticated,)
+    authentication_classes = (SignedTokenAuthentication, authentication.TokenAuthentication)
+    permission_classes = (permissions.IsAuthenticated, HasOrganizationRole)
+    required_roles = {'GET': ('org_admin',), 'DELETE': ('org_admin',)}
 
     @swagger_auto_schema(
         responses={
@@ -28,9 +33,12 @@ class ClassViewSet(views.APIView):
         manual_parameters=[
             openapi.Parameter(name="org_id", in_="query", type=openapi.TYPE_STRING),
             openapi.Parameter(name="dept_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="fields", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="exclude", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="stream", in_="query", type=openapi.TYPE_BOOLEAN),
         ]
     )
-    @is_organization
+    @signed_roles(is_organization)
     def get(self, request, **kwargs):
         query_params = self.request.query_params
         org_id = kwargs.get('organization', None)
@@ -41,7 +49,13 @@ class ClassViewSet(views.APIView):
         if dept_id:
             qs = qs.filter(department__department_id=dept_id, department__organization__id=org_id.id)
 
-        serializer = serializers.ClassSerializer(qs, many=True)
+        qs = sparse_queryset(qs, serializers.ClassSerializer, query_params)
+        qs = plan_queryset(qs, serializers.ClassSerializer, {'request': request})
+
+        if is_streaming(request):
+            return stream_list(qs.order_by('id'), serializers.ClassSerializer, {'request': request})
+
+        serializer = serializers.ClassSerializer(qs, many=True, context={'request': request})
         return Response(serializer.data, status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -117,7 +131,7 @@ class ClassViewSet(views.APIView):
             500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
         }
     )
-    @is_organization
+    @signed_roles(is_organization)
     def delete(self, request, *args, **kwargs):
         data = request.data
         id = data.get('id', None)
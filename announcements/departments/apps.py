@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class DepartmentsConfig(AppConfig):
     name = 'departments'
+
+    def ready(self):
+        from . import signals
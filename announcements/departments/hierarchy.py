@@ -0,0 +1,207 @@
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+
+from . import models
+from classes import models as classes_models
+from sections import models as section_models
+
+
+KIND_PREFIX = {
+    models.DEPARTMENT: 'd',
+    models.CLASS: 'c',
+    models.SECTION: 's',
+}
+SEGMENT_LENGTH = 12
+
+
+def segment(kind, object_id):
+    """
+    One fixed-width path segment, e.g. `c0000000042/`. Paths are the
+    segments of a node's ancestors followed by its own, so ordering by path
+    lists a tree depth first and a subtree is a prefix range of the index.
+    """
+    return f'{KIND_PREFIX[kind]}{object_id:010d}/'
+
+
+def department_path(department_id):
+    return segment(models.DEPARTMENT, department_id)
+
+
+def class_path(department_id, class_id):
+    return department_path(department_id) + segment(models.CLASS, class_id)
+
+
+def section_path(department_id, class_id, section_id):
+    return class_path(department_id, class_id) + segment(models.SECTION, section_id)
+
+
+def parent_path(path):
+    return path[:-SEGMENT_LENGTH]
+
+
+def department_node(department, model=models.StructureNode):
+    return model(
+        organization_id=department.organization_id,
+        kind=models.DEPARTMENT,
+        object_id=department.id,
+        path=department_path(department.id),
+        depth=1,
+        name=department.name,
+        code=department.department_id,
+        is_active=department.is_active,
+    )
+
+
+def class_node(of_class, organization_id, model=models.StructureNode):
+    return model(
+        organization_id=organization_id,
+        kind=models.CLASS,
+        object_id=of_class.id,
+        path=class_path(of_class.department_id, of_class.id),
+        depth=2,
+        name=of_class.title,
+        is_active=of_class.is_active,
+    )
+
+
+def section_node(section, department_id, organization_id, model=models.StructureNode):
+    return model(
+        organization_id=organization_id,
+        kind=models.SECTION,
+        object_id=section.id,
+        path=section_path(department_id, section.of_class_id, section.id),
+        depth=3,
+        name=section.title,
+        is_active=section.is_active,
+    )
+
+
+def add_nodes(nodes):
+    models.StructureNode.objects.bulk_create(nodes, batch_size=1000, ignore_conflicts=True)
+
+
+def remove(kind, object_id):
+    """
+    Deletes the node of an object together with every node below it.
+    """
+    node = models.StructureNode.objects.filter(kind=kind, object_id=object_id).values_list('path', flat=True).first()
+    if node is not None:
+        models.StructureNode.objects.filter(path__startswith=node).delete()
+
+
+def save_node(node):
+    """
+    Inserts or updates `node`. When its path or organization changed, the
+    whole subtree below it is moved with one UPDATE.
+    """
+    existing = models.StructureNode.objects.filter(kind=node.kind, object_id=node.object_id).first()
+
+    if existing is None:
+        add_nodes([node])
+        return
+
+    models.StructureNode.objects.filter(id=existing.id).update(
+        organization_id=node.organization_id,
+        path=node.path,
+        depth=node.depth,
+        name=node.name,
+        code=node.code,
+        is_active=node.is_active,
+    )
+
+    if existing.path != node.path or existing.organization_id != node.organization_id:
+        models.StructureNode.objects.filter(path__startswith=existing.path).exclude(id=existing.id).update(
+            organization_id=node.organization_id,
+            path=Concat(Value(node.path), Substr('path', len(existing.path) + 1)),
+            depth=F('depth') - existing.depth + node.depth,
+        )
+
+
+def sync_department(department):
+    save_node(department_node(department))
+
+
+def sync_class(of_class):
+    if of_class.department_id is None:
+        remove(models.CLASS, of_class.id)
+        return
+
+    organization_id = models.Department.objects.filter(id=of_class.department_id).values_list('organization_id', flat=True).first()
+    save_node(class_node(of_class, organization_id))
+
+
+def sync_section(section):
+    of_class = classes_models.Class.objects.filter(id=section.of_class_id).select_related('department').first()
+    if of_class is None or of_class.department is None:
+        remove(models.SECTION, section.id)
+        return
+
+    save_node(section_node(section, of_class.department_id, of_class.department.organization_id))
+
+
+def rebuild(organization=None, apps=None):
+    """
+    Recreates the nodes of `organization`, or of every organization, from
+    the department, class and section tables. Migrations pass their `apps`
+    so the historical models are used.
+    """
+    if apps is None:
+        Department, Class, Section, StructureNode = models.Department, classes_models.Class, section_models.Section, models.StructureNode
+    else:
+        Department = apps.get_model('departments', 'Department')
+        Class = apps.get_model('classes', 'Class')
+        Section = apps.get_model('sections', 'Section')
+        StructureNode = apps.get_model('departments', 'StructureNode')
+
+    departments = Department._default_manager.all()
+    if organization is not None:
+        departments = departments.filter(organization=organization)
+
+    departments = {department.id: department for department in departments}
+    classes = {
+        of_class.id: of_class
+        for of_class in Class._default_manager.filter(department__in=list(departments))
+    }
+    sections = Section._default_manager.filter(of_class__in=list(classes))
+
+    nodes = [department_node(department, StructureNode) for department in departments.values()]
+    nodes += [class_node(of_class, departments[of_class.department_id].organization_id, StructureNode) for of_class in classes.values()]
+    nodes += [
+        section_node(section, classes[section.of_class_id].department_id, departments[classes[section.of_class_id].department_id].organization_id, StructureNode)
+        for section in sections
+    ]
+
+    stale = StructureNode._default_manager.all()
+    if organization is not None:
+        stale = stale.filter(organization=organization)
+    stale.delete()
+
+    StructureNode._default_manager.bulk_create(nodes, batch_size=1000, ignore_conflicts=True)
+    return len(nodes)
+
+
+def build_tree(nodes, base_path=''):
+    """
+    Nests `nodes`, ordered by path, under the node at `base_path`. Nodes
+    whose parent is not in `nodes` (an inactive class, say) are left out
+    along with their own children.
+    """
+    roots = []
+    items = {base_path: {"children": roots}}
+
+    for node in nodes:
+        parent = items.get(parent_path(node.path))
+        if parent is None:
+            continue
+
+        item = {
+            "id": node.object_id,
+            "kind": node.kind,
+            "name": node.name,
+            "code": node.code,
+            "children": [],
+        }
+        parent["children"].append(item)
+        items[node.path] = item
+
+    return roots
@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from departments import provisioning
+from organizations import models as organizations_models
+
+
+class Command(BaseCommand):
+    help = "Create departments, classes and sections for an organization from a JSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org_id', type=str, required=True)
+        parser.add_argument('path', type=str, help="A .json tree or a .csv file with the columns department,class,section.")
+
+    def handle(self, *args, **options):
+        organization = organizations_models.Organization.objects.filter(org_id=options['org_id']).first()
+        if organization is None:
+            raise CommandError(f"Invalid org_id {options['org_id']}")
+
+        with open(options['path'], newline='') as structure:
+            if options['path'].endswith('.csv'):
+                data = provisioning.read_csv(structure)
+            else:
+                data = json.load(structure)
+
+        tree, errors = provisioning.parse_tree(data)
+        if errors:
+            raise CommandError('\n'.join(errors))
+
+        created = provisioning.provision(organization, tree)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created['departments']} departments, {created['classes']} classes and {created['sections']} sections"
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from departments import hierarchy
+from organizations import models as organizations_models
+
+
+class Command(BaseCommand):
+    help = "Rebuild the department -> class -> section tree index from the structure tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org_id', type=str, default=None)
+
+    def handle(self, *args, **options):
+        organization = None
+
+        if options['org_id']:
+            organization = organizations_models.Organization.objects.filter(org_id=options['org_id']).first()
+            if organization is None:
+                raise CommandError(f"Invalid org_id {options['org_id']}")
+
+        count = hierarchy.rebuild(organization)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} structure nodes'))
@@ -0,0 +1,56 @@
+# Generated by Django 3.1.2 on 2026-10-18 17:10
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+import django.db.models.deletion
+
+
+def copy_requesting_users(apps, schema_editor):
+    Department = apps.get_model('departments', 'Department')
+    DepartmentJoinRequest = apps.get_model('departments', 'DepartmentJoinRequest')
+
+    # DepartmentViewSet.post added the creator, always the organization's user, and the department's own
+    # user is not asking to join it either, so neither becomes a pending request.
+    requests = Department.requesting_users.through.objects.exclude(
+        user_id=F('department__user_id'),
+    ).exclude(
+        user_id=F('department__organization__user_id'),
+    ).values_list('department_id', 'user_id')
+    DepartmentJoinRequest.objects.bulk_create(
+        [DepartmentJoinRequest(department_id=department_id, user_id=user_id) for department_id, user_id in requests.iterator()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('departments', '0003_auto_20201113_1011'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentJoinRequest',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('denied', 'Denied')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('decided_at', models.DateTimeField(blank=True, null=True)),
+                ('decided_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='department_join_request_decisions', to=settings.AUTH_USER_MODEL)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='join_requests', to='departments.department')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='department_join_requests', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='departmentjoinrequest',
+            index=models.Index(fields=['department', 'status', 'created_at', 'id'], name='department_join_queue_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='departmentjoinrequest',
+            constraint=models.UniqueConstraint(fields=('department', 'user'), name='department_join_request_unique'),
+        ),
+        migrations.RunPython(copy_requesting_users, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.1.2 on 2026-10-18 17:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('departments', '0004_departmentjoinrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StructureNode',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('department', 'Department'), ('class', 'Class'), ('section', 'Section')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('path', models.CharField(max_length=64)),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('name', models.CharField(max_length=100)),
+                ('code', models.CharField(blank=True, max_length=100, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='structure_nodes', to='organizations.organization')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='structurenode',
+            index=models.Index(fields=['organization', 'path'], name='structure_node_org_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='structurenode',
+            index=models.Index(fields=['path'], name='structure_node_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddConstraint(
+            model_name='structurenode',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='structure_node_object_unique'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.1.2 on 2026-10-18 21:30
+
+from django.db import migrations
+
+from departments import hierarchy
+
+
+def build_structure_nodes(apps, schema_editor):
+    hierarchy.rebuild(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0002_class_department'),
+        ('sections', '__latest__'),
+        ('departments', '0005_structurenode'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_structure_nodes, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,37 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 import uuid
 
+PENDING = 'pending'
+APPROVED = 'approved'
+DENIED = 'denied'
+
+JOIN_REQUEST_STATUS_OPTIONS = (
+    (PENDING, 'Pending'),
+    (APPROVED, 'Approved'),
+    (DENIED, 'Denied'),
+)
+
+DEPARTMENT = 'department'
+CLASS = 'class'
+SECTION = 'section'
+
+STRUCTURE_NODE_KIND_OPTIONS = (
+    (DEPARTMENT, 'Department'),
+    (CLASS, 'Class'),
+    (SECTION, 'Section'),
+)
+
+class DepartmentQuerySet(models.QuerySet):
+
+    def with_requesting_users_count(self):
+        # A correlated subquery keeps the department rows out of a GROUP BY.
+        requests = DepartmentJoinRequest.objects.filter(
+            department_id=OuterRef('pk'), status=PENDING
+        ).order_by().values('department_id').annotate(count=Count('*')).values('count')
+        return self.annotate(requesting_users_count=Coalesce(Subquery(requests), 0))
+
 class Department(models.Model):
     requesting_users = models.ManyToManyField('users.User', blank=True, related_name='department_requesting_user')
     user = models.ForeignKey('users.User', blank=True, null=True, on_delete=models.CASCADE, related_name='department_user')
@@ -13,13 +44,56 @@ class Department(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
 
+    objects = DepartmentQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_department_id = instance.__dict__.get('department_id')
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.department_id:
             temp_dept_id = str(uuid.uuid4())
             while Department.objects.filter(department_id=temp_dept_id):
                 temp_dept_id = str(uuid.uuid4())
             self.department_id = temp_dept_id
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class DepartmentJoinRequest(models.Model):
+    department = models.ForeignKey('Department', on_delete=models.CASCADE, related_name='join_requests')
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='department_join_requests')
+    status = models.CharField(max_length=10, choices=JOIN_REQUEST_STATUS_OPTIONS, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    decided_at = models.DateTimeField(blank=True, null=True)
+    decided_by = models.ForeignKey('users.User', blank=True, null=True, on_delete=models.SET_NULL, related_name='department_join_request_decisions')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['department', 'user'], name='department_join_request_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['department', 'status', 'created_at', 'id'], name='department_join_queue_idx'),
+        ]
+
+class StructureNode(models.Model):
+    organization = models.ForeignKey('organizations.Organization', on_delete=models.CASCADE, related_name='structure_nodes')
+    kind = models.CharField(max_length=10, choices=STRUCTURE_NODE_KIND_OPTIONS)
+    object_id = models.PositiveIntegerField()
+    path = models.CharField(max_length=64)
+    depth = models.PositiveSmallIntegerField()
+    name = models.CharField(max_length=100)
+    code = models.CharField(max_length=100, blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='structure_node_object_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['organization', 'path'], name='structure_node_org_path_idx'),
+            models.Index(fields=['path'], name='structure_node_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
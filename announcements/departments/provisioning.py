@@ -0,0 +1,210 @@
+import csv
+import uuid
+
+from django.db import transaction
+
+from . import models, hierarchy
+from classes import models as classes_models
+from sections import models as section_models
+
+
+BATCH_SIZE = 1000
+MAX_NAME_LENGTH = 100
+DEPARTMENT_FIELDS = ('contact_name', 'contact_phone', 'contact_email')
+
+
+def _name(value):
+    return str(value).strip() if value is not None else ""
+
+
+def parse_tree(data):
+    """
+    Validates a structure tree in memory and returns (tree, errors).
+
+        {"departments": [
+            {"name": "Science", "contact_email": "...", "classes": [
+                {"title": "10", "sections": [{"title": "A"}, {"title": "B"}]}
+            ]}
+        ]}
+
+    Classes and sections may also be given as plain strings. Repeated names
+    are merged, so a tree can be re-sent to add the missing rows only.
+    """
+    errors = []
+    tree = {}
+
+    departments = data.get("departments", None) if isinstance(data, dict) else None
+    if not isinstance(departments, list) or not departments:
+        return None, ['departments should be a non empty list']
+
+    for d_index, department in enumerate(departments):
+        if not isinstance(department, dict):
+            errors.append(f'departments[{d_index}] should be an object')
+            continue
+
+        name = _name(department.get("name", None))
+        if not name or len(name) > MAX_NAME_LENGTH:
+            errors.append(f'departments[{d_index}].name is required and at most {MAX_NAME_LENGTH} characters')
+            continue
+
+        entry = tree.setdefault(name, {"fields": {}, "classes": {}})
+        entry["fields"].update({field: department[field] for field in DEPARTMENT_FIELDS if department.get(field, None)})
+
+        classes = department.get("classes", [])
+        if not isinstance(classes, list):
+            errors.append(f'departments[{d_index}].classes should be a list')
+            continue
+
+        for c_index, of_class in enumerate(classes):
+            sections = []
+            if isinstance(of_class, dict):
+                sections = of_class.get("sections", [])
+                of_class = of_class.get("title", None)
+            title = _name(of_class)
+
+            if not title or len(title) > MAX_NAME_LENGTH or not isinstance(sections, list):
+                errors.append(f'departments[{d_index}].classes[{c_index}] needs a title of at most {MAX_NAME_LENGTH} characters and a list of sections')
+                continue
+
+            class_sections = entry["classes"].setdefault(title, set())
+
+            for s_index, section in enumerate(sections):
+                if isinstance(section, dict):
+                    section = section.get("title", None)
+                section = _name(section)
+
+                if not section or len(section) > MAX_NAME_LENGTH:
+                    errors.append(f'departments[{d_index}].classes[{c_index}].sections[{s_index}] needs a title of at most {MAX_NAME_LENGTH} characters')
+                    continue
+
+                class_sections.add(section)
+
+    return (None, errors) if errors else (tree, [])
+
+
+def read_csv(lines):
+    """
+    Builds the input of parse_tree from CSV rows with the columns
+    department,class,section. class and section may be left empty.
+    """
+    departments = {}
+
+    for row in csv.DictReader(lines):
+        name = _name(row.get("department", None))
+        if not name:
+            continue
+        classes = departments.setdefault(name, {})
+
+        title = _name(row.get("class", None))
+        if title:
+            sections = classes.setdefault(title, [])
+            section = _name(row.get("section", None))
+            if section:
+                sections.append(section)
+
+    return {
+        "departments": [
+            {"name": name, "classes": [{"title": title, "sections": sections} for title, sections in classes.items()]}
+            for name, classes in departments.items()
+        ]
+    }
+
+
+def provision(organization, tree):
+    """
+    Creates the rows of a tree returned by parse_tree that do not exist yet
+    for `organization`, in one transaction.
+
+    Each level costs one query to find the existing rows, a batched
+    bulk_create for the new ones and, on databases that do not return
+    primary keys from bulk inserts, one query to read them back. Returns the
+    number of rows created per level.
+    """
+    with transaction.atomic():
+        departments = {}
+        for department in models.Department.objects.filter(
+            organization=organization, is_active=True, name__in=list(tree)
+        ).order_by('id'):
+            departments.setdefault(department.name, department)
+
+        # department_id is a uuid4, so the collision check loop of Department.save is not needed here.
+        new_departments = [
+            models.Department(
+                organization=organization,
+                name=name,
+                department_id=str(uuid.uuid4()),
+                **tree[name]["fields"]
+            )
+            for name in tree if name not in departments
+        ]
+        models.Department.objects.bulk_create(new_departments, batch_size=BATCH_SIZE)
+
+        if new_departments and new_departments[0].pk is None:
+            new_departments = models.Department.objects.filter(
+                department_id__in=[department.department_id for department in new_departments]
+            )
+        departments.update({department.name: department for department in new_departments})
+        hierarchy.add_nodes([hierarchy.department_node(department) for department in new_departments])
+
+        class_keys = {
+            (departments[name].id, title)
+            for name, entry in tree.items() for title in entry["classes"]
+        }
+        classes = {}
+        for of_class in classes_models.Class.objects.filter(
+            department__in=[department.id for department in departments.values()], is_active=True
+        ).order_by('id'):
+            classes.setdefault((of_class.department_id, of_class.title), of_class)
+
+        new_classes = [
+            classes_models.Class(department_id=department_id, title=title)
+            for department_id, title in class_keys if (department_id, title) not in classes
+        ]
+        classes_models.Class.objects.bulk_create(new_classes, batch_size=BATCH_SIZE)
+
+        if new_classes and new_classes[0].pk is None:
+            created = {(of_class.department_id, of_class.title) for of_class in new_classes}
+            new_classes = [
+                of_class for of_class in classes_models.Class.objects.filter(
+                    department__in=[department_id for department_id, _ in created], is_active=True
+                ).exclude(id__in=[of_class.id for of_class in classes.values()])
+                if (of_class.department_id, of_class.title) in created
+            ]
+        classes.update({(of_class.department_id, of_class.title): of_class for of_class in new_classes})
+        hierarchy.add_nodes([hierarchy.class_node(of_class, organization.id) for of_class in new_classes])
+
+        section_keys = {
+            (classes[(departments[name].id, title)].id, section)
+            for name, entry in tree.items()
+            for title, sections in entry["classes"].items()
+            for section in sections
+        }
+        existing_sections = set(section_models.Section.objects.filter(
+            of_class__in={of_class_id for of_class_id, _ in section_keys}, is_active=True
+        ).values_list('of_class_id', 'title'))
+
+        new_sections = [
+            section_models.Section(of_class_id=of_class_id, title=title)
+            for of_class_id, title in section_keys if (of_class_id, title) not in existing_sections
+        ]
+        section_models.Section.objects.bulk_create(new_sections, batch_size=BATCH_SIZE)
+
+        if new_sections and new_sections[0].pk is None:
+            created = {(section.of_class_id, section.title) for section in new_sections}
+            new_sections = [
+                section for section in section_models.Section.objects.filter(
+                    of_class__in={of_class_id for of_class_id, _ in created}, is_active=True
+                )
+                if (section.of_class_id, section.title) in created
+            ]
+        department_ids = {of_class.id: of_class.department_id for of_class in classes.values()}
+        hierarchy.add_nodes([
+            hierarchy.section_node(section, department_ids[section.of_class_id], organization.id)
+            for section in new_sections
+        ])
+
+    return {
+        "departments": len(new_departments),
+        "classes": len(new_classes),
+        "sections": len(new_sections),
+    }
@@ -1,15 +1,38 @@
 from rest_framework import serializers
 from . import models
 from users import serializers as users_serializers
+from utils.fieldsets import SparseFieldsetMixin
+from utils.prefetching import PlannedListSerializer
+
+class DepartmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    requesting_users_count = serializers.SerializerMethodField()
 
-class DepartmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Department
         fields = "__all__"
+        list_serializer_class = PlannedListSerializer
+        extra_kwargs = {
+            "requesting_users": {"write_only": True},
+        }
+
+    def get_requesting_users_count(self, instance):
+        count = getattr(instance, "requesting_users_count", None)
+        if count is None:
+            count = instance.join_requests.filter(status=models.PENDING).count()
+        return count
+
+
+class DepartmentJoinRequestSerializer(serializers.ModelSerializer):
+    related_fields = ("user",)
+
+    class Meta:
+        model = models.DepartmentJoinRequest
+        fields = "__all__"
+        list_serializer_class = PlannedListSerializer
 
     def to_representation(self, instance):
         response = super().to_representation(instance)
 
-        response["requesting_users"] = users_serializers.UserSerializer(instance.requesting_users, many=True).data
+        response["user"] = users_serializers.UserSerializer(instance.user).data
 
         return response
@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import models, verification, hierarchy
+from utils import resolvers
+
+
+@receiver(post_save, sender=models.Department)
+def department_saved(sender, instance, **kwargs):
+    dept_ids = (instance.department_id, getattr(instance, '_loaded_department_id', None))
+    instance._loaded_department_id = instance.department_id
+    transaction.on_commit(lambda: verification.invalidate(*dept_ids))
+    resolvers.invalidate_departments(*dept_ids)
+
+    hierarchy.sync_department(instance)
+
+
+@receiver(post_delete, sender=models.Department)
+def department_deleted(sender, instance, **kwargs):
+    dept_id = instance.department_id
+    transaction.on_commit(lambda: verification.invalidate(dept_id))
+    resolvers.invalidate_departments(dept_id)
+
+    hierarchy.remove(models.DEPARTMENT, instance.id)
+
+
+@receiver(post_save, sender='organizations.Organization')
+@receiver(post_delete, sender='organizations.Organization')
+def organization_changed(sender, instance, **kwargs):
+    resolvers.invalidate_organizations(instance.org_id)
+
+
+@receiver(post_save, sender='classes.Class')
+def class_saved(sender, instance, **kwargs):
+    hierarchy.sync_class(instance)
+
+
+@receiver(post_delete, sender='classes.Class')
+def class_deleted(sender, instance, **kwargs):
+    hierarchy.remove(models.CLASS, instance.id)
+
+
+@receiver(post_save, sender='sections.Section')
+def section_saved(sender, instance, **kwargs):
+    hierarchy.sync_section(instance)
+
+
+@receiver(post_delete, sender='sections.Section')
+def section_deleted(sender, instance, **kwargs):
+    hierarchy.remove(models.SECTION, instance.id)
@@ -1,3 +1,404 @@
-from django.test import TestCase
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import models, provisioning, verification
+from utils.throttling import FixedWindowThrottle
+from classes import models as classes_models
+from organizations import models as organizations_models
+from sections import models as section_models
+from students import models as student_models
+
+
+class DepartmentTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(email='owner@example.com', password='password')
+        cls.head = User.objects.create_user(email='head@example.com', password='password')
+        cls.outsider = User.objects.create_user(email='outsider@example.com', password='password')
+
+        cls.organization = organizations_models.Organization.objects.create(user=cls.owner, name='Example school')
+        cls.department = models.Department.objects.create(
+            user=cls.head, name='Science', organization=cls.organization,
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+
+class JoinRequestsUsersTests(DepartmentTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.requesters = [
+            User.objects.create_user(email=f'teacher{i}@example.com', password='password') for i in range(3)
+        ]
+        self.join_requests = [
+            models.DepartmentJoinRequest.objects.create(department=self.department, user=user)
+            for user in self.requesters
+        ]
+
+    def review(self, ids, action):
+        return self.client_for(self.owner).post('/departments/requests/users/', {
+            'org_id': self.organization.org_id,
+            'dept_id': self.department.department_id,
+            'ids': ids,
+            'action': action,
+        }, format='json')
+
+    def test_results_follow_the_posted_ids(self):
+        first, second, _ = self.join_requests
+        response = self.review([second.id, first.id, 0], 'deny')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['id'] for result in response.data['details']], [second.id, first.id, 0])
+        self.assertEqual(
+            [result['errors'] for result in response.data['details']],
+            [None, None, ['no pending join request with this id']],
+        )
+        self.assertEqual(
+            models.DepartmentJoinRequest.objects.filter(status=models.DENIED).count(), 2,
+        )
+
+    def test_decided_requests_are_not_reviewed_again(self):
+        join_request = self.join_requests[0]
+        self.review([join_request.id], 'deny')
+        response = self.review([join_request.id], 'approve')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['details'][0]['errors'], ['no pending join request with this id'])
+        join_request.refresh_from_db()
+        self.assertEqual(join_request.status, models.DENIED)
+
+    def test_approval_makes_the_requester_the_department_user(self):
+        models.Department.objects.filter(id=self.department.id).update(user=None)
+        first, second, _ = self.join_requests
+        response = self.review([first.id, second.id], 'approve')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result['errors'] for result in response.data['details']],
+            [None, ['department already has a user']],
+        )
+        self.department.refresh_from_db()
+        self.assertEqual(self.department.user, self.requesters[0])
+        second.refresh_from_db()
+        self.assertEqual(second.status, models.PENDING)
+
+    def test_department_with_a_user_approves_nothing(self):
+        response = self.review([self.join_requests[0].id], 'approve')
+
+        self.assertEqual(response.data['details'][0]['errors'], ['department already has a user'])
+        self.department.refresh_from_db()
+        self.assertEqual(self.department.user, self.head)
+
+
+class JoinRequestsStudentTests(DepartmentTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        of_class = classes_models.Class.objects.create(title='10', department=self.department)
+        self.section = section_models.Section.objects.create(title='A', of_class=of_class)
+
+        other_department = models.Department.objects.create(name='Commerce', organization=self.organization)
+        other_class = classes_models.Class.objects.create(title='11', department=other_department)
+        other_section = section_models.Section.objects.create(title='B', of_class=other_class)
+
+        self.students = [
+            student_models.Student.objects.create(
+                user=User.objects.create_user(email=f'student{i}@example.com', password='password'),
+                requested_section=self.section,
+            )
+            for i in range(2)
+        ]
+        self.other_student = student_models.Student.objects.create(
+            user=User.objects.create_user(email='student@commerce.example.com', password='password'),
+            requested_section=other_section,
+        )
+
+    def review(self, students, action):
+        return self.client_for(self.head).post('/departments/requests/student/', {
+            'org_id': self.organization.org_id,
+            'dept_id': self.department.department_id,
+            'students': students,
+            'action': action,
+        }, format='json')
+
+    def test_results_report_each_id(self):
+        first, second = self.students
+        response = self.review([second.id, 0, self.other_student.id, first.id], 'accept')
+
+        self.assertEqual(response.status_code, 200)
+        error = ['no pending request for this student in this department']
+        self.assertEqual(response.data['details'], [
+            {'id': second.id, 'errors': None},
+            {'id': 0, 'errors': error},
+            {'id': self.other_student.id, 'errors': error},
+            {'id': first.id, 'errors': None},
+        ])
+        self.other_student.refresh_from_db()
+        self.assertIsNotNone(self.other_student.requested_section)
+        self.assertIsNone(self.other_student.section)
+
+    def test_accept_moves_students_to_the_requested_section(self):
+        self.review([student.id for student in self.students], 'accept')
+
+        for student in self.students:
+            student.refresh_from_db()
+            self.assertEqual(student.section, self.section)
+            self.assertIsNone(student.requested_section)
+
+    def test_reject_clears_the_request(self):
+        student = self.students[0]
+        response = self.review([student.id], 'reject')
+
+        self.assertEqual(response.data['details'], [{'id': student.id, 'errors': None}])
+        student.refresh_from_db()
+        self.assertIsNone(student.requested_section)
+        self.assertIsNone(student.section)
+
+        response = self.review([student.id], 'accept')
+        self.assertEqual(response.data['details'][0]['errors'], ['no pending request for this student in this department'])
+
+    def test_invalid_input(self):
+        self.assertEqual(self.review('not a list', 'accept').status_code, 400)
+        self.assertEqual(self.review([self.students[0].id], 'approve').data['details'], ['invalid action options are accept,reject'])
+
+        # Only the department's user reviews its requests.
+        response = self.client_for(self.outsider).post('/departments/requests/student/', {
+            'org_id': self.organization.org_id,
+            'dept_id': self.department.department_id,
+            'students': [self.students[0].id],
+        }, format='json')
+        self.assertNotEqual(response.status_code, 200)
+        self.students[0].refresh_from_db()
+        self.assertEqual(self.students[0].requested_section, self.section)
+
+
+class DepartmentViewSetTests(DepartmentTestCase):
+
+    def test_create_does_not_add_the_creator_as_a_requester(self):
+        response = self.client_for(self.owner).post('/departments/', {
+            'org_id': self.organization.org_id,
+            'name': 'Commerce',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        department = models.Department.objects.get(id=response.data['id'])
+        self.assertFalse(department.requesting_users.exists())
+        self.assertFalse(department.join_requests.exists())
+
+
+class VerifyDeptIdTests(DepartmentTestCase):
+
+    def setUp(self):
+        verification.invalidate(self.department.department_id)
+
+    def test_cached_payload_has_no_request_count(self):
+        data = verification.get_department_data(self.department.department_id)
+        self.assertEqual(data['name'], 'Science')
+        self.assertNotIn('requesting_users_count', data)
+        self.assertNotIn('requesting_users_count', cache.get(verification.verify_key(self.department.department_id)))
+
+    def test_unknown_dept_id(self):
+        self.assertIsNone(verification.get_department_data('no-such-department'))
+
+
+class SmallWindowThrottle(FixedWindowThrottle):
+    scope = 'tests'
+    limit = 2
+    window = 2
+
+
+class FixedWindowThrottleTests(SimpleTestCase):
+
+    def request(self, remote_addr='10.0.0.1', forwarded_for=None):
+        extra = {'REMOTE_ADDR': remote_addr}
+        if forwarded_for:
+            extra['HTTP_X_FORWARDED_FOR'] = forwarded_for
+        return Request(APIRequestFactory().get('/departments/verify-dept_id/', **extra))
+
+    def allowed(self, request, now):
+        with mock.patch('utils.throttling.time.time', return_value=now):
+            return SmallWindowThrottle().allow_request(request, None)
+
+    def test_burst_then_refused_until_the_next_window(self):
+        request = self.request(remote_addr='10.0.0.2')
+        self.assertEqual([self.allowed(request, 1000.0) for _ in range(3)], [True, True, False])
+        self.assertTrue(self.allowed(request, 1002.0))
+
+    def test_forwarded_for_header_does_not_reset_the_limit(self):
+        results = [self.allowed(self.request(remote_addr='10.0.0.3', forwarded_for=f'192.0.2.{i}'), 2000.0) for i in range(3)]
+        self.assertEqual(results, [True, True, False])
+
+
+class OrganizationTreeTests(DepartmentTestCase):
+
+    def tree(self, user):
+        return self.client_for(user).get(f'/organizations/{self.organization.org_id}/tree/')
+
+    def test_members_can_read_the_tree(self):
+        self.assertEqual(self.tree(self.owner).status_code, 200)
+        self.assertEqual(self.tree(self.head).status_code, 200)
+
+    def test_other_users_are_forbidden(self):
+        self.assertEqual(self.tree(self.outsider).status_code, 403)
+
+
+TREE = {
+    'departments': [
+        {'name': 'Science', 'contact_email': 'science@example.com', 'classes': [
+            {'title': '10', 'sections': ['A', {'title': 'B'}]},
+        ]},
+        {'name': 'Commerce', 'classes': ['11']},
+        {'name': 'Science', 'classes': [{'title': '10', 'sections': ['A', 'C']}]},
+    ],
+}
+
+
+class ParseTreeTests(SimpleTestCase):
+
+    def test_repeated_names_are_merged(self):
+        tree, errors = provisioning.parse_tree(TREE)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(tree['Science'], {
+            'fields': {'contact_email': 'science@example.com'},
+            'classes': {'10': {'A', 'B', 'C'}},
+        })
+        self.assertEqual(tree['Commerce']['classes'], {'11': set()})
+
+    def test_errors_name_the_invalid_entries(self):
+        tree, errors = provisioning.parse_tree({'departments': [
+            {'name': ''},
+            {'name': 'Science', 'classes': [{'title': '10', 'sections': 'A'}]},
+            {'name': 'Arts', 'classes': [{'title': '9', 'sections': ['', 'B']}]},
+            'Commerce',
+        ]})
+
+        self.assertIsNone(tree)
+        self.assertEqual(errors, [
+            f'departments[0].name is required and at most {provisioning.MAX_NAME_LENGTH} characters',
+            f'departments[1].classes[0] needs a title of at most {provisioning.MAX_NAME_LENGTH} characters and a list of sections',
+            f'departments[2].classes[0].sections[0] needs a title of at most {provisioning.MAX_NAME_LENGTH} characters',
+            'departments[3] should be an object',
+        ])
+        self.assertEqual(provisioning.parse_tree({'departments': []}), (None, ['departments should be a non empty list']))
+
+    def test_read_csv(self):
+        data = provisioning.read_csv(['department,class,section', 'Science,10,A', 'Science,10,B', 'Commerce,,'])
+
+        self.assertEqual(data, {'departments': [
+            {'name': 'Science', 'classes': [{'title': '10', 'sections': ['A', 'B']}]},
+            {'name': 'Commerce', 'classes': []},
+        ]})
+
+
+class ProvisionStructureTests(DepartmentTestCase):
+
+    def post(self, data):
+        return self.client_for(self.owner).post('/departments/provision/', {
+            'org_id': self.organization.org_id, **data,
+        }, format='json')
+
+    def structure(self):
+        """
+        (department, class, section) names of every active row of the organization, and the same read from its
+        structure nodes.
+        """
+        rows = {(department.name, None, None) for department in models.Department.objects.filter(organization=self.organization)}
+        rows |= {
+            (of_class.department.name, of_class.title, None)
+            for of_class in classes_models.Class.objects.filter(department__organization=self.organization)
+        }
+        rows |= {
+            (section.of_class.department.name, section.of_class.title, section.title)
+            for section in section_models.Section.objects.filter(of_class__department__organization=self.organization)
+        }
+
+        names = {node.path: node.name for node in models.StructureNode.objects.filter(organization=self.organization)}
+        nodes = set()
+        for path, name in names.items():
+            ancestors = [names[path[:end]] for end in range(12, len(path), 12)]
+            nodes.add(tuple(ancestors + [name] + [None] * (2 - len(ancestors))))
+        return rows, nodes
+
+    def test_fresh_tree(self):
+        response = self.post(TREE)
+
+        self.assertEqual(response.status_code, 200)
+        # Science already exists, so only its class and sections are added.
+        self.assertEqual(response.data['details'], [{'departments': 1, 'classes': 2, 'sections': 3}])
+
+        rows, nodes = self.structure()
+        self.assertEqual(rows, {
+            ('Science', None, None), ('Commerce', None, None),
+            ('Science', '10', None), ('Commerce', '11', None),
+            ('Science', '10', 'A'), ('Science', '10', 'B'), ('Science', '10', 'C'),
+        })
+        self.assertEqual(nodes, rows)
+
+    def test_resend_only_adds_missing_rows(self):
+        self.post(TREE)
+        response = self.post({'departments': [
+            {'name': 'Science', 'classes': [{'title': '10', 'sections': ['A', 'D']}]},
+            {'name': 'Commerce', 'classes': ['11']},
+        ]})
+
+        self.assertEqual(response.data['details'], [{'departments': 0, 'classes': 0, 'sections': 1}])
+        self.assertEqual(self.post(TREE).data['details'], [{'departments': 0, 'classes': 0, 'sections': 0}])
+
+        rows, nodes = self.structure()
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(nodes, rows)
+
+    def test_rows_are_read_back_without_returned_pks(self):
+        with mock.patch.object(connection.features, 'can_return_rows_from_bulk_insert', False):
+            created = provisioning.provision(self.organization, provisioning.parse_tree(TREE)[0])
+
+        self.assertEqual(created, {'departments': 1, 'classes': 2, 'sections': 3})
+        rows, nodes = self.structure()
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(nodes, rows)
+
+    def test_invalid_tree_creates_nothing(self):
+        response = self.post({'departments': [{'name': 'Arts'}, {'name': ''}]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['details']), 1)
+        self.assertFalse(models.Department.objects.filter(name='Arts').exists())
+
+
+class BuildStructureNodesMigrationTests(DepartmentTestCase):
+
+    def test_nodes_are_built_for_existing_rows(self):
+        of_class = classes_models.Class.objects.create(title='10', department=self.department)
+        section = section_models.Section.objects.create(title='A', of_class=of_class)
+        models.StructureNode.objects.all().delete()
+
+        import_module('departments.migrations.0006_build_structure_nodes').build_structure_nodes(apps, None)
+
+        self.assertEqual(
+            set(models.StructureNode.objects.values_list('kind', 'object_id', 'organization_id')),
+            {
+                (models.DEPARTMENT, self.department.id, self.organization.id),
+                (models.CLASS, of_class.id, self.organization.id),
+                (models.SECTION, section.id, self.organization.id),
+            },
+        )
+        response = self.client_for(self.owner).get(f'/organizations/{self.organization.org_id}/tree/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['details']), 1)
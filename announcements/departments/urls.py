@@ -7,5 +7,7 @@ urlpatterns=[
     path("assigned-classes/", views.AssignedClass.as_view()),
     path("join/", views.JoinDepartment.as_view()),
     path("requests/student/", views.JoinRequestsStudent.as_view()),
+    path("requests/users/", views.JoinRequestsUsers.as_view()),
+    path("provision/", views.ProvisionStructure.as_view()),
     path("", views.DepartmentViewSet.as_view()),
 ]
\ No newline at end of file
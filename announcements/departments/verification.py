@@ -0,0 +1,44 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import models, serializers
+
+
+VERIFY_TIMEOUT = getattr(settings, 'DEPARTMENTS_VERIFY_CACHE_TIMEOUT', 300)
+VERIFY_MISS_TIMEOUT = getattr(settings, 'DEPARTMENTS_VERIFY_MISS_CACHE_TIMEOUT', 60)
+
+# Cached for ids that match no active department so repeated misses never reach the database.
+MISSING = 0
+
+
+def verify_key(dept_id):
+    return 'departments:verify:' + hashlib.sha1(str(dept_id).encode()).hexdigest()
+
+
+def get_department_data(dept_id):
+    """
+    Returns the serialized active department with this dept_id, or None.
+    Hits and misses are both cached, until invalidate() or their timeout.
+    """
+    key = verify_key(dept_id)
+    data = cache.get(key)
+
+    if data is None:
+        department = models.Department.objects.filter(department_id=str(dept_id), is_active=True).first()
+        if department is None:
+            cache.set(key, MISSING, VERIFY_MISS_TIMEOUT)
+            return None
+
+        # The pending request count changes with every join request and nothing here would invalidate it.
+        serializer = serializers.DepartmentSerializer(department)
+        serializer.fields.pop('requesting_users_count')
+        data = serializer.data
+        cache.set(key, data, VERIFY_TIMEOUT)
+
+    return data or None
+
+
+def invalidate(*dept_ids):
+    cache.delete_many([verify_key(dept_id) for dept_id in dept_ids if dept_id])
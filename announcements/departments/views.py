@@ -1,14 +1,16 @@
 from django.shortcuts import render
 from rest_framework import status, permissions, authentication, views, viewsets
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, F
+from django.utils import timezone
 
 # Swagger
 from drf_yasg2.utils import swagger_auto_schema
 from drf_yasg2 import openapi
 
 # Custom
-from . import models, serializers
+from . import models, serializers, provisioning, verification, hierarchy
 from students import models as student_models
 from students import serializers as student_serializers
 from classes import models as classes_models
@@ -18,7 +20,15 @@ from organizations import serializers as organizations_serializers
 
 
 # Utils
+from announcements.pagination import KeysetPaginator, InvalidCursor
 from utils.utilities import pop_from_data
+from utils.fieldsets import sparse_queryset
+from utils.prefetching import plan_queryset
+from utils.resolvers import get_resolver
+from utils.streaming import is_streaming, stream_list
+from utils.values import values_data
+from utils.signed_tokens import SignedTokenAuthentication, HasOrganizationRole, get_request_roles, signed_roles
+from utils.throttling import FixedWindowThrottle
 import json
 from utils.decorators import (
     validate_dept,
@@ -28,29 +38,50 @@ from utils.decorators import (
     is_organization
 )
 
+class VerifyDeptIdThrottle(FixedWindowThrottle):
+    scope = 'verify_dept_id'
+    limit = 30
+    window = 15
+
 class VerifyDeptId(views.APIView):
 
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (VerifyDeptIdThrottle,)
 
     @swagger_auto_schema(
         responses={
             200: openapi.Response("OK- Successful GET Request"),
             401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            429: openapi.Response("Too Many Requests- Request was throttled."),
             500: openapi.Response("Internal Server Error- Error while processing the GET Request Function.")
         },
         manual_parameters=[
             openapi.Parameter(name="dept_id", in_="query", type=openapi.TYPE_STRING),
         ]
     )
-    @validate_dept
     def get(self, request, *args, **kwargs):
-        serializer = serializers.DepartmentSerializer(kwargs.get("department"))
-        return Response(serializer.data, status.HTTP_200_OK)
+        dept_id = self.request.query_params.get('dept_id', "")
+
+        if not dept_id:
+            errors = [
+                'dept_id is not passed'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        data = verification.get_department_data(dept_id)
+        if data is None:
+            errors = [
+                'Invalid dept_id'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        return Response(data, status.HTTP_200_OK)
 
 class DepartmentViewSet(views.APIView):
 
-    authentication_classes = (authentication.TokenAuthentication,)
-    permission_classes = (permissions.IsAuthenticated,)
+    authentication_classes = (SignedTokenAuthentication, authentication.TokenAuthentication)
+    permission_classes = (permissions.IsAuthenticated, HasOrganizationRole)
+    required_roles = {'DELETE': ('org_admin',)}
     serializer_class = serializers.DepartmentSerializer
 
     @swagger_auto_schema(
@@ -63,6 +94,9 @@ class DepartmentViewSet(views.APIView):
             openapi.Parameter(name="id", in_="query", type=openapi.TYPE_INTEGER),
             openapi.Parameter(name="dept_id", in_="query", type=openapi.TYPE_STRING),
             openapi.Parameter(name="org_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="fields", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="exclude", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="stream", in_="query", type=openapi.TYPE_BOOLEAN),
         ]
     )
     def get(self, request):
@@ -82,8 +116,12 @@ class DepartmentViewSet(views.APIView):
         if org_id:
             qs = qs.filter(organization__org_id=org_id)
 
-        serializer = serializers.DepartmentSerializer(qs, many=True)
-        return Response(serializer.data, status.HTTP_200_OK)
+        qs = sparse_queryset(qs, serializers.DepartmentSerializer, query_params).with_requesting_users_count()
+
+        if is_streaming(request):
+            return stream_list(qs.order_by('id'), serializers.DepartmentSerializer, {'request': request})
+
+        return Response(values_data(qs, serializers.DepartmentSerializer, {'request': request}), status.HTTP_200_OK)
 
 
     @swagger_auto_schema(
@@ -104,7 +142,7 @@ class DepartmentViewSet(views.APIView):
     )
     @validate_org
     def post(self, request, **kwargs):
-        data = json.loads(json.dumps(request.data))
+        data = request.data
         name = data.get("name", None)
 
         if not name:
@@ -115,7 +153,6 @@ class DepartmentViewSet(views.APIView):
         data_dict = {
             "organization" : organization.id,
             "name": str(name),
-            "requesting_users": [request.user.id],
         }
 
         serializer = self.serializer_class(data=data_dict)
@@ -186,7 +223,7 @@ class DepartmentViewSet(views.APIView):
             500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
         }
     )
-    @is_organization
+    @signed_roles(is_organization)
     def delete(self, request, *args, **kwargs):
         data = request.data
         dept_id = data.get('dept_id', None)
@@ -246,21 +283,32 @@ class JoinDepartment(views.APIView):
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
         department = kwargs.get("department")
+        resolver = get_resolver(request)
 
-        if  not department.organization == organization:
+        if not resolver.is_department_of(department, organization):
             errors = [
                 'Invalid dept_id'
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-        if request.user in department.requesting_users.all() or request.user == department.user:
+        if resolver.is_department_user(request.user, department):
             errors = [
                 'Request already sent'
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
-        
-        department.requesting_users.add(request.user.id)
-        department.save()
+
+        join_request, created = models.DepartmentJoinRequest.objects.get_or_create(department=department, user=request.user)
+
+        if not created:
+            # A denied request may be sent again, which puts it back at the end of the queue.
+            reopened = models.DepartmentJoinRequest.objects.filter(id=join_request.id, status=models.DENIED).update(
+                status=models.PENDING, created_at=timezone.now(), decided_at=None, decided_by=None
+            )
+            if not reopened:
+                errors = [
+                    'Request already sent'
+                ]
+                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
         msgs = [
             'Join request sent'
@@ -280,6 +328,9 @@ class AssignedClass(views.APIView):
         },
         manual_parameters=[
             openapi.Parameter(name="dept_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="fields", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="exclude", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="stream", in_="query", type=openapi.TYPE_BOOLEAN),
         ]
     )
     def get(self, request):
@@ -291,19 +342,22 @@ class AssignedClass(views.APIView):
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-        departments = models.Department.objects.filter(department_id=str(dept_id), is_active=True)
-                
-        if not len(departments):
+        department = get_resolver(request).department(dept_id)
+
+        if department is None:
             errors = [
                 'Invalid dept_id'
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-        department = departments[0]
-
         qs = classes_models.Class.objects.filter(department=department, is_active=True)
+        qs = sparse_queryset(qs, classes_serializers.ClassSerializer, self.request.query_params)
+        qs = plan_queryset(qs, classes_serializers.ClassSerializer, {'request': request})
 
-        serializer = classes_serializers.ClassSerializer(qs, many=True)
+        if is_streaming(request):
+            return stream_list(qs.order_by('id'), classes_serializers.ClassSerializer, {'request': request})
+
+        serializer = classes_serializers.ClassSerializer(qs, many=True, context={'request': request})
         return Response(serializer.data, status.HTTP_200_OK)
 
 
@@ -322,6 +376,7 @@ class JoinRequestsStudent(views.APIView):
         manual_parameters=[
             openapi.Parameter(name="dept_id", in_="query", type=openapi.TYPE_STRING),
             openapi.Parameter(name="sec_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="stream", in_="query", type=openapi.TYPE_BOOLEAN),
         ]
     )
     def get(self, request):
@@ -341,23 +396,29 @@ class JoinRequestsStudent(views.APIView):
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-        departments = models.Department.objects.filter(Q(user__id=request.user.id) & Q(department_id=dept_id))
+        resolver = get_resolver(request)
+        department = resolver.department(dept_id)
 
-        if not len(departments):
+        if not resolver.is_department_user(request.user, department):
             errors = [
                 'Invalid dept_id'
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
         students = student_models.Student.objects.filter(
-            Q(requested_section__id = sec_id) & Q(is_active=True)& Q(requested_section__of_class__department__department_id=dept_id)
+            Q(requested_section__id = sec_id) & Q(is_active=True)& Q(requested_section__of_class__department=department)
         )
-        if not len(students):
+        if not students.exists():
             errors = [
                 f'no request pending for this section_id: {sec_id}'
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
+        students = plan_queryset(students, student_serializers.StudentSerializer)
+
+        if is_streaming(request):
+            return stream_list(students.order_by('id'), student_serializers.StudentSerializer)
+
         serializer = student_serializers.StudentSerializer(students, many=True)
 
         return Response(serializer.data, status.HTTP_200_OK)
@@ -371,6 +432,7 @@ class JoinRequestsStudent(views.APIView):
                 'dept_id': openapi.Schema(type=openapi.TYPE_STRING),
                 'org_id': openapi.Schema(type=openapi.TYPE_STRING),
                 'students': openapi.Schema(type=openapi.TYPE_STRING),
+                'action': openapi.Schema(type=openapi.TYPE_STRING, enum=["accept", "reject"]),
             }
         ),
         responses={
@@ -385,8 +447,8 @@ class JoinRequestsStudent(views.APIView):
     def post(self, request, *args, **kwargs):
         data = request.data
         dept_id = data.get('dept_id',"")
-        org_id = kwargs.get("org_id")
-        students = str(data.get("students", "[]"))
+        students = data.get("students", None)
+        action = data.get("action", "accept")
 
         if not dept_id:
             errors = [
@@ -394,53 +456,275 @@ class JoinRequestsStudent(views.APIView):
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-        if len(students) < 3:
+        if action not in ("accept", "reject"):
+            errors = [
+                'invalid action options are accept,reject'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if isinstance(students, str):
+                students = json.loads(students)
+            students = list(dict.fromkeys(int(i) for i in students))
+        except (TypeError, ValueError):
+            students = []
+
+        if not students:
             errors = [
                 "students not passed or students format should be like this. [1, 2, 3] where 1, 2 and 3 are student ID's"
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-        departments = models.Department.objects.filter(Q(user__id=request.user.id) & Q(department_id=dept_id))
+        resolver = get_resolver(request)
+        department = resolver.department(dept_id)
 
-        if not len(departments):
+        if not resolver.is_department_user(request.user, department):
             errors = [
                 'Invalid dept_id'
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
+        with transaction.atomic():
+            pending = set(student_models.Student.objects.select_for_update(of=('self',)).filter(
+                id__in=students,
+                is_active=True,
+                requested_section__isnull=False,
+                requested_section__of_class__department=department,
+            ).values_list('id', flat=True))
+
+            if action == "accept":
+                student_models.Student.objects.filter(id__in=pending).update(
+                    section=F('requested_section'), requested_section=None
+                )
+            else:
+                student_models.Student.objects.filter(id__in=pending).update(requested_section=None)
+
+        results = [
+            {"id": id, "errors": None if id in pending else ['no pending request for this student in this department']}
+            for id in students
+        ]
+        return Response({'details': results}, status.HTTP_200_OK)
+
+
+class ProvisionStructure(views.APIView):
+
+    authentication_classes = (authentication.TokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        request_body = openapi.Schema(
+            title = "Provision departments, classes and sections",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'org_id': openapi.Schema(type=openapi.TYPE_STRING),
+                'departments': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            422: openapi.Response("Unprocessable Entity- Make sure that all the required field values are passed"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    @is_organization
+    def post(self, request, *args, **kwargs):
+        tree, errors = provisioning.parse_tree(request.data)
+        if errors:
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        organization = kwargs.get("organization")
+        created = provisioning.provision(organization, tree)
+
+        return Response({'details': [created]}, status.HTTP_200_OK)
+
+
+class JoinRequestsUsers(views.APIView):
+
+    authentication_classes = (authentication.TokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response("OK- Successful GET Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            500: openapi.Response("Internal Server Error- Error while processing the GET Request Function.")
+        },
+        manual_parameters=[
+            openapi.Parameter(name="org_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="dept_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="status", in_="query", type=openapi.TYPE_STRING, enum=["pending", "approved", "denied"]),
+            openapi.Parameter(name="cursor", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="page_size", in_="query", type=openapi.TYPE_INTEGER),
+        ]
+    )
+    @is_org_or_department
+    def get(self, request, *args, **kwargs):
+        query_params = self.request.query_params
+        department = kwargs.get("department")
+        request_status = query_params.get('status', models.PENDING)
+
+        if request_status not in (models.PENDING, models.APPROVED, models.DENIED):
+            errors = [
+                'invalid status options are pending,approved,denied'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        qs = models.DepartmentJoinRequest.objects.filter(department=department, status=request_status)
+        qs = plan_queryset(qs, serializers.DepartmentJoinRequestSerializer)
+
         try:
-            students = students.replace(" ", "")
-            students = students[1:len(students) - 1].split(",")
-            students = [int(i) for i in students]
-        except Exception as e:
+            page, next_cursor, previous_cursor = KeysetPaginator(date_field='created_at').paginate(qs, query_params)
+        except InvalidCursor:
             errors = [
-                "students format should be like this. [1, 2, 3] where 1, 2 and 3 are student ID's",
-                str(e)
+                'invalid cursor'
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-        stud_qs = student_models.Student.objects.filter(is_active=True)
+        serializer = serializers.DepartmentJoinRequestSerializer(page, many=True)
+        return Response({'details': serializer.data, 'next': next_cursor, 'previous': previous_cursor}, status.HTTP_200_OK)
 
-        valid_students = []
+    @swagger_auto_schema(
+        request_body = openapi.Schema(
+            title = "Review department join requests",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'org_id': openapi.Schema(type=openapi.TYPE_STRING),
+                'dept_id': openapi.Schema(type=openapi.TYPE_STRING),
+                'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                'action': openapi.Schema(type=openapi.TYPE_STRING, enum=["approve", "deny"]),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            422: openapi.Response("Unprocessable Entity- Make sure that all the required field values are passed"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    @is_org_or_department
+    def post(self, request, *args, **kwargs):
+        data = request.data
+        ids = data.get("ids", None)
+        action = data.get("action", None)
+        department = kwargs.get("department")
 
-        for i in students:
-            temp_stud = stud_qs.filter(id=i)
-            if not len(temp_stud):
-                errors = [
-                    'Invalid student ID'
-                ]
-                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
-            temp_stud = temp_stud[0]
-            if not temp_stud.requested_section:
+        if action not in ("approve", "deny"):
+            errors = [
+                'invalid action options are approve,deny'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if isinstance(ids, str):
+                ids = json.loads(ids)
+            ids = list(dict.fromkeys(int(i) for i in ids))
+        except (TypeError, ValueError):
+            ids = []
+
+        if not ids:
+            errors = [
+                "ids not passed or ids format should be like this. [1, 2, 3] where 1, 2 and 3 are join request ID's"
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        errors = {}
+
+        with transaction.atomic():
+            department = models.Department.objects.select_for_update().get(id=department.id)
+            pending = dict(models.DepartmentJoinRequest.objects.select_for_update().filter(
+                id__in=ids, department=department, status=models.PENDING
+            ).values_list('id', 'user_id'))
+
+            decided = [id for id in ids if id in pending]
+
+            # Approving makes the requester the department's user, which is what the department
+            # checks read, so a department without one can approve a single request.
+            if action == "approve":
+                if department.user_id is None and decided:
+                    department.user_id = pending[decided[0]]
+                    department.save(update_fields=['user'])
+                    decided = decided[:1]
+                else:
+                    decided = []
+
+                for id in pending:
+                    if id not in decided:
+                        errors[id] = ['department already has a user']
+
+            models.DepartmentJoinRequest.objects.filter(id__in=decided).update(
+                status=models.APPROVED if action == "approve" else models.DENIED,
+                decided_at=timezone.now(),
+                decided_by=request.user,
+            )
+
+        results = [
+            {"id": id, "errors": None if id in decided else errors.get(id, ['no pending join request with this id'])}
+            for id in ids
+        ]
+        return Response({'details': results}, status.HTTP_200_OK)
+
+
+class OrganizationTree(views.APIView):
+
+    authentication_classes = (SignedTokenAuthentication, authentication.TokenAuthentication)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response("OK- Successful GET Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            403: openapi.Response("Forbidden- The user is not a member of the organization"),
+            500: openapi.Response("Internal Server Error- Error while processing the GET Request Function.")
+        },
+        manual_parameters=[
+            openapi.Parameter(name="dept_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="kind", in_="query", type=openapi.TYPE_STRING, enum=["department", "class", "section"]),
+        ]
+    )
+    def get(self, request, org_id, *args, **kwargs):
+        query_params = self.request.query_params
+        dept_id = query_params.get('dept_id', None)
+        kind = query_params.get('kind', None)
+
+        organization = get_resolver(request).organization(org_id)
+        if organization is None:
+            errors = [
+                'Invalid org_id'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        if str(organization.org_id) not in get_request_roles(request):
+            errors = [
+                'You are not a member of this organization'
+            ]
+            return Response({'details': errors}, status.HTTP_403_FORBIDDEN)
+
+        if kind and kind not in (models.DEPARTMENT, models.CLASS, models.SECTION):
+            errors = [
+                'invalid kind options are department,class,section'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        qs = models.StructureNode.objects.filter(organization=organization, is_active=True)
+        base_path = ''
+
+        if dept_id:
+            base_path = qs.filter(kind=models.DEPARTMENT, code=str(dept_id)).values_list('path', flat=True).first()
+            if base_path is None:
                 errors = [
-                    'no students in waiting list'
+                    'Invalid dept_id'
                 ]
                 return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
-            valid_students.append(temp_stud)
+            qs = qs.filter(path__startswith=base_path).exclude(path=base_path)
+
+        qs = qs.order_by('path')
 
-        for temp_stud in valid_students:
-            temp_stud.section = temp_stud.requested_section
-            temp_stud.requested_section = None
-            temp_stud.save()
+        # With kind the matching nodes are returned as a flat list, e.g. every section under a department.
+        if kind:
+            nodes = qs.filter(kind=kind).values('object_id', 'name', 'code')
+            details = [{"id": node["object_id"], "kind": kind, "name": node["name"], "code": node["code"]} for node in nodes]
+            return Response({'details': details}, status.HTTP_200_OK)
 
-        return Response({"details": ["Successfully accepted all provided requests."]}, status.HTTP_200_OK)
+        nodes = qs.only('object_id', 'kind', 'name', 'code', 'path')
+        return Response({'details': hierarchy.build_tree(nodes, base_path)}, status.HTTP_200_OK)
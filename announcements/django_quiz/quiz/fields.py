@@ -0,0 +1,57 @@
+import sys
+from array import array
+
+from django.db import models
+
+
+class PackedIntegerListField(models.BinaryField):
+    """
+    Stores a list of integers as packed little endian 64 bit values.
+
+    Unlike a comma separated CharField there is no upper bound on the
+    number of items, and reading it back needs no string parsing.
+    """
+
+    description = "List of integers packed as binary"
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('default', list)
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def pack(values):
+        packed = array('q', values)
+        if sys.byteorder == 'big':
+            packed.byteswap()
+        return packed.tobytes()
+
+    @staticmethod
+    def unpack(data):
+        packed = array('q')
+        packed.frombytes(bytes(data))
+        if sys.byteorder == 'big':
+            packed.byteswap()
+        return packed.tolist()
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.unpack(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, list):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return self.unpack(value)
+        if isinstance(value, str):
+            # The output of value_to_string, as found in fixtures.
+            return [int(item) for item in value.split(',') if item]
+        return [int(item) for item in value]
+
+    def get_prep_value(self, value):
+        if value is None:
+            return value
+        return self.pack(value)
+
+    def value_to_string(self, obj):
+        return ','.join(map(str, self.value_from_object(obj) or []))
@@ -0,0 +1,104 @@
+# Generated by Django 3.1.2 on 2026-10-18 16:20
+
+from django.db import migrations, models
+import django_quiz.quiz.fields
+
+
+BATCH_SIZE = 1000
+
+
+def _ids(value):
+    return [int(n) for n in (value or '').split(',') if n]
+
+
+def _csv(ids):
+    return ''.join(f'{question_id},' for question_id in ids)
+
+
+def pack_sittings(apps, schema_editor):
+    Sitting = apps.get_model('quiz', 'Sitting')
+
+    batch = []
+    for sitting in Sitting.objects.only('id', 'question_order', 'question_list', 'incorrect_questions').iterator(chunk_size=BATCH_SIZE):
+        order, remaining = _ids(sitting.question_order), _ids(sitting.question_list)
+
+        # Unanswered questions are the tail of question_order from the cursor on.
+        if order[len(order) - len(remaining):] != remaining:
+            left = set(remaining)
+            order = [question_id for question_id in order if question_id not in left] + remaining
+
+        sitting.packed_question_order = order
+        sitting.question_cursor = len(order) - len(remaining)
+        sitting.packed_incorrect_questions = _ids(sitting.incorrect_questions)
+        batch.append(sitting)
+
+        if len(batch) >= BATCH_SIZE:
+            Sitting.objects.bulk_update(batch, ['packed_question_order', 'question_cursor', 'packed_incorrect_questions'])
+            batch = []
+
+    Sitting.objects.bulk_update(batch, ['packed_question_order', 'question_cursor', 'packed_incorrect_questions'])
+
+
+def unpack_sittings(apps, schema_editor):
+    Sitting = apps.get_model('quiz', 'Sitting')
+
+    batch = []
+    for sitting in Sitting.objects.only('id', 'packed_question_order', 'question_cursor', 'packed_incorrect_questions').iterator(chunk_size=BATCH_SIZE):
+        sitting.question_order = _csv(sitting.packed_question_order)
+        sitting.question_list = _csv(sitting.packed_question_order[sitting.question_cursor:])
+        sitting.incorrect_questions = _csv(sitting.packed_incorrect_questions)
+        batch.append(sitting)
+
+        if len(batch) >= BATCH_SIZE:
+            Sitting.objects.bulk_update(batch, ['question_order', 'question_list', 'incorrect_questions'])
+            batch = []
+
+    Sitting.objects.bulk_update(batch, ['question_order', 'question_list', 'incorrect_questions'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_auto_20201127_1934'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitting',
+            name='packed_question_order',
+            field=django_quiz.quiz.fields.PackedIntegerListField(default=list, verbose_name='Question Order'),
+        ),
+        migrations.AddField(
+            model_name='sitting',
+            name='question_cursor',
+            field=models.PositiveIntegerField(default=0, verbose_name='Question Cursor'),
+        ),
+        migrations.AddField(
+            model_name='sitting',
+            name='packed_incorrect_questions',
+            field=django_quiz.quiz.fields.PackedIntegerListField(blank=True, default=list, verbose_name='Incorrect questions'),
+        ),
+        migrations.RunPython(pack_sittings, unpack_sittings),
+        migrations.RemoveField(
+            model_name='sitting',
+            name='question_order',
+        ),
+        migrations.RemoveField(
+            model_name='sitting',
+            name='question_list',
+        ),
+        migrations.RemoveField(
+            model_name='sitting',
+            name='incorrect_questions',
+        ),
+        migrations.RenameField(
+            model_name='sitting',
+            old_name='packed_question_order',
+            new_name='question_order',
+        ),
+        migrations.RenameField(
+            model_name='sitting',
+            old_name='packed_incorrect_questions',
+            new_name='incorrect_questions',
+        ),
+    ]
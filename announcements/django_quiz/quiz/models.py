@@ -14,6 +14,8 @@ from django.conf import settings
 
 from model_utils.managers import InheritanceManager
 
+from .fields import PackedIntegerListField
+
 
 class CategoryManager(models.Manager):
 
@@ -338,13 +340,11 @@ class SittingManager(models.Manager):
         if quiz.max_questions and quiz.max_questions < len(question_set):
             question_set = question_set[:quiz.max_questions]
 
-        questions = ",".join(map(str, question_set)) + ","
-
         new_sitting = self.create(user=user,
                                   quiz=quiz,
-                                  question_order=questions,
-                                  question_list=questions,
-                                  incorrect_questions="",
+                                  question_order=question_set,
+                                  question_cursor=0,
+                                  incorrect_questions=[],
                                   current_score=0,
                                   complete=False,
                                   user_answers='{}')
@@ -374,10 +374,10 @@ class Sitting(models.Model):
     Question_order is a list of integer pks of all the questions in the
     quiz, in order.
 
-    Question_list is a list of integers which represent id's of
-    the unanswered questions in csv format.
+    Question_cursor is the index in question_order of the first
+    unanswered question, so answering one only updates that column.
 
-    Incorrect_questions is a list in the same format.
+    Incorrect_questions is a list of the pks answered wrongly.
 
     Sitting deleted when quiz finished unless quiz.exam_paper is true.
 
@@ -389,21 +389,16 @@ class Sitting(models.Model):
 
     quiz = models.ForeignKey(Quiz, verbose_name=_("Quiz"), on_delete=models.CASCADE)
 
-    question_order = models.CharField(
-        max_length=1024,
-        verbose_name=_("Question Order"),
-        validators=[validate_comma_separated_integer_list])
+    question_order = PackedIntegerListField(
+        verbose_name=_("Question Order"))
 
-    question_list = models.CharField(
-        max_length=1024,
-        verbose_name=_("Question List"),
-        validators=[validate_comma_separated_integer_list])
+    question_cursor = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Question Cursor"))
 
-    incorrect_questions = models.CharField(
-        max_length=1024,
+    incorrect_questions = PackedIntegerListField(
         blank=True,
-        verbose_name=_("Incorrect questions"),
-        validators=[validate_comma_separated_integer_list])
+        verbose_name=_("Incorrect questions"))
 
     current_score = models.IntegerField(verbose_name=_("Current Score"))
 
@@ -429,31 +424,36 @@ class Sitting(models.Model):
         If no question is found, returns False
         Does NOT remove the question from the front of the list.
         """
-        if not self.question_list:
+        if self.question_cursor >= len(self.question_order):
             return False
 
-        first, _ = self.question_list.split(',', 1)
-        question_id = int(first)
+        question_id = self.question_order[self.question_cursor]
         return Question.objects.get_subclass(id=question_id)
 
     def remove_first_question(self):
-        if not self.question_list:
+        if self.question_cursor >= len(self.question_order):
             return
 
-        _, others = self.question_list.split(',', 1)
-        self.question_list = others
-        self.save()
+        self.question_cursor += 1
+        self.save(update_fields=['question_cursor'])
+
+    @property
+    def question_list(self):
+        """
+        The pks of the questions not answered yet.
+        """
+        return self.question_order[self.question_cursor:]
 
     def add_to_score(self, points):
         self.current_score += int(points)
-        self.save()
+        self.save(update_fields=['current_score'])
 
     @property
     def get_current_score(self):
         return self.current_score
 
     def _question_ids(self):
-        return [int(n) for n in self.question_order.split(',') if n]
+        return list(self.question_order)
 
     @property
     def get_percent_correct(self):
@@ -475,19 +475,17 @@ class Sitting(models.Model):
     def mark_quiz_complete(self):
         self.complete = True
         self.end = now()
-        self.save()
+        self.save(update_fields=['complete', 'end'])
 
     def add_incorrect_question(self, question):
         """
         Adds uid of incorrect question to the list.
         The question object must be passed in.
         """
-        if len(self.incorrect_questions) > 0:
-            self.incorrect_questions += ','
-        self.incorrect_questions += str(question.id) + ","
+        self.incorrect_questions.append(question.id)
         if self.complete:
-            self.add_to_score(-1)
-        self.save()
+            self.current_score -= 1
+        self.save(update_fields=['incorrect_questions', 'current_score'])
 
     @property
     def get_incorrect_questions(self):
@@ -495,14 +493,12 @@ class Sitting(models.Model):
         Returns a list of non empty integers, representing the pk of
         questions
         """
-        return [int(q) for q in self.incorrect_questions.split(',') if q]
+        return list(self.incorrect_questions)
 
     def remove_incorrect_question(self, question):
-        current = self.get_incorrect_questions
-        current.remove(question.id)
-        self.incorrect_questions = ','.join(map(str, current))
-        self.add_to_score(1)
-        self.save()
+        self.incorrect_questions.remove(question.id)
+        self.current_score += 1
+        self.save(update_fields=['incorrect_questions', 'current_score'])
 
     @property
     def check_if_passed(self):
@@ -519,14 +515,14 @@ class Sitting(models.Model):
         current = json.loads(self.user_answers)
         current[question.id] = guess
         self.user_answers = json.dumps(current)
-        self.save()
+        self.save(update_fields=['user_answers'])
 
     def get_questions(self, with_answers=False):
-        question_ids = self._question_ids()
+        positions = {question_id: index for index, question_id in enumerate(self.question_order)}
         questions = sorted(
-            self.quiz.question_set.filter(id__in=question_ids)
+            self.quiz.question_set.filter(id__in=positions)
                                   .select_subclasses(),
-            key=lambda q: question_ids.index(q.id))
+            key=lambda q: positions[q.id])
 
         if with_answers:
             user_answers = json.loads(self.user_answers)
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from . import models
+from utils.fieldsets import SparseFieldsetMixin
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Quiz
         fields = "__all__"
@@ -0,0 +1,73 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from .fields import PackedIntegerListField
+from .models import Quiz, Sitting
+
+pack_migration = import_module('django_quiz.quiz.migrations.0004_sitting_packed_questions')
+
+
+class PackedIntegerListFieldTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        values = [1, 0, -5, 2 ** 40]
+        packed = PackedIntegerListField.pack(values)
+
+        self.assertEqual(len(packed), 8 * len(values))
+        self.assertEqual(PackedIntegerListField.unpack(memoryview(packed)), values)
+
+    def test_to_python(self):
+        field = PackedIntegerListField()
+
+        self.assertEqual(field.to_python('3,1,2,'), [3, 1, 2])
+        self.assertEqual(field.to_python(PackedIntegerListField.pack([4, 5])), [4, 5])
+        self.assertEqual(field.to_python([6]), [6])
+        self.assertIsNone(field.to_python(None))
+
+
+class PackMigrationTests(SimpleTestCase):
+
+    def test_comma_separated_ids(self):
+        self.assertEqual(pack_migration._ids('3,1,2,'), [3, 1, 2])
+        self.assertEqual(pack_migration._ids(''), [])
+        self.assertEqual(pack_migration._csv([3, 1, 2]), '3,1,2,')
+
+
+class SittingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='student@example.com', password='password')
+        cls.quiz = Quiz.objects.create(title='Fractions', url='fractions', pass_mark=50)
+
+    def setUp(self):
+        self.sitting = Sitting.objects.create(
+            user=self.user, quiz=self.quiz, question_order=[3, 1, 2], current_score=0,
+        )
+
+    def test_cursor_moves_past_answered_questions(self):
+        self.sitting.remove_first_question()
+        self.sitting.refresh_from_db()
+
+        self.assertEqual(self.sitting.question_cursor, 1)
+        self.assertEqual(self.sitting.question_order, [3, 1, 2])
+        self.assertEqual(self.sitting.question_list, [1, 2])
+
+    def test_cursor_stops_at_the_end(self):
+        for _ in range(4):
+            self.sitting.remove_first_question()
+
+        self.assertEqual(self.sitting.question_cursor, 3)
+        self.assertIs(self.sitting.get_first_question(), False)
+        self.assertEqual(self.sitting.question_list, [])
+
+    def test_incorrect_questions_are_saved(self):
+        self.sitting.add_incorrect_question(SimpleNamespace(id=1))
+        self.sitting.add_incorrect_question(SimpleNamespace(id=2))
+        self.sitting.refresh_from_db()
+
+        self.assertEqual(self.sitting.get_incorrect_questions, [1, 2])
+        self.assertEqual(self.sitting.get_max_score, 3)
@@ -0,0 +1,217 @@
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.text import get_valid_filename
+
+from . import models
+
+
+CHUNK_SIZE = 64 * 1024
+UPLOAD_DIR = getattr(settings, 'ANNOUNCEMENT_UPLOAD_DIR', os.path.join(settings.MEDIA_ROOT, 'announcement', 'uploads'))
+
+# 'X-Accel-Redirect' (nginx) or 'X-Sendfile' (Apache/lighttpd); None serves through Django.
+SENDFILE_HEADER = getattr(settings, 'ANNOUNCEMENT_FILES_SENDFILE_HEADER', None)
+ACCEL_REDIRECT_PREFIX = getattr(settings, 'ANNOUNCEMENT_FILES_ACCEL_REDIRECT_PREFIX', '/protected/')
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadError(Exception):
+    pass
+
+
+def spool_path(upload):
+    return os.path.join(UPLOAD_DIR, str(upload.id))
+
+
+def clean_filename(filename):
+    """
+    Returns the client supplied `filename` reduced to a safe file name, or
+    None when nothing usable is left, e.g. for '..' or 'dir/'.
+    """
+    name = get_valid_filename(os.path.basename(str(filename).replace('\\', '/')))
+    if name.strip('.') == '':
+        return None
+    return name[-255:]
+
+
+def content_disposition(filename):
+    """
+    Inline Content-Disposition for `filename`, quoted, or RFC 5987 encoded
+    when it is not ASCII.
+    """
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        return "inline; filename*=utf-8''{}".format(quote(filename))
+    return 'inline; filename="{}"'.format(filename.replace('\\', '\\\\').replace('"', r'\"'))
+
+
+def parse_content_range(header):
+    match = CONTENT_RANGE_RE.match(header or "")
+    if not match:
+        return None
+    start, end, total = (int(i) for i in match.groups())
+    if end < start or end >= total:
+        return None
+    return start, end, total
+
+
+def write_chunk(upload, stream, start, end):
+    """
+    Appends bytes start..end (inclusive) read from `stream` to the spool file
+    of `upload`, copying CHUNK_SIZE bytes at a time so the chunk is never held
+    in memory. Returns the new offset.
+
+    The upload row stays locked while the spool is written, so concurrent
+    PUTs of the same upload are applied one after the other and only the one
+    starting at the current offset is written.
+    """
+    with transaction.atomic():
+        locked = models.AnnouncementUpload.objects.select_for_update().get(id=upload.id)
+        upload.offset = locked.offset
+
+        if start != locked.offset:
+            raise UploadError(f'expected a chunk starting at {locked.offset}')
+
+        if end >= locked.size:
+            raise UploadError(f'chunk ends past the declared size of {locked.size} bytes')
+
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        path = spool_path(upload)
+        remaining = end - start + 1
+
+        with open(path, 'ab') as spool:
+            spool.truncate(start)
+            while remaining:
+                data = stream.read(min(CHUNK_SIZE, remaining)) if stream else b''
+                if not data:
+                    break
+                spool.write(data)
+                remaining -= len(data)
+
+        if remaining:
+            raise UploadError('request body is shorter than the Content-Range')
+
+        models.AnnouncementUpload.objects.filter(id=upload.id).update(offset=end + 1)
+
+    upload.offset = end + 1
+    return upload.offset
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as spool:
+        for data in iter(lambda: spool.read(CHUNK_SIZE), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def complete_upload(upload):
+    """
+    Turns a fully received upload into an AnnouncementFile.
+
+    Files are stored once per content hash: when another attachment already
+    holds the same bytes the new row points at its file and the spooled copy
+    is discarded.
+    """
+    path = spool_path(upload)
+    content_hash = _hash_file(path)
+
+    existing = models.AnnouncementFile.objects.filter(content_hash=content_hash, size=upload.size).first()
+
+    if existing is not None:
+        name = existing.file.name
+        os.remove(path)
+    else:
+        name = f'announcement/files/{content_hash[:2]}/{content_hash}/{clean_filename(upload.filename) or "file"}'
+        if isinstance(default_storage, FileSystemStorage):
+            target = default_storage.path(name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+        else:
+            with open(path, 'rb') as spool:
+                name = default_storage.save(name, File(spool))
+            os.remove(path)
+
+    announcement_file = models.AnnouncementFile(
+        announcement_id=upload.announcement_id,
+        content_hash=content_hash,
+        size=upload.size,
+    )
+    announcement_file.file.name = name
+    announcement_file.save()
+
+    upload.is_complete = True
+    upload.save(update_fields=['is_complete', 'updated_at'])
+    return announcement_file
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as stored:
+        stored.seek(start)
+        while length:
+            data = stored.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def serve(announcement_file, range_header=None):
+    """
+    Returns a response for `announcement_file`.
+
+    With SENDFILE_HEADER set the body is left to the web server, which also
+    answers Range requests. Otherwise a single `Range: bytes=a-b` is honoured
+    with a 206 and the file is streamed in CHUNK_SIZE pieces.
+    """
+    name = announcement_file.file.name
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    filename = os.path.basename(name)
+
+    if SENDFILE_HEADER:
+        response = HttpResponse(content_type=content_type)
+        if SENDFILE_HEADER == 'X-Accel-Redirect':
+            response['X-Accel-Redirect'] = ACCEL_REDIRECT_PREFIX + name
+        else:
+            response[SENDFILE_HEADER] = default_storage.path(name)
+        response['Content-Disposition'] = content_disposition(filename)
+        return response
+
+    path = default_storage.path(name)
+    size = announcement_file.size if announcement_file.size is not None else os.path.getsize(path)
+    start, end = 0, size - 1
+    status_code = 200
+
+    match = RANGE_RE.match(range_header or "")
+    if match and any(match.groups()):
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)
+
+        if start > end or start >= size:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        status_code = 206
+
+    response = StreamingHttpResponse(_read_range(path, start, end - start + 1), status=status_code, content_type=content_type)
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition(filename)
+    if status_code == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
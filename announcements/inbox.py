@@ -0,0 +1,172 @@
+import json
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+
+from . import models
+from departments import models as departments_models
+from organizations import models as organizations_models
+from students import models as student_models
+from teachers import models as teachers_models
+
+
+def parse_visible(visible):
+    """
+    `visible` holds the audience of an announcement as JSON:
+
+        {"departments": ["<dept_id>", ...], "classes": [1, 2], "sections": [3]}
+
+    Departments are referenced by their public department_id, classes and
+    sections by id. An empty or unreadable value means the whole organization.
+    """
+    audience = {"departments": [], "classes": [], "sections": []}
+
+    if not visible:
+        return audience
+
+    try:
+        value = json.loads(visible)
+    except (TypeError, ValueError):
+        return audience
+
+    if not isinstance(value, dict):
+        return audience
+
+    for key in audience:
+        items = value.get(key, [])
+        if isinstance(items, (list, tuple)):
+            audience[key] = [str(i) for i in items if i not in (None, "")]
+
+    audience["classes"] = [int(i) for i in audience["classes"] if i.isdigit()]
+    audience["sections"] = [int(i) for i in audience["sections"] if i.isdigit()]
+    return audience
+
+
+def _audience_user_ids(announcement):
+    """
+    Returns the ids of every user addressed by the organization and `visible`
+    of `announcement`, whoever wrote it.
+    """
+    audience = parse_visible(announcement.visible)
+
+    students = student_models.Student.objects.filter(
+        is_active=True,
+        user__isnull=False,
+        section__of_class__department__organization_id=announcement.organization_id,
+    )
+    departments = departments_models.Department.objects.filter(
+        is_active=True,
+        user__isnull=False,
+        organization_id=announcement.organization_id,
+    )
+
+    if any(audience.values()):
+        students = students.filter(
+            Q(section__of_class__department__department_id__in=audience["departments"])
+            | Q(section__of_class_id__in=audience["classes"])
+            | Q(section_id__in=audience["sections"])
+        )
+        departments = departments.filter(department_id__in=audience["departments"])
+
+    teachers = teachers_models.Teacher.objects.filter(
+        user__isnull=False,
+        organization_id=announcement.organization_id,
+    )
+    admins = organizations_models.Organization.objects.filter(
+        id=announcement.organization_id,
+        user__isnull=False,
+    )
+
+    user_ids = set(students.values_list('user_id', flat=True))
+    user_ids.update(departments.values_list('user_id', flat=True))
+    user_ids.update(teachers.values_list('user_id', flat=True))
+    user_ids.update(admins.values_list('user_id', flat=True))
+    return user_ids
+
+
+def resolve_audience(announcement):
+    """
+    Returns the ids of every user that should receive `announcement`: the
+    students of the targeted sections, the heads of the targeted departments
+    and the teachers and the admin of the organization. The author is not a
+    recipient, even when they belong to the audience.
+
+    Teachers belong to the organization rather than to a department, so they
+    receive every announcement of it, targeted or not.
+    """
+    return _audience_user_ids(announcement) - {announcement.user_id}
+
+
+def sync_inboxes(changes):
+    """
+    Applies the current state of each announcement in `changes`, a list of
+    (announcement, audience_changed) pairs, to its inbox rows.
+
+    Only the difference is written: soft-deleted announcements hide their rows
+    with one UPDATE, scheduled and expired ones keep their rows hidden, an unchanged audience only refreshes the copied columns,
+    and an audience change inserts and deletes the users that moved. Audiences
+    are resolved once per distinct (organization, visible) pair.
+    """
+    inactive = [announcement.id for announcement, _ in changes if not announcement.is_active]
+    if inactive:
+        models.AnnouncementInbox.objects.filter(announcement_id__in=inactive, is_active=True).update(is_active=False)
+
+    audiences = {}
+
+    for announcement, audience_changed in changes:
+        if not announcement.is_active:
+            continue
+
+        entries = models.AnnouncementInbox.objects.filter(announcement_id=announcement.id)
+        live = announcement.status == models.LIVE
+
+        if audience_changed:
+            key = announcement.get_audience_key()
+            if key not in audiences:
+                audiences[key] = _audience_user_ids(announcement)
+            audience = audiences[key] - {announcement.user_id}
+            existing = set(entries.values_list('user_id', flat=True))
+
+            stale = existing - audience
+            added = audience - existing
+            unacknowledged = 0
+            if stale:
+                entries.filter(user_id__in=stale).delete()
+                unacknowledged, _ = models.AnnouncementAcknowledgement.objects.filter(
+                    announcement_id=announcement.id, user_id__in=stale,
+                ).delete()
+
+            models.AnnouncementInbox.objects.bulk_create(
+                [
+                    models.AnnouncementInbox(
+                        user_id=user_id,
+                        announcement_id=announcement.id,
+                        organization_id=announcement.organization_id,
+                        date=announcement.date,
+                        is_active=live,
+                    )
+                    for user_id in added
+                ],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+
+            if stale or added:
+                models.Announcement.objects.filter(id=announcement.id).update(
+                    recipient_count=Greatest(F('recipient_count') + len(added) - len(stale), Value(0)),
+                    acknowledged_count=Greatest(F('acknowledged_count') - unacknowledged, Value(0)),
+                )
+
+        entries.exclude(
+            date=announcement.date,
+            organization_id=announcement.organization_id,
+            is_active=live,
+        ).update(
+            date=announcement.date,
+            organization_id=announcement.organization_id,
+            is_active=live,
+        )
+
+
+def sync_inbox(announcement, audience_changed=True):
+    sync_inboxes([(announcement, audience_changed)])
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from announcements import archive
+
+
+class Command(BaseCommand):
+    help = "Move old and soft-deleted announcements into the compressed archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=12, help="Archive announcements created more than this many months ago.")
+        parser.add_argument('--inactive_days', type=int, default=30, help="Archive soft-deleted announcements created more than this many days ago.")
+        parser.add_argument('--batch_size', type=int, default=archive.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        for _ in range(options['months']):
+            month = (month - timedelta(days=1)).replace(day=1)
+
+        moved = archive.archive(
+            before=month,
+            inactive_before=now - timedelta(days=options['inactive_days']),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} announcements'))
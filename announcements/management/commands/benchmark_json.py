@@ -0,0 +1,99 @@
+import io
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from announcements import serializers
+from announcements.management.commands.benchmark_serializers import sample_announcements, sample_departments
+from departments import serializers as departments_serializers
+from utils import renderers
+from utils.values import compile_serializer
+
+
+def _rows(serializer_class, instances, annotations=()):
+    compiled = compile_serializer(serializer_class(), annotations)
+    return [compiled.to_representation(compiled.get_values(instance)) for instance in instances]
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSONRenderer and JSONParser with the fast ones on the payloads of the list and bulk endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help="Rows per list payload, a page is 100 at most.")
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def _best(self, function, repeat):
+        best = None
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                function()
+            elapsed = (time.perf_counter() - start) / repeat
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        now = timezone.now()
+
+        payloads = {
+            'announcement page': {
+                'details': _rows(serializers.AnnouncementSerializer, sample_announcements(rows)),
+                'next': 'eyJkIjoiMjAyNi0xMC0xOFQwMDowMDowMFoiLCJpIjoxMDAsImIiOmZhbHNlfQ==',
+                'previous': None,
+            },
+            'department list': _rows(
+                departments_serializers.DepartmentSerializer, sample_departments(rows), ('requesting_users_count',)
+            ),
+            'join request results': {
+                'details': [{'id': i, 'errors': None if i % 5 else ['no pending join request with this id']} for i in range(rows)],
+            },
+            # Values the renderer has to convert itself, as returned by views building dicts by hand.
+            'native types': [
+                {'id': i, 'uuid': uuid.uuid4(), 'at': now, 'day': now.date(), 'amount': Decimal('10.25')}
+                for i in range(rows)
+            ],
+        }
+        bodies = {
+            'bulk announcements': {
+                'org_id': 'org-1',
+                'user_type': 'org',
+                'announcements': [
+                    {'title': f'Announcement {i}', 'description': 'Classes resume on Monday. ' * 4, 'visible': '{"classes": [1, 2]}'}
+                    for i in range(rows)
+                ],
+            },
+            'join request batch': {'org_id': 'org-1', 'dept_id': 'dept-1', 'action': 'approve', 'ids': list(range(rows))},
+        }
+
+        drf_renderer, fast_renderer = JSONRenderer(), renderers.FastJSONRenderer()
+        self.stdout.write(f'orjson installed: {renderers.orjson is not None}')
+
+        for name, data in payloads.items():
+            if fast_renderer.render(data) != drf_renderer.render(data):
+                raise CommandError(f'render {name}: output differs from JSONRenderer')
+
+            drf_time = self._best(lambda: drf_renderer.render(data), repeat)
+            fast_time = self._best(lambda: fast_renderer.render(data), repeat)
+            self.stdout.write(
+                f'render {name}: JSONRenderer {drf_time * 1e6:.0f}us, '
+                f'FastJSONRenderer {fast_time * 1e6:.0f}us ({drf_time / fast_time:.1f}x)'
+            )
+
+        drf_parser, fast_parser = JSONParser(), renderers.FastJSONParser()
+        for name, data in bodies.items():
+            body = drf_renderer.render(data)
+            if fast_parser.parse(io.BytesIO(body)) != drf_parser.parse(io.BytesIO(body)):
+                raise CommandError(f'parse {name}: result differs from JSONParser')
+
+            drf_time = self._best(lambda: drf_parser.parse(io.BytesIO(body)), repeat)
+            fast_time = self._best(lambda: fast_parser.parse(io.BytesIO(body)), repeat)
+            self.stdout.write(
+                f'parse {name}: JSONParser {drf_time * 1e6:.0f}us, '
+                f'FastJSONParser {fast_time * 1e6:.0f}us ({drf_time / fast_time:.1f}x)'
+            )
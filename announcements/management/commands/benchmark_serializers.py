@@ -0,0 +1,106 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from announcements import models, serializers
+from departments import models as departments_models
+from departments import serializers as departments_serializers
+from utils.values import compile_serializer
+
+
+def sample_announcements(count):
+    now = timezone.now()
+    return [
+        models.Announcement(
+            id=i,
+            user_id=1,
+            organization_id=1,
+            title=f'Announcement {i}',
+            description='Classes will resume on Monday after the break. ' * 4,
+            data={"links": [f"https://example.com/{i}"], "priority": i % 3},
+            date=now - timedelta(minutes=i),
+            visible='{"departments": [], "classes": [1, 2], "sections": []}',
+            From={"organization": "Example school"},
+            sender_department_id=i % 10 or None,
+            is_public=bool(i % 2),
+            publish_at=now - timedelta(minutes=i),
+            status=models.LIVE,
+            created_at=now,
+            updated_at=now,
+            acknowledge=True,
+            acknowledged_count=i,
+            recipient_count=i * 2,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def sample_departments(count):
+    now = timezone.now()
+    departments = []
+    for i in range(1, count + 1):
+        department = departments_models.Department(
+            id=i,
+            user_id=i,
+            name=f'Department {i}',
+            department_id=f'00000000-0000-0000-0000-{i:012d}',
+            contact_name='Head of department',
+            contact_phone='+910000000000',
+            contact_email=f'department{i}@example.com',
+            organization_id=1,
+            created_at=now,
+        )
+        department.requesting_users_count = i % 7
+        departments.append(department)
+    return departments
+
+
+class Command(BaseCommand):
+    help = "Compare the per-row cost of the list serializers with their compiled values() versions, in memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def _best(self, function, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        renderer = JSONRenderer()
+
+        cases = (
+            ('AnnouncementSerializer', serializers.AnnouncementSerializer, sample_announcements(rows), ()),
+            ('DepartmentSerializer', departments_serializers.DepartmentSerializer, sample_departments(rows), ('requesting_users_count',)),
+        )
+
+        for name, serializer_class, instances, annotations in cases:
+            compiled = compile_serializer(serializer_class(), annotations)
+            if compiled is None:
+                raise CommandError(f'{name} does not compile')
+
+            # values_list() rows as the database would return them.
+            values = [compiled.get_values(instance) for instance in instances]
+
+            expected = renderer.render(serializer_class(instances, many=True).data)
+            if renderer.render([compiled.to_representation(row) for row in values]) != expected:
+                raise CommandError(f'{name}: compiled output differs from the serializer')
+
+            serializer_time = self._best(lambda: serializer_class(instances, many=True).data, repeat)
+            values_time = self._best(lambda: [compiled.to_representation(row) for row in values], repeat)
+            instances_time = self._best(lambda: compiled.serialize_instances(instances), repeat)
+
+            self.stdout.write(
+                f'{name}: serializer {serializer_time / rows * 1e6:.2f}us/row, '
+                f'values rows {values_time / rows * 1e6:.2f}us/row ({serializer_time / values_time:.1f}x), '
+                f'instances {instances_time / rows * 1e6:.2f}us/row ({serializer_time / instances_time:.1f}x)'
+            )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from announcements import scheduler
+
+
+class Command(BaseCommand):
+    help = "Publish and expire announcements when their publish_at/expire_at is reached."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Apply the transitions that are due now and exit.")
+        parser.add_argument('--max_sleep', type=float, default=scheduler.MAX_SLEEP_SECONDS)
+
+    def handle(self, *args, **options):
+        if options['once']:
+            moved = scheduler.apply_due()
+            self.stdout.write(self.style.SUCCESS(f'Moved {moved} announcements'))
+            return
+
+        scheduler.run(options['max_sleep'])
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from announcements import models, inbox
+
+
+class Command(BaseCommand):
+    help = "Fill the announcement inbox for existing announcements."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org_id', type=str, default=None)
+
+    def handle(self, *args, **options):
+        qs = models.Announcement.objects.filter(is_active=True)
+
+        if options['org_id']:
+            qs = qs.filter(organization__org_id=options['org_id'])
+
+        count = 0
+        for announcement in qs.iterator(chunk_size=500):
+            inbox.sync_inbox(announcement)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Synced inbox for {count} announcements'))
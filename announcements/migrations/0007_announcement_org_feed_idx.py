@@ -0,0 +1,17 @@
+# Generated by Django 3.1.2 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0006_announcementfile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['organization', 'is_active', 'date', 'id'], name='announcement_org_feed_idx'),
+        ),
+    ]
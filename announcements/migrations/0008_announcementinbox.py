@@ -0,0 +1,37 @@
+# Generated by Django 3.1.2 on 2026-10-18 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('announcements', '0007_announcement_org_feed_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementInbox',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='announcements.announcement')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='announcement_inbox_organization', to='organizations.organization')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='announcement_inbox', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='announcementinbox',
+            index=models.Index(fields=['user', 'is_active', 'date', 'id'], name='announcement_inbox_feed_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='announcementinbox',
+            constraint=models.UniqueConstraint(fields=('user', 'announcement'), name='announcement_inbox_unique'),
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 3.1.2 on 2026-10-18 11:40
+
+import ast
+import json
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def to_json_text(value, literal):
+    if value is None:
+        return None
+
+    try:
+        json.loads(value)
+        return value
+    except ValueError:
+        pass
+
+    if literal:
+        try:
+            return json.dumps(ast.literal_eval(value))
+        except (ValueError, SyntaxError):
+            pass
+
+    return json.dumps(value)
+
+
+def convert_text_to_json(apps, schema_editor):
+    Announcement = apps.get_model('announcements', 'Announcement')
+
+    for announcement in Announcement.objects.only('id', 'From', 'data').iterator():
+        From = to_json_text(announcement.From, literal=True)
+        data = to_json_text(announcement.data, literal=False)
+        if From != announcement.From or data != announcement.data:
+            Announcement.objects.filter(id=announcement.id).update(From=From, data=data)
+
+
+def backfill_senders(apps, schema_editor):
+    Announcement = apps.get_model('announcements', 'Announcement')
+    Class = apps.get_model('classes', 'Class')
+
+    for announcement in Announcement.objects.filter(From__isnull=False).iterator():
+        sender = announcement.From if isinstance(announcement.From, dict) else {}
+
+        if "teacher" in sender:
+            announcement.sender_teacher_id = announcement.user_id
+        elif "class" in sender:
+            from_class = Class.objects.filter(
+                title=sender["class"],
+                department__name=sender.get("Departemnt"),
+                department__organization_id=announcement.organization_id,
+            ).first()
+            if from_class is None:
+                continue
+            announcement.sender_class_id = from_class.id
+            announcement.sender_department_id = from_class.department_id
+        else:
+            continue
+
+        announcement.save(update_fields=['sender_teacher', 'sender_class', 'sender_department'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0002_class_department'),
+        ('departments', '0003_auto_20201113_1011'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('announcements', '0008_announcementinbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_text_to_json, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='announcement',
+            name='From',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='announcement',
+            name='data',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='sender_class',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcement_sender_class', to='classes.class'),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='sender_department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcement_sender_department', to='departments.department'),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='sender_teacher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcement_sender_teacher', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_senders, migrations.RunPython.noop),
+    ]
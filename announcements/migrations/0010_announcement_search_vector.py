@@ -0,0 +1,74 @@
+# Generated by Django 3.1.2 on 2026-10-18 12:30
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    CREATE FUNCTION announcements_announcement_search_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER announcements_announcement_search_trigger
+    BEFORE INSERT OR UPDATE ON announcements_announcement
+    FOR EACH ROW EXECUTE PROCEDURE announcements_announcement_search_update()
+    """,
+    """
+    UPDATE announcements_announcement SET search_vector =
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """,
+    "CREATE INDEX announcement_search_idx ON announcements_announcement USING gin (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS announcement_search_idx",
+    "DROP TRIGGER IF EXISTS announcements_announcement_search_trigger ON announcements_announcement",
+    "DROP FUNCTION IF EXISTS announcements_announcement_search_update()",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE announcements_announcement_fts USING fts5(title, description)",
+    """
+    INSERT INTO announcements_announcement_fts(rowid, title, description)
+    SELECT id, title, coalesce(description, '') FROM announcements_announcement
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS announcements_announcement_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {'postgresql': postgres, 'sqlite': sqlite}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0009_announcement_structured_sender'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
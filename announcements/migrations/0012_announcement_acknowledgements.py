@@ -0,0 +1,57 @@
+# Generated by Django 3.1.2 on 2026-10-18 14:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_recipients(apps, schema_editor):
+    Announcement = apps.get_model('announcements', 'Announcement')
+    AnnouncementInbox = apps.get_model('announcements', 'AnnouncementInbox')
+
+    counts = AnnouncementInbox.objects.values('announcement_id').annotate(total=models.Count('id'))
+    for row in counts.iterator():
+        Announcement.objects.filter(id=row['announcement_id']).update(recipient_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('announcements', '0011_announcement_file_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='acknowledged_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='recipient_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='announcementinbox',
+            index=models.Index(fields=['announcement', 'created_at', 'id'], name='announcement_inbox_recip_idx'),
+        ),
+        migrations.CreateModel(
+            name='AnnouncementAcknowledgement',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='acknowledgements', to='announcements.announcement')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='announcement_acknowledgements', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='announcementacknowledgement',
+            index=models.Index(fields=['announcement', 'created_at', 'id'], name='announcement_ack_page_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='announcementacknowledgement',
+            constraint=models.UniqueConstraint(fields=('announcement', 'user'), name='announcement_ack_unique'),
+        ),
+        migrations.RunPython(count_recipients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.1.2 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0012_announcement_acknowledgements'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='expire_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Scheduled'), ('live', 'Live'), ('expired', 'Expired')], default='live', editable=False, max_length=10),
+        ),
+        migrations.RemoveIndex(
+            model_name='announcement',
+            name='announcement_org_feed_idx',
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(condition=models.Q(('is_active', True), ('status', 'live')), fields=['organization', 'date', 'id'], name='announcement_live_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(condition=models.Q(('is_active', True), ('status', 'scheduled')), fields=['publish_at'], name='announcement_publish_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(condition=models.Q(('expire_at__isnull', False), ('is_active', True), ('status', 'live')), fields=['expire_at'], name='announcement_expire_due_idx'),
+        ),
+    ]
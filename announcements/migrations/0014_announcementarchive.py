@@ -0,0 +1,50 @@
+# Generated by Django 3.1.2 on 2026-10-18 16:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('announcements', '0013_announcement_schedule'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(condition=models.Q(('is_active', True), ('status', 'live')), fields=['date', 'id'], name='announcement_live_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['created_at'], name='announcement_created_idx'),
+        ),
+        migrations.CreateModel(
+            name='AnnouncementArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateTimeField(blank=True, null=True)),
+                ('is_public', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('live', 'Live'), ('expired', 'Expired')], default='live', max_length=10)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='announcement_archive_organization', to='organizations.organization')),
+                ('sender_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcement_archive_sender_class', to='classes.class')),
+                ('sender_department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcement_archive_sender_department', to='departments.department')),
+                ('sender_teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcement_archive_sender_teacher', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='announcement_archive_user', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='announcementarchive',
+            index=models.Index(fields=['organization', 'date', 'id'], name='announcement_archive_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='announcementarchive',
+            index=models.Index(fields=['date', 'id'], name='announcement_archive_date_idx'),
+        ),
+    ]
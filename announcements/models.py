@@ -1,29 +1,163 @@
+import uuid
+
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
 
 # Create your models here.
 
+SCHEDULED = 'scheduled'
+LIVE = 'live'
+EXPIRED = 'expired'
+
+ANNOUNCEMENT_STATUS_OPTIONS = (
+    (SCHEDULED, 'Scheduled'),
+    (LIVE, 'Live'),
+    (EXPIRED, 'Expired'),
+)
+
 class Announcement(models.Model):
     user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='announcement_user')
     organization = models.ForeignKey('organizations.Organization', on_delete=models.CASCADE, related_name='announcement_organization')
 
     title = models.CharField(max_length=250)
     description = models.TextField(blank=True, null=True)
-    data = models.TextField(blank=True,null=True)
+    data = models.JSONField(blank=True, null=True)
     date = models.DateTimeField(blank=True, null=True)
     visible = models.TextField(blank=True,null=True)
-    From = models.TextField(blank=True,null=True)
+    From = models.JSONField(blank=True, null=True)
+    sender_department = models.ForeignKey('departments.Department', blank=True, null=True, on_delete=models.SET_NULL, related_name='announcement_sender_department')
+    sender_class = models.ForeignKey('classes.Class', blank=True, null=True, on_delete=models.SET_NULL, related_name='announcement_sender_class')
+    sender_teacher = models.ForeignKey('users.User', blank=True, null=True, on_delete=models.SET_NULL, related_name='announcement_sender_teacher')
     is_public = models.BooleanField(default=False)
+    publish_at = models.DateTimeField(blank=True, null=True)
+    expire_at = models.DateTimeField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=ANNOUNCEMENT_STATUS_OPTIONS, default=LIVE, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     acknowledge = models.BooleanField(default=False)
+    acknowledged_count = models.PositiveIntegerField(default=0)
+    recipient_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'date', 'id'], name='announcement_live_feed_idx', condition=models.Q(is_active=True, status=LIVE)),
+            models.Index(fields=['date', 'id'], name='announcement_live_date_idx', condition=models.Q(is_active=True, status=LIVE)),
+            models.Index(fields=['created_at'], name='announcement_created_idx'),
+            models.Index(fields=['publish_at'], name='announcement_publish_due_idx', condition=models.Q(is_active=True, status=SCHEDULED)),
+            models.Index(fields=['expire_at'], name='announcement_expire_due_idx', condition=models.Q(is_active=True, status=LIVE, expire_at__isnull=False)),
+        ]
+
+    COUNTER_FIELDS = ('acknowledged_count', 'recipient_count')
 
     def __str__(self):
         return str(self.title)
 
+    def get_status(self, now=None):
+        now = now or timezone.now()
+        if self.expire_at is not None and self.expire_at <= now:
+            return EXPIRED
+        if self.publish_at is not None and self.publish_at > now:
+            return SCHEDULED
+        return LIVE
+
+    def is_live(self):
+        return self.is_active and self.status == LIVE
+
+    def save(self, *args, **kwargs):
+        self.status = self.get_status()
+        # The counters only move through F() updates, so an update never writes back a stale copy of them.
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_audience = instance.get_audience_key()
+        instance._loaded_is_public = instance.__dict__.get('is_public')
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def get_audience_key(self):
+        return (self.__dict__.get('organization_id'), self.__dict__.get('visible'))
+
+    def audience_changed(self):
+        return getattr(self, '_loaded_audience', None) != self.get_audience_key()
+
+class AnnouncementArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='announcement_archive_user')
+    organization = models.ForeignKey('organizations.Organization', on_delete=models.CASCADE, related_name='announcement_archive_organization')
+    date = models.DateTimeField(blank=True, null=True)
+    sender_department = models.ForeignKey('departments.Department', blank=True, null=True, on_delete=models.SET_NULL, related_name='announcement_archive_sender_department')
+    sender_class = models.ForeignKey('classes.Class', blank=True, null=True, on_delete=models.SET_NULL, related_name='announcement_archive_sender_class')
+    sender_teacher = models.ForeignKey('users.User', blank=True, null=True, on_delete=models.SET_NULL, related_name='announcement_archive_sender_teacher')
+    is_public = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=ANNOUNCEMENT_STATUS_OPTIONS, default=LIVE)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'date', 'id'], name='announcement_archive_feed_idx'),
+            models.Index(fields=['date', 'id'], name='announcement_archive_date_idx'),
+        ]
+
 class AnnouncementFile(models.Model):
     announcement = models.ForeignKey('Announcement', on_delete=models.CASCADE, related_name='Announcementfiles')
     file = models.FileField(upload_to='announcement/files/')
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    size = models.BigIntegerField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+
+class AnnouncementUpload(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='announcement_upload_user')
+    announcement = models.ForeignKey('Announcement', on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    is_complete = models.BooleanField(default=False)
+
+class AnnouncementInbox(models.Model):
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='announcement_inbox')
+    announcement = models.ForeignKey('Announcement', on_delete=models.CASCADE, related_name='inbox_entries')
+    organization = models.ForeignKey('organizations.Organization', on_delete=models.CASCADE, related_name='announcement_inbox_organization')
+    date = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'announcement'], name='announcement_inbox_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'is_active', 'date', 'id'], name='announcement_inbox_feed_idx'),
+            models.Index(fields=['announcement', 'created_at', 'id'], name='announcement_inbox_recip_idx'),
+        ]
+
+class AnnouncementAcknowledgement(models.Model):
+    announcement = models.ForeignKey('Announcement', on_delete=models.CASCADE, related_name='acknowledgements')
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='announcement_acknowledgements')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['announcement', 'user'], name='announcement_ack_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['announcement', 'created_at', 'id'], name='announcement_ack_page_idx'),
+        ]
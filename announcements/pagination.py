@@ -0,0 +1,181 @@
+import base64
+import heapq
+import json
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination ordered by (date_field, id_field).
+
+    Rows are ordered by date ascending with NULL dates last, then by id, which
+    is the natural order of a btree index ending in (date_field, id_field).
+    Every page is a seek from the last row seen instead of an OFFSET, so page N
+    costs the same as page 1.
+
+    Cursors are opaque url-safe strings holding the boundary row and the
+    direction to read in.
+    """
+
+    def __init__(self, date_field='date', id_field='id', page_size=DEFAULT_PAGE_SIZE, max_page_size=MAX_PAGE_SIZE):
+        self.date_field = date_field
+        self.id_field = id_field
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    def get_page_size(self, query_params):
+        try:
+            page_size = int(query_params.get('page_size', self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+
+        if page_size < 1:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, row, reverse=False):
+        date = getattr(row, self.date_field)
+        payload = {
+            "d": date.isoformat() if date else None,
+            "i": getattr(row, self.id_field),
+            "r": 1 if reverse else 0,
+        }
+        cursor = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode())
+        return cursor.decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            date = parse_datetime(payload["d"]) if payload["d"] else None
+            if payload["d"] and date is None:
+                raise ValueError(payload["d"])
+            return date, int(payload["i"]), bool(payload["r"])
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError, json.JSONDecodeError):
+            raise InvalidCursor(cursor)
+
+    def _after(self, date, pk):
+        date_field, id_field = self.date_field, self.id_field
+        if date is None:
+            return Q(**{f'{date_field}__isnull': True, f'{id_field}__gt': pk})
+        return (
+            Q(**{f'{date_field}__gt': date})
+            | Q(**{date_field: date, f'{id_field}__gt': pk})
+            | Q(**{f'{date_field}__isnull': True})
+        )
+
+    def _before(self, date, pk):
+        date_field, id_field = self.date_field, self.id_field
+        if date is None:
+            return Q(**{f'{date_field}__isnull': False}) | Q(**{f'{date_field}__isnull': True, f'{id_field}__lt': pk})
+        return Q(**{f'{date_field}__lt': date}) | Q(**{date_field: date, f'{id_field}__lt': pk})
+
+    def _sort_key(self, row):
+        date = getattr(row, self.date_field)
+        return (date is None, date, getattr(row, self.id_field))
+
+    def paginate(self, qs, query_params):
+        """
+        Returns (rows, next_cursor, previous_cursor) for the page selected by
+        the `cursor` and `page_size` query params. Raises InvalidCursor for a
+        cursor that was not produced by encode_cursor.
+        """
+        return self.paginate_many([qs], query_params)
+
+    def paginate_many(self, querysets, query_params):
+        """
+        Like paginate, over the rows of several querysets sharing the same
+        (date_field, id_field) key space. Each queryset is seeked on its own
+        and the pages are merged, so no queryset is read past page_size + 1.
+        """
+        page_size = self.get_page_size(query_params)
+        cursor = query_params.get('cursor', None)
+
+        date, pk, reverse = (None, None, False)
+        if cursor:
+            date, pk, reverse = self.decode_cursor(cursor)
+
+        rows = []
+        for qs in querysets:
+            if reverse:
+                qs = qs.filter(self._before(date, pk)).order_by(
+                    F(self.date_field).desc(nulls_first=True), '-' + self.id_field
+                )
+            else:
+                if cursor:
+                    qs = qs.filter(self._after(date, pk))
+                qs = qs.order_by(F(self.date_field).asc(nulls_last=True), self.id_field)
+            rows.extend(qs[:page_size + 1])
+
+        if len(querysets) > 1:
+            rows.sort(key=self._sort_key, reverse=reverse)
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if reverse:
+            rows.reverse()
+            next_cursor = self.encode_cursor(rows[-1]) if rows else None
+            previous_cursor = self.encode_cursor(rows[0], reverse=True) if rows and has_more else None
+        else:
+            next_cursor = self.encode_cursor(rows[-1]) if rows and has_more else None
+            previous_cursor = self.encode_cursor(rows[0], reverse=True) if rows and cursor else None
+
+        return rows, next_cursor, previous_cursor
+
+    def iterate_many(self, querysets, query_params, chunk_size=500):
+        """
+        Like paginate_many for pages too large to hold in memory. Returns an
+        iterator over the rows of the page, read with server-side cursors and
+        merged on (date_field, id_field), and a function returning
+        (next_cursor, previous_cursor) once the iterator is exhausted.
+
+        Pages read backwards are returned in ascending order, so they are
+        loaded with paginate_many instead.
+        """
+        page_size = self.get_page_size(query_params)
+        cursor = query_params.get('cursor', None)
+
+        date, pk, reverse = (None, None, False)
+        if cursor:
+            date, pk, reverse = self.decode_cursor(cursor)
+
+        if reverse:
+            rows, next_cursor, previous_cursor = self.paginate_many(querysets, query_params)
+            return iter(rows), lambda: (next_cursor, previous_cursor)
+
+        iterators = []
+        for qs in querysets:
+            if cursor:
+                qs = qs.filter(self._after(date, pk))
+            qs = qs.order_by(F(self.date_field).asc(nulls_last=True), self.id_field)
+            iterators.append(qs[:page_size + 1].iterator(chunk_size=chunk_size))
+
+        cursors = {'next': None, 'previous': None}
+
+        def rows():
+            first = last = None
+            for count, row in enumerate(heapq.merge(*iterators, key=self._sort_key)):
+                if count == page_size:
+                    cursors['next'] = self.encode_cursor(last)
+                    break
+                if first is None:
+                    first = row
+                last = row
+                yield row
+
+            if first is not None and cursor:
+                cursors['previous'] = self.encode_cursor(first, reverse=True)
+
+        return rows(), lambda: (cursors['next'], cursors['previous'])
@@ -0,0 +1,79 @@
+import hashlib
+import logging
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_FEED_MAX_AGE = getattr(settings, 'ANNOUNCEMENTS_PUBLIC_FEED_MAX_AGE', 60)
+PUBLIC_FEED_SURROGATE_MAX_AGE = getattr(settings, 'ANNOUNCEMENTS_PUBLIC_FEED_SURROGATE_MAX_AGE', 86400)
+PUBLIC_FEED_PURGE_URL = getattr(settings, 'ANNOUNCEMENTS_PUBLIC_FEED_PURGE_URL', None)
+
+
+def version_key(org_id):
+    return f'announcements:public:version:{org_id}'
+
+
+def surrogate_key(org_id):
+    return f'announcements-public-{org_id}'
+
+
+def get_version(org_id):
+    """
+    Returns the current public feed version of an organization.
+
+    A missing counter (cold cache or eviction) restarts from the current time
+    in milliseconds, so it never falls back to a value an earlier ETag used.
+    """
+    key = version_key(org_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(org_id):
+    key = version_key(org_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+    purge(org_id)
+
+
+def purge(org_id):
+    if not PUBLIC_FEED_PURGE_URL:
+        return
+
+    request = urllib.request.Request(
+        PUBLIC_FEED_PURGE_URL,
+        method='PURGE',
+        headers={'Surrogate-Key': surrogate_key(org_id)},
+    )
+    try:
+        urllib.request.urlopen(request, timeout=2).close()
+    except OSError:
+        logger.warning("Could not purge public announcement feed for %s", org_id, exc_info=True)
+
+
+def get_etag(org_id, version, *parts):
+    digest = hashlib.sha1(':'.join(str(p) for p in (org_id, version) + parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def body_key(etag):
+    return f'announcements:public:body:{etag.strip(chr(34))}'
+
+
+def set_cache_headers(response, org_id, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={PUBLIC_FEED_MAX_AGE}'
+    response['Surrogate-Control'] = f'max-age={PUBLIC_FEED_SURROGATE_MAX_AGE}'
+    response['Surrogate-Key'] = surrogate_key(org_id)
+    return response
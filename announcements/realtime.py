@@ -0,0 +1,281 @@
+import asyncio
+import json
+import threading
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+STREAM_PATH = getattr(settings, 'ANNOUNCEMENTS_STREAM_PATH', '/announcements/stream/')
+KEEPALIVE_SECONDS = getattr(settings, 'ANNOUNCEMENTS_STREAM_KEEPALIVE', 15)
+QUEUE_SIZE = 100
+
+
+def org_channel(org_id):
+    return f'org:{org_id}'
+
+
+def dept_channel(dept_id):
+    return f'dept:{dept_id}'
+
+
+class InProcessBroker:
+    """
+    Fans messages out to subscribers living in this process.
+
+    Publishers are regular Django threads; subscribers are asyncio queues on
+    the ASGI event loop, so messages cross over with call_soon_threadsafe. A
+    subscriber that stops reading loses its oldest messages instead of growing
+    without bound.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, channels):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        subscription = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, channels, subscription):
+        with self._lock:
+            for channel in channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def has_subscribers(self, channels):
+        with self._lock:
+            return any(channel in self._subscribers for channel in channels)
+
+    def publish(self, channels, message):
+        with self._lock:
+            subscriptions = set()
+            for channel in channels:
+                subscriptions.update(self._subscribers.get(channel, ()))
+
+        for loop, queue in subscriptions:
+            loop.call_soon_threadsafe(_put_dropping_oldest, queue, message)
+
+
+def _put_dropping_oldest(queue, message):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+# Brokers set with ANNOUNCEMENTS_REALTIME_BROKER implement subscribe, unsubscribe, has_subscribers and publish.
+broker = import_string(getattr(settings, 'ANNOUNCEMENTS_REALTIME_BROKER', 'announcements.realtime.InProcessBroker'))()
+
+
+def publish_announcements(events):
+    """
+    Publishes every (announcement, event, org_id, dept_ids) of `events` to
+    the channels of its announcement as a (recipients, message) pair.
+    Recipients are the users holding an inbox row for the announcement and
+    its author; subscribers skip events that are not addressed to them.
+    Called once the inbox has been synced.
+
+    Events of channels nobody is subscribed to are dropped before anything
+    is serialized, and the recipients of the others are read with one query.
+    """
+    from . import models, serializers
+
+    pending = []
+    for announcement, event, org_id, dept_ids in events:
+        channels = [org_channel(org_id)] + [dept_channel(dept_id) for dept_id in dept_ids]
+        if broker.has_subscribers(channels):
+            pending.append((announcement, event, channels))
+
+    if not pending:
+        return
+
+    recipients = {}
+    for announcement_id, user_id in models.AnnouncementInbox.objects.filter(
+        announcement_id__in={announcement.id for announcement, _, _ in pending},
+    ).values_list('announcement_id', 'user_id'):
+        recipients.setdefault(announcement_id, set()).add(user_id)
+
+    data = serializers.AnnouncementSerializer([announcement for announcement, _, _ in pending], many=True).data
+    for (announcement, event, channels), item in zip(pending, data):
+        users = recipients.get(announcement.id, set()) | {announcement.user_id}
+        broker.publish(channels, (frozenset(users), json.dumps({"event": event, "announcement": item})))
+
+
+def _authenticate(keyword, key):
+    """
+    Returns (user, role claims) for a DRF token or, with the Bearer keyword,
+    a signed access token, or (None, None). Role claims are only known for
+    signed tokens.
+    """
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+    from rest_framework.exceptions import AuthenticationFailed
+    from utils.signed_tokens import read_token
+
+    if keyword == 'bearer':
+        try:
+            claims = read_token(key)
+        except AuthenticationFailed:
+            return None, None
+        user = get_user_model()._default_manager.filter(pk=claims['uid'], is_active=True).first()
+        return (user, claims['orgs']) if user is not None else (None, None)
+
+    token = Token.objects.select_related('user').filter(key=key).first()
+    if token is None or not token.user.is_active:
+        return None, None
+    return token.user, None
+
+
+def _can_subscribe(user, org_ids, dept_ids, roles=None):
+    """
+    Whether `user` is a member of every organization and department it asks
+    to subscribe to. Any role in an organization is enough for its channel;
+    a department channel is open to the head of the department, to the
+    admin and teachers of its organization and to the students of its
+    sections. `roles` are the claims of a signed token, read from the
+    database when not given.
+    """
+    from students import models as student_models
+    from utils.resolvers import Resolver
+    from utils.signed_tokens import get_role_claims
+
+    if roles is None:
+        roles = get_role_claims(user)
+    if any(str(org_id) not in roles for org_id in org_ids):
+        return False
+
+    resolver = Resolver()
+    for dept_id in dept_ids:
+        department = resolver.department(dept_id)
+        if department is None:
+            return False
+
+        if resolver.is_department_user(user, department):
+            continue
+
+        if {'org_admin', 'teacher'} & set(roles.get(str(department.organization.org_id), ())):
+            continue
+
+        if not student_models.Student.objects.filter(
+            user=user, is_active=True, section__of_class__department=department,
+        ).exists():
+            return False
+
+    return True
+
+
+def _get_credentials(scope, query):
+    """
+    Returns (keyword, key) from the Authorization header, or from ?token= or
+    ?access_token= for EventSource clients that cannot set headers.
+    """
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            parts = value.decode('latin1').split()
+            if len(parts) == 2 and parts[0].lower() in ('token', 'bearer'):
+                return parts[0].lower(), parts[1]
+
+    if query.get('access_token'):
+        return 'bearer', query['access_token'][0]
+    return 'token', query.get('token', [None])[0]
+
+
+async def _send_plain(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps({'details': [body]}).encode()})
+
+
+async def stream(scope, receive, send):
+    """
+    Server-Sent Events stream of announcement changes.
+
+    Subscribe with ?org_id=<org_id> and/or ?dept_id=<dept_id>; authenticate
+    with the usual `Authorization: Token <key>` header, a signed access
+    token in `Authorization: Bearer <token>`, or ?token=<key> and
+    ?access_token=<token> for EventSource clients that cannot set headers. Only members may subscribe
+    to a channel, and only the events of announcements addressed to the
+    user are sent.
+    """
+    query = parse_qs(scope.get('query_string', b'').decode())
+    org_ids = list(dict.fromkeys(query.get('org_id', [])))
+    dept_ids = list(dict.fromkeys(query.get('dept_id', [])))
+    channels = [org_channel(org_id) for org_id in org_ids] + [dept_channel(dept_id) for dept_id in dept_ids]
+
+    if not channels:
+        await _send_plain(send, 400, 'org_id or dept_id is required')
+        return
+
+    keyword, key = _get_credentials(scope, query)
+    user, roles = await sync_to_async(_authenticate)(keyword, key) if key else (None, None)
+    if user is None:
+        await _send_plain(send, 401, 'Authentication credentials were not provided.')
+        return
+
+    if not await sync_to_async(_can_subscribe)(user, org_ids, dept_ids, roles):
+        await _send_plain(send, 403, 'You do not have permission to subscribe to these channels.')
+        return
+
+    subscription = broker.subscribe(channels)
+    _, queue = subscription
+
+    async def wait_for_disconnect():
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+    disconnected = asyncio.ensure_future(wait_for_disconnect())
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+
+        while not disconnected.done():
+            try:
+                recipients, message = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                chunk = b': keepalive\n\n'
+            else:
+                if user.id not in recipients:
+                    continue
+                chunk = f'event: announcement\ndata: {message}\n\n'.encode()
+
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    finally:
+        broker.unsubscribe(channels, subscription)
+        disconnected.cancel()
+
+
+def router(django_application):
+    """
+    Wraps the Django ASGI application, answering STREAM_PATH with the event
+    stream and passing every other request through.
+    """
+    async def application(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+            await stream(scope, receive, send)
+            return
+        await django_application(scope, receive, send)
+
+    return application
@@ -0,0 +1,91 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import models
+from .signals import announcements_saved
+
+
+BATCH_SIZE = 500
+MAX_SLEEP_SECONDS = getattr(settings, 'ANNOUNCEMENTS_SCHEDULER_MAX_SLEEP', 60)
+
+
+def due_to_publish(now):
+    return models.Announcement.objects.filter(
+        is_active=True, status=models.SCHEDULED, publish_at__lte=now
+    ).order_by('publish_at')
+
+
+def due_to_expire(now):
+    return models.Announcement.objects.filter(
+        is_active=True, status=models.LIVE, expire_at__lte=now
+    ).order_by('expire_at')
+
+
+def apply_due(now=None):
+    """
+    Moves every announcement whose publish_at or expire_at has passed into
+    its new status and returns how many moved.
+
+    Rows are read from the partial due-time indexes in batches of BATCH_SIZE,
+    each batch becomes one UPDATE per target status, and rows locked by
+    another scheduler are skipped rather than waited on.
+    """
+    now = now or timezone.now()
+    moved = 0
+
+    for due in (due_to_publish, due_to_expire):
+        while True:
+            with transaction.atomic():
+                batch = list(due(now).select_for_update(skip_locked=True, of=('self',)).select_related('organization')[:BATCH_SIZE])
+                if not batch:
+                    break
+
+                transitions = {}
+                for announcement in batch:
+                    announcement.status = announcement.get_status(now)
+                    transitions.setdefault(announcement.status, []).append(announcement.id)
+
+                for new_status, ids in transitions.items():
+                    models.Announcement.objects.filter(id__in=ids).update(status=new_status)
+
+                announcements_saved(batch)
+
+            moved += len(batch)
+
+    return moved
+
+
+def next_due():
+    """
+    Returns the earliest pending publish_at/expire_at, or None when nothing
+    is scheduled.
+    """
+    publish_at = models.Announcement.objects.filter(
+        is_active=True, status=models.SCHEDULED
+    ).order_by('publish_at').values_list('publish_at', flat=True).first()
+    expire_at = models.Announcement.objects.filter(
+        is_active=True, status=models.LIVE, expire_at__isnull=False
+    ).order_by('expire_at').values_list('expire_at', flat=True).first()
+
+    due = [i for i in (publish_at, expire_at) if i is not None]
+    return min(due) if due else None
+
+
+def run(max_sleep=MAX_SLEEP_SECONDS):
+    """
+    Applies due transitions, then sleeps until the next due time instead of
+    polling. The sleep is capped at max_sleep so announcements scheduled by
+    other processes in the meantime are picked up.
+    """
+    while True:
+        apply_due()
+
+        sleep = max_sleep
+        due = next_due()
+        if due is not None:
+            sleep = min(max((due - timezone.now()).total_seconds(), 0), max_sleep)
+
+        time.sleep(sleep)
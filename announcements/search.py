@@ -0,0 +1,144 @@
+import base64
+import html
+import json
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .pagination import KeysetPaginator, InvalidCursor
+
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'announcements_announcement_fts'
+
+# Matches are delimited with control characters and only turned into <b> tags once the text around them is escaped.
+START_SEL = '\x02'
+STOP_SEL = '\x03'
+
+
+def _fts5_query(q):
+    # Quote every term so user input is never parsed as FTS5 syntax.
+    return ' '.join('"%s"' % term.replace('"', '""') for term in q.split())
+
+
+def index_announcements(announcements):
+    """
+    Refreshes the SQLite FTS5 rows of `announcements`. PostgreSQL maintains
+    search_vector with a trigger, so this is a no-op there.
+    """
+    announcements = [announcement for announcement in announcements if announcement.id]
+    if connection.vendor != 'sqlite' or not announcements:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(announcement.id,) for announcement in announcements],
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (%s, %s, %s)',
+            [(announcement.id, announcement.title, announcement.description or '') for announcement in announcements],
+        )
+
+
+def unindex_announcements(ids):
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(i,) for i in ids])
+
+
+def search(qs, q):
+    """
+    Filters `qs` down to announcements matching `q` and orders them by
+    relevance, annotating each row with `rank` and a `snippet` to pass
+    through render_snippet.
+
+    PostgreSQL uses the trigger-maintained search_vector column and its GIN
+    index; SQLite uses the FTS5 table kept up to date by index_announcements.
+    """
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(q, config=SEARCH_CONFIG, search_type='websearch')
+        return qs.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            snippet=SearchHeadline(
+                'description', query, config=SEARCH_CONFIG,
+                start_sel=START_SEL, stop_sel=STOP_SEL, max_words=35, min_words=15,
+            ),
+        ).order_by('-rank', '-id')
+
+    if connection.vendor == 'sqlite':
+        match = _fts5_query(q)
+        table = qs.model._meta.db_table
+        return qs.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            rank=RawSQL(
+                f'(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id)',
+                [match],
+            ),
+            snippet=RawSQL(
+                f"(SELECT snippet({FTS_TABLE}, 1, %s, %s, '...', 24) FROM {FTS_TABLE} "
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id)',
+                [START_SEL, STOP_SEL, match],
+            ),
+        ).order_by('-rank', '-id')
+
+    return qs.filter(Q(title__icontains=q) | Q(description__icontains=q)).annotate(
+        rank=Value(0.0), snippet=F('description'),
+    ).order_by('-id')
+
+
+def render_snippet(snippet):
+    """
+    Returns `snippet` as HTML: the description text escaped, with the
+    matches wrapped in <b>.
+    """
+    if not snippet:
+        return snippet
+
+    parts = []
+    for i, part in enumerate(snippet.split(START_SEL)):
+        if i:
+            match, _, part = part.partition(STOP_SEL)
+            parts.append(f'<b>{html.escape(match)}</b>')
+        parts.append(html.escape(part.replace(STOP_SEL, '')))
+    return ''.join(parts)
+
+
+def encode_cursor(row):
+    payload = {"k": row.rank, "i": row.id}
+    cursor = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode())
+    return cursor.decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return float(payload["k"]), int(payload["i"])
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError, json.JSONDecodeError):
+        raise InvalidCursor(cursor)
+
+
+def paginate(results, query_params):
+    """
+    Returns (rows, next_cursor) for the page of search `results` selected by
+    the `cursor` and `page_size` query params. Like KeysetPaginator it seeks
+    from the last row seen, here on the (rank, id) order of search(). Raises
+    InvalidCursor.
+    """
+    page_size = KeysetPaginator().get_page_size(query_params)
+    cursor = query_params.get('cursor', None)
+
+    if cursor:
+        rank, pk = decode_cursor(cursor)
+        results = results.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=pk))
+
+    rows = list(results[:page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
@@ -1,9 +1,47 @@
 from rest_framework import serializers
 from . import models
+from utils.fieldsets import SparseFieldsetMixin
+from utils.prefetching import PlannedListSerializer
 
 
-class AnnouncementSerializer(serializers.ModelSerializer):
+def validate_schedule(serializer, attrs):
+    instance = serializer.instance
+    publish_at = attrs.get('publish_at', getattr(instance, 'publish_at', None))
+    expire_at = attrs.get('expire_at', getattr(instance, 'expire_at', None))
+
+    if publish_at and expire_at and expire_at <= publish_at:
+        raise serializers.ValidationError({'expire_at': 'expire_at should be after publish_at'})
+    return attrs
+
+
+class AnnouncementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = models.Announcement
+        exclude = ("search_vector",)
+        # The sender is set from the validated user_type and From of the POST, never from the request data.
+        read_only_fields = ("From", "sender_department", "sender_class", "sender_teacher", "acknowledged_count", "recipient_count")
+        list_serializer_class = PlannedListSerializer
+
+    def validate(self, attrs):
+        return validate_schedule(self, attrs)
+
+
+class AnnouncementBulkSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Announcement
+        exclude = ("user", "organization", "From", "sender_department", "sender_class", "sender_teacher", "is_active", "search_vector", "acknowledged_count", "recipient_count")
+
+    def validate(self, attrs):
+        return validate_schedule(self, attrs)
+
+
+class AnnouncementFileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.AnnouncementFile
         fields = "__all__"
 
+
+class AnnouncementUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.AnnouncementUpload
+        fields = "__all__"
@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import models, inbox, public_feed, realtime, search
+
+
+def _touches_public_feed(instance):
+    return instance.is_public or getattr(instance, '_loaded_is_public', None)
+
+
+def _get_event(instance, created):
+    # Subscribers only hear about announcements that are, or just stopped being, live.
+    was_live = not created and getattr(instance, '_loaded_status', models.LIVE) == models.LIVE
+
+    if created:
+        return 'created' if instance.status == models.LIVE else None
+    if not instance.is_active:
+        return 'deactivated' if was_live else None
+    if instance.status == models.LIVE:
+        return 'updated' if was_live else 'published'
+    return 'expired' if was_live else None
+
+
+def announcements_saved(instances, created=False):
+    """
+    Propagates saved announcements to the search index, then to the inbox,
+    the event stream and the public feed once the transaction commits.
+
+    post_save calls this for single rows; bulk writes call it directly since
+    bulk_create, bulk_update and update() send no signals.
+    """
+    changes = []
+    events = []
+    public_orgs = set()
+
+    for instance in instances:
+        org_id = instance.organization.org_id
+
+        changes.append((instance, created or instance.audience_changed()))
+        if _touches_public_feed(instance):
+            public_orgs.add(org_id)
+
+        event = _get_event(instance, created)
+        if event:
+            events.append((instance, event, org_id, inbox.parse_visible(instance.visible)["departments"]))
+
+        instance._loaded_audience = instance.get_audience_key()
+        instance._loaded_is_public = instance.is_public
+        instance._loaded_status = instance.status
+
+    search.index_announcements([instance for instance, _ in changes])
+
+    def apply():
+        inbox.sync_inboxes(changes)
+        realtime.publish_announcements(events)
+        for org_id in public_orgs:
+            public_feed.bump_version(org_id)
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=models.Announcement)
+def announcement_saved(sender, instance, created, **kwargs):
+    announcements_saved([instance], created)
+
+
+@receiver(post_delete, sender=models.Announcement)
+def announcement_deleted(sender, instance, **kwargs):
+    search.unindex_announcements([instance.id])
+
+    if _touches_public_feed(instance):
+        org_id = instance.organization.org_id
+        transaction.on_commit(lambda: public_feed.bump_version(org_id))
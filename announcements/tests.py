@@ -1,3 +1,634 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import tempfile
+import uuid
+from datetime import time, timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import models, serializers, archive, files, inbox, public_feed, realtime, search
+from .pagination import KeysetPaginator, InvalidCursor
+from departments import models as departments_models
+from organizations import models as organizations_models
+from teachers import models as teachers_models
+from utils import renderers, signed_tokens, values
+
+
+class AnnouncementTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(email='owner@example.com', password='password')
+        cls.head = User.objects.create_user(email='head@example.com', password='password')
+        cls.outsider = User.objects.create_user(email='outsider@example.com', password='password')
+
+        cls.organization = organizations_models.Organization.objects.create(user=cls.owner, name='Example school')
+        cls.other_organization = organizations_models.Organization.objects.create(user=cls.outsider, name='Other school')
+        cls.department = departments_models.Department.objects.create(
+            user=cls.head, name='Science', organization=cls.organization,
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def create_announcement(self, **kwargs):
+        kwargs.setdefault('user', self.owner)
+        kwargs.setdefault('organization', self.organization)
+        kwargs.setdefault('title', 'Classes resume on Monday')
+        kwargs.setdefault('date', timezone.now())
+        return models.Announcement.objects.create(**kwargs)
+
+
+class KeysetPaginatorCursorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.paginator = KeysetPaginator()
+
+    def test_cursor_round_trip(self):
+        row = models.Announcement(id=42, date=timezone.now())
+        cursor = self.paginator.encode_cursor(row, reverse=True)
+        self.assertEqual(self.paginator.decode_cursor(cursor), (row.date, 42, True))
+
+    def test_cursor_for_a_null_date(self):
+        cursor = self.paginator.encode_cursor(models.Announcement(id=7, date=None))
+        self.assertEqual(self.paginator.decode_cursor(cursor), (None, 7, False))
+
+    def test_tampered_cursor_is_rejected(self):
+        for cursor in ('not-a-cursor', 'eyJkIjoieCJ9', ''):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                self.paginator.decode_cursor(cursor)
+
+    def test_page_size_is_capped(self):
+        self.assertEqual(self.paginator.get_page_size({'page_size': '1000'}), 100)
+        self.assertEqual(self.paginator.get_page_size({'page_size': '0'}), 20)
+        self.assertEqual(self.paginator.get_page_size({'page_size': 'x'}), 20)
+
+
+class KeysetPaginatorTests(AnnouncementTestCase):
+
+    def setUp(self):
+        start = timezone.now() - timedelta(days=1)
+        # Two rows share a date so the id breaks the tie, one has no date and sorts last.
+        dates = [start, start + timedelta(minutes=1), start + timedelta(minutes=1), start + timedelta(minutes=2), None]
+        self.announcements = [self.create_announcement(title=f'Announcement {i}', date=date) for i, date in enumerate(dates)]
+        self.qs = models.Announcement.objects.filter(id__in=[announcement.id for announcement in self.announcements])
+
+    def read_forward(self, page_size):
+        paginator, seen, cursor = KeysetPaginator(), [], None
+        while True:
+            params = {'page_size': page_size}
+            if cursor:
+                params['cursor'] = cursor
+            rows, cursor, _ = paginator.paginate(self.qs, params)
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                return seen
+
+    def test_pages_visit_every_row_once_in_order(self):
+        expected = [announcement.id for announcement in self.announcements]
+        for page_size in (1, 2, 3, 5, 10):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.read_forward(page_size), expected)
+
+    def test_iterate_many_matches_paginate_many(self):
+        archived = self.announcements[1]
+        archive.archive_announcements([archived])
+        querysets = [self.qs, models.AnnouncementArchive.objects.filter(id__in=[a.id for a in self.announcements])]
+
+        paginator, cursor = KeysetPaginator(), None
+        while True:
+            params = {'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            expected, next_cursor, previous_cursor = paginator.paginate_many(querysets, params)
+            rows, get_cursors = paginator.iterate_many(querysets, params)
+
+            self.assertEqual([(type(row), row.id) for row in rows], [(type(row), row.id) for row in expected])
+            self.assertEqual(get_cursors(), (next_cursor, previous_cursor))
+            cursor = next_cursor
+            if cursor is None:
+                break
+
+    def test_previous_cursor_returns_the_page_before(self):
+        paginator = KeysetPaginator()
+        first, next_cursor, previous_cursor = paginator.paginate(self.qs, {'page_size': 2})
+        self.assertIsNone(previous_cursor)
+
+        second, _, previous_cursor = paginator.paginate(self.qs, {'page_size': 2, 'cursor': next_cursor})
+        self.assertNotEqual(second, first)
+
+        back, _, _ = paginator.paginate(self.qs, {'page_size': 2, 'cursor': previous_cursor})
+        self.assertEqual([row.id for row in back], [row.id for row in first])
+
+
+class ResolveAudienceTests(AnnouncementTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        User = get_user_model()
+        cls.teacher = User.objects.create_user(email='teacher@example.com', password='password')
+        teachers_models.Teacher.objects.create(user=cls.teacher, organization=cls.organization)
+        cls.other_head = User.objects.create_user(email='other-head@example.com', password='password')
+        cls.other_department = departments_models.Department.objects.create(
+            user=cls.other_head, name='Arts', organization=cls.organization,
+        )
+
+    def test_whole_organization(self):
+        audience = inbox.resolve_audience(self.create_announcement(user=self.outsider))
+        self.assertTrue({self.owner.id, self.teacher.id, self.head.id, self.other_head.id} <= audience)
+
+    def test_targeted_departments_still_reach_teachers_and_the_admin(self):
+        announcement = self.create_announcement(
+            user=self.outsider, visible=f'{{"departments": ["{self.department.department_id}"]}}',
+        )
+        audience = inbox.resolve_audience(announcement)
+        self.assertTrue({self.owner.id, self.teacher.id, self.head.id} <= audience)
+        self.assertNotIn(self.other_head.id, audience)
+
+    def test_author_is_not_a_recipient(self):
+        announcement = self.create_announcement(user=self.head)
+        self.assertNotIn(self.head.id, inbox.resolve_audience(announcement))
+
+        inbox.sync_inbox(announcement)
+        self.assertFalse(models.AnnouncementInbox.objects.filter(announcement=announcement, user=self.head).exists())
+        announcement.refresh_from_db()
+        self.assertEqual(
+            announcement.recipient_count,
+            models.AnnouncementInbox.objects.filter(announcement=announcement).count(),
+        )
+
+    def test_counters_do_not_go_below_zero(self):
+        announcement = self.create_announcement(user=self.head)
+        models.AnnouncementInbox.objects.create(user=self.outsider, announcement=announcement, organization=self.organization)
+        models.AnnouncementAcknowledgement.objects.create(user=self.outsider, announcement=announcement)
+        models.Announcement.objects.filter(id=announcement.id).update(recipient_count=0, acknowledged_count=0)
+
+        inbox.sync_inbox(announcement)
+
+        announcement.refresh_from_db()
+        self.assertFalse(models.AnnouncementInbox.objects.filter(announcement=announcement, user=self.outsider).exists())
+        self.assertGreaterEqual(announcement.recipient_count, 0)
+        self.assertEqual(announcement.acknowledged_count, 0)
+
+
+class PublicFeedVersionTests(SimpleTestCase):
+
+    def test_bump_moves_the_version_forward(self):
+        version = public_feed.get_version('org-version-test')
+        public_feed.bump_version('org-version-test')
+        self.assertGreater(public_feed.get_version('org-version-test'), version)
+
+    def test_missing_counter_is_created_on_bump(self):
+        cache_key = public_feed.version_key('org-version-missing')
+        public_feed.cache.delete(cache_key)
+        public_feed.bump_version('org-version-missing')
+        self.assertIsNotNone(public_feed.cache.get(cache_key))
+
+
+class RealtimeSubscriptionTests(AnnouncementTestCase):
+
+    def test_members_can_subscribe(self):
+        self.assertTrue(realtime._can_subscribe(self.owner, [self.organization.org_id], [self.department.department_id]))
+        self.assertTrue(realtime._can_subscribe(self.head, [self.organization.org_id], [self.department.department_id]))
+
+    def test_outsiders_cannot_subscribe(self):
+        self.assertFalse(realtime._can_subscribe(self.outsider, [self.organization.org_id], []))
+        self.assertFalse(realtime._can_subscribe(self.outsider, [], [self.department.department_id]))
+        self.assertFalse(realtime._can_subscribe(self.owner, [self.other_organization.org_id], []))
+        self.assertFalse(realtime._can_subscribe(self.owner, [], ['no-such-department']))
+
+
+class RecordingBroker:
+
+    def __init__(self, subscribed):
+        self.subscribed = subscribed
+        self.published = []
+
+    def has_subscribers(self, channels):
+        return self.subscribed
+
+    def publish(self, channels, message):
+        self.published.append((channels, message))
+
+
+class PublishAnnouncementsTests(AnnouncementTestCase):
+
+    def setUp(self):
+        self.announcements = [self.create_announcement(title=f'Announcement {i}') for i in range(2)]
+        models.AnnouncementInbox.objects.get_or_create(
+            user=self.head, announcement=self.announcements[0], organization=self.organization,
+        )
+        self.events = [(announcement, 'created', self.organization.org_id, []) for announcement in self.announcements]
+
+    def test_nothing_is_read_without_subscribers(self):
+        broker = RecordingBroker(subscribed=False)
+        with mock.patch.object(realtime, 'broker', broker), self.assertNumQueries(0):
+            realtime.publish_announcements(self.events)
+        self.assertEqual(broker.published, [])
+
+    def test_recipients_are_read_once(self):
+        broker = RecordingBroker(subscribed=True)
+        with mock.patch.object(realtime, 'broker', broker), self.assertNumQueries(1):
+            realtime.publish_announcements(self.events)
+
+        self.assertEqual([channels for channels, _ in broker.published], [[realtime.org_channel(self.organization.org_id)]] * 2)
+        self.assertEqual(
+            [recipients for _, (recipients, _) in broker.published],
+            [frozenset({self.owner.id, self.head.id}), frozenset({self.owner.id})],
+        )
+        self.assertEqual(json.loads(broker.published[1][1][1])['announcement']['title'], 'Announcement 1')
+
+
+class RealtimeAuthenticationTests(AnnouncementTestCase):
+
+    def test_signed_access_token(self):
+        user, roles = realtime._authenticate('bearer', signed_tokens.issue_tokens(self.owner)['access'])
+
+        self.assertEqual(user, self.owner)
+        self.assertIn('org_admin', roles[str(self.organization.org_id)])
+        self.assertTrue(realtime._can_subscribe(user, [self.organization.org_id], [], roles))
+
+    def test_invalid_signed_token(self):
+        self.assertEqual(realtime._authenticate('bearer', 'not-a-token'), (None, None))
+
+    def test_credentials(self):
+        self.assertEqual(realtime._get_credentials({'headers': [(b'authorization', b'Bearer abc')]}, {}), ('bearer', 'abc'))
+        self.assertEqual(realtime._get_credentials({}, {'access_token': ['abc']}), ('bearer', 'abc'))
+        self.assertEqual(realtime._get_credentials({}, {'token': ['abc']}), ('token', 'abc'))
+
+
+class FakeBroker:
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    def subscribe(self, channels):
+        queue = asyncio.Queue()
+        for message in self.messages:
+            queue.put_nowait(message)
+        return None, queue
+
+    def unsubscribe(self, channels, subscription):
+        pass
+
+
+class RealtimeStreamTests(SimpleTestCase):
+
+    user = mock.Mock(id=1)
+
+    def run_stream(self, can_subscribe=True, messages=()):
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(0.05)
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'query_string': b'org_id=org-1', 'headers': [(b'authorization', b'Token key')]}
+        with mock.patch.object(realtime, '_authenticate', return_value=(self.user, None)), \
+                mock.patch.object(realtime, '_can_subscribe', return_value=can_subscribe), \
+                mock.patch.object(realtime, 'broker', FakeBroker(messages)), \
+                mock.patch.object(realtime, 'KEEPALIVE_SECONDS', 0.01):
+            async_to_sync(realtime.stream)(scope, receive, send)
+        return sent
+
+    def test_non_members_are_forbidden(self):
+        sent = self.run_stream(can_subscribe=False)
+        self.assertEqual(sent[0]['status'], 403)
+
+    def test_only_addressed_events_are_sent(self):
+        sent = self.run_stream(messages=[
+            (frozenset({2}), '{"event": "created", "for": 2}'),
+            (frozenset({1, 2}), '{"event": "created", "for": 1}'),
+        ])
+        events = [message['body'] for message in sent[1:] if message['body'].startswith(b'event:')]
+        self.assertEqual(events, [b'event: announcement\ndata: {"event": "created", "for": 1}\n\n'])
+
+
+class SearchSnippetTests(SimpleTestCase):
+
+    def test_description_is_escaped_around_matches(self):
+        snippet = f'<script>alert(1)</script> the {search.START_SEL}exam{search.STOP_SEL} is <i>today</i>'
+        self.assertEqual(
+            search.render_snippet(snippet),
+            '&lt;script&gt;alert(1)&lt;/script&gt; the <b>exam</b> is &lt;i&gt;today&lt;/i&gt;',
+        )
+
+    def test_matches_are_escaped_too(self):
+        snippet = f'{search.START_SEL}<img src=x onerror=alert(1)>{search.STOP_SEL}'
+        self.assertEqual(search.render_snippet(snippet), '<b>&lt;img src=x onerror=alert(1)&gt;</b>')
+
+    def test_cursor_round_trip(self):
+        row = mock.Mock(rank=0.0607927, id=12)
+        self.assertEqual(search.decode_cursor(search.encode_cursor(row)), (0.0607927, 12))
+        with self.assertRaises(InvalidCursor):
+            search.decode_cursor('not-a-cursor')
+
+
+class SearchPaginationTests(AnnouncementTestCase):
+
+    def test_pages_visit_every_match_once(self):
+        ids = {
+            self.create_announcement(title=f'Exam {i}', description='The final exam timetable is out.').id
+            for i in range(5)
+        }
+        self.create_announcement(title='Holiday', description='School is closed on Friday.')
+
+        qs = models.Announcement.objects.filter(organization=self.organization)
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            rows, cursor = search.paginate(search.search(qs, 'exam'), params)
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), len(ids))
+        self.assertEqual(set(seen), ids)
+
+
+class AnnouncementFileDownloadTests(AnnouncementTestCase):
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.announcement = self.create_announcement()
+        self.announcement_file = models.AnnouncementFile(announcement=self.announcement, size=5)
+        self.announcement_file.file.save('notes.txt', ContentFile(b'hello'))
+
+    def download(self, user):
+        return self.client_for(user).get(f'/announcements/files/{self.announcement_file.id}/')
+
+    def test_author_can_download(self):
+        self.assertEqual(self.download(self.owner).status_code, 200)
+
+    def test_recipient_can_download(self):
+        models.AnnouncementInbox.objects.get_or_create(
+            user=self.outsider, announcement=self.announcement, organization=self.organization,
+        )
+        self.assertEqual(self.download(self.outsider).status_code, 200)
+
+    def test_other_users_cannot_download(self):
+        models.AnnouncementInbox.objects.filter(user=self.outsider).delete()
+        self.assertEqual(self.download(self.outsider).status_code, 400)
+
+    def test_public_announcement_files_are_open(self):
+        self.announcement.is_public = True
+        self.announcement.save()
+        self.assertEqual(self.download(self.outsider).status_code, 200)
+
+
+class WriteChunkTests(AnnouncementTestCase):
+
+    def setUp(self):
+        upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(upload_dir.cleanup)
+        patcher = mock.patch.object(files, 'UPLOAD_DIR', upload_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.upload = models.AnnouncementUpload.objects.create(
+            user=self.owner, announcement=self.create_announcement(), filename='notes.txt', size=10,
+        )
+
+    def test_chunks_are_appended_in_order(self):
+        self.assertEqual(files.write_chunk(self.upload, io.BytesIO(b'hello'), 0, 4), 5)
+        self.assertEqual(files.write_chunk(self.upload, io.BytesIO(b'world'), 5, 9), 10)
+        with open(files.spool_path(self.upload), 'rb') as spool:
+            self.assertEqual(spool.read(), b'helloworld')
+
+    def test_stale_offset_is_rejected(self):
+        files.write_chunk(self.upload, io.BytesIO(b'hello'), 0, 4)
+        stale = models.AnnouncementUpload.objects.get(id=self.upload.id)
+        stale.offset = 0
+
+        with self.assertRaises(files.UploadError):
+            files.write_chunk(stale, io.BytesIO(b'HELLO'), 0, 4)
+        self.assertEqual(stale.offset, 5)
+        with open(files.spool_path(self.upload), 'rb') as spool:
+            self.assertEqual(spool.read(), b'hello')
+
+    def test_chunk_past_the_declared_size_is_rejected(self):
+        with self.assertRaises(files.UploadError):
+            files.write_chunk(self.upload, io.BytesIO(b'x' * 11), 0, 10)
+        self.assertEqual(models.AnnouncementUpload.objects.get(id=self.upload.id).offset, 0)
+
+
+class AnnouncementBulkCreateTests(AnnouncementTestCase):
+
+    def create(self, titles):
+        return self.client_for(self.owner).post('/announcements/bulk/', {
+            'org_id': self.organization.org_id,
+            'user_type': 'org',
+            'announcements': [{'title': title} for title in titles],
+        }, format='json')
+
+    def test_ids_are_read_back_without_returned_pks(self):
+        self.create_announcement(title='Earlier')
+        with mock.patch.object(connection.features, 'can_return_rows_from_bulk_insert', False), \
+                mock.patch('announcements.views.announcements_saved') as announcements_saved:
+            response = self.create(['First', '', 'Second'])
+
+        self.assertEqual(response.status_code, 200)
+        details = response.data['details']
+        self.assertEqual([result['id'] is None for result in details], [False, True, False])
+        self.assertEqual(
+            [models.Announcement.objects.get(id=details[index]['id']).title for index in (0, 2)],
+            ['First', 'Second'],
+        )
+
+        saved = announcements_saved.call_args[0][0]
+        self.assertEqual([announcement.id for announcement in saved], [details[0]['id'], details[2]['id']])
+
+
+class AnnouncementSenderTests(AnnouncementTestCase):
+
+    def test_update_cannot_change_the_sender(self):
+        announcement = self.create_announcement(From={'organization': 'Example school'})
+        response = self.client_for(self.owner).put('/announcements/', {
+            'org_id': self.organization.org_id,
+            'id': announcement.id,
+            'title': 'Updated',
+            'From': {'organization': 'Someone else'},
+            'sender_teacher': self.outsider.id,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        announcement.refresh_from_db()
+        self.assertEqual(announcement.title, 'Updated')
+        self.assertEqual(announcement.From, {'organization': 'Example school'})
+        self.assertIsNone(announcement.sender_teacher_id)
+
+    def test_non_numeric_sender_filters_are_rejected(self):
+        client = self.client_for(self.owner)
+        for name in ('sender_class', 'sender_teacher'):
+            response = client.get(f'/announcements/?org_id={self.organization.org_id}&{name}=abc')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data['details'], [f'invalid {name}'])
+
+
+class UploadFilenameTests(AnnouncementTestCase):
+
+    def test_clean_filename(self):
+        self.assertEqual(files.clean_filename('../../etc/my "notes".txt'), 'my_notes.txt')
+        self.assertEqual(files.clean_filename('C:\\Users\\me\\report.pdf'), 'report.pdf')
+        for filename in ('..', '.', 'folder/', '   '):
+            self.assertIsNone(files.clean_filename(filename))
+
+    def test_content_disposition_is_quoted(self):
+        self.assertEqual(files.content_disposition('a"b.txt'), 'inline; filename="a\\"b.txt"')
+        self.assertEqual(files.content_disposition('résumé.pdf'), "inline; filename*=utf-8''r%C3%A9sum%C3%A9.pdf")
+
+    def test_dot_names_are_rejected(self):
+        announcement = self.create_announcement()
+        response = self.client_for(self.owner).post('/announcements/files/uploads/', {
+            'id': announcement.id, 'filename': '..', 'size': 10,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['details'], ['invalid filename'])
+        self.assertFalse(models.AnnouncementUpload.objects.exists())
+
+    def test_stored_name_is_cleaned(self):
+        announcement = self.create_announcement()
+        response = self.client_for(self.owner).post('/announcements/files/uploads/', {
+            'id': announcement.id, 'filename': 'dir/my notes.txt', 'size': 10,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(models.AnnouncementUpload.objects.get().filename, 'my_notes.txt')
+
+
+class ArchiveAnnouncementsTests(AnnouncementTestCase):
+
+    def setUp(self):
+        self.announcement = self.create_announcement(user=self.head)
+        models.AnnouncementInbox.objects.create(user=self.owner, announcement=self.announcement, organization=self.organization)
+        models.AnnouncementAcknowledgement.objects.create(user=self.owner, announcement=self.announcement)
+        announcement_file = models.AnnouncementFile(announcement=self.announcement, content_hash='ab' * 32, size=5)
+        announcement_file.file.name = 'announcement/files/notes.txt'
+        announcement_file.save()
+
+    def test_dependent_rows_travel_in_the_payload(self):
+        self.assertEqual(archive.archive_announcements([self.announcement]), 1)
+        self.assertFalse(models.Announcement.objects.filter(id=self.announcement.id).exists())
+
+        payload = archive.decompress(models.AnnouncementArchive.objects.get(id=self.announcement.id).payload)
+        self.assertEqual(payload['files'], ['announcement/files/notes.txt'])
+        self.assertEqual([row['user_id'] for row in payload['inbox']], [self.owner.id])
+        self.assertEqual([row['user_id'] for row in payload['acknowledgements']], [self.owner.id])
+
+    def test_dependent_rows_are_not_returned_to_clients(self):
+        archive.archive_announcements([self.announcement])
+        data = archive.decompress_announcement(models.AnnouncementArchive.objects.get(id=self.announcement.id).payload)
+        self.assertEqual(data['title'], self.announcement.title)
+        for key in archive.DEPENDENT_KEYS:
+            self.assertNotIn(key, data)
+
+    def test_existing_archive_row_is_overwritten(self):
+        models.AnnouncementArchive.objects.create(
+            id=self.announcement.id, user=self.head, organization=self.organization,
+            created_at=self.announcement.created_at, payload=archive.compress({'title': 'Stale copy'}),
+        )
+        self.announcement.title = 'Current copy'
+        self.announcement.save()
+
+        archive.archive_announcements([self.announcement])
+
+        self.assertFalse(models.Announcement.objects.filter(id=self.announcement.id).exists())
+        payload = archive.decompress(models.AnnouncementArchive.objects.get(id=self.announcement.id).payload)
+        self.assertEqual(payload['title'], 'Current copy')
+
+
+class AnnouncementStreamTests(AnnouncementTestCase):
+
+    def test_stream_is_paged_and_includes_archived_rows(self):
+        announcements = [self.create_announcement(title=f'Announcement {i}') for i in range(3)]
+        archive.archive_announcements(announcements[:1])
+
+        client = self.client_for(self.owner)
+        base = f'/announcements/?org_id={self.organization.org_id}&stream=true&page_size=2'
+
+        response = client.get(base)
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([item['title'] for item in body['details']], ['Announcement 1', 'Announcement 2'])
+        self.assertIsNone(body['next'])
+
+        response = client.get(base + '&include_archived=true')
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([item['title'] for item in body['details']], ['Announcement 0', 'Announcement 1'])
+        self.assertTrue(body['details'][0]['is_archived'])
+        self.assertIsNotNone(body['next'])
+
+        response = client.get(base + f'&include_archived=true&cursor={body["next"]}')
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([item['title'] for item in body['details']], ['Announcement 2'])
+
+
+@skipIf(renderers.orjson is None, 'orjson is not installed')
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_native_types_render_as_drf_renders_them(self):
+        now = timezone.now().replace(microsecond=123456)
+        data = {
+            'at': now,
+            'naive': now.replace(tzinfo=None),
+            'day': now.date(),
+            'time': time(9, 30, 15, 987654),
+            'uuid': uuid.uuid4(),
+            'amount': Decimal('10.25'),
+            'text': 'line\u2028break',
+        }
+        rendered = renderers.FastJSONRenderer().render(data)
+
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        self.assertEqual(json.loads(rendered)['at'], now.isoformat()[:23] + 'Z')
+
+
+class CompileSerializerTests(AnnouncementTestCase):
+
+    def serializer(self, path='/announcements/'):
+        return serializers.AnnouncementSerializer(context={'request': Request(APIRequestFactory().get(path))})
+
+    def test_compiled_once_per_field_selection(self):
+        compiled = values.compile_serializer(self.serializer())
+
+        self.assertIsNotNone(compiled)
+        self.assertIs(values.compile_serializer(self.serializer(), []), compiled)
+        self.assertEqual(values.compile_serializer(self.serializer('/announcements/?fields=title')).names, ('id', 'title'))
+        self.assertIsNotNone(values._compile.cache_info().maxsize)
+
+    def test_converters_keep_no_request_context(self):
+        announcement = self.create_announcement()
+        data = values.instances_data([announcement], serializers.AnnouncementSerializer, {'request': object()})
+        compiled = values.compile_serializer(self.serializer())
+
+        self.assertEqual(data, serializers.AnnouncementSerializer([announcement], many=True).data)
+        self.assertTrue(compiled.converters)
+        for _, _, convert in compiled.converters:
+            self.assertEqual(convert.__self__.context, {})
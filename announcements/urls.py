@@ -2,5 +2,12 @@ from django.urls import path, include
 from . import views
 
 urlpatterns=[
+    path("public/<str:org_id>/", views.PublicAnnouncementFeed.as_view()),
+    path("files/uploads/", views.AnnouncementUploadViewSet.as_view()),
+    path("files/uploads/<uuid:upload_id>/", views.AnnouncementUploadChunk.as_view()),
+    path("files/<int:file_id>/", views.AnnouncementFileDownload.as_view()),
+    path("acknowledgements/", views.AnnouncementAcknowledgementViewSet.as_view()),
+    path("bulk/", views.AnnouncementBulkViewSet.as_view()),
+    path("inbox/", views.AnnouncementInboxView.as_view()),
     path("", views.AnnouncenmentViewSet.as_view()),
 ]
\ No newline at end of file
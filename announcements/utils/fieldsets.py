@@ -0,0 +1,97 @@
+from django.core.exceptions import FieldDoesNotExist
+
+
+def parse_fieldset(value):
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_fieldset(query_params):
+    """
+    Returns the (fields, exclude) name sets asked for with ?fields=a,b and
+    ?exclude=c,d. Empty sets mean the query param was not passed.
+    """
+    if query_params is None:
+        return set(), set()
+    return parse_fieldset(query_params.get('fields', None)), parse_fieldset(query_params.get('exclude', None))
+
+
+def is_selected(name, fields, exclude):
+    return (not fields or name in fields) and name not in exclude
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer mixin returning only the fields picked with ?fields= or
+    ?exclude= on the request passed in the serializer context. `id` is always
+    returned.
+
+    `computed_fields` maps keys added in to_representation to the model
+    fields they read, so they can be selected like regular fields and
+    sparse_queryset still loads what they need.
+    """
+
+    computed_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request', None)
+        fields, exclude = get_fieldset(getattr(request, 'query_params', None))
+        self.selected_computed_fields = {name for name in self.computed_fields if is_selected(name, fields, exclude)}
+
+        if not fields and not exclude:
+            return
+
+        for name in list(self.fields):
+            if name != 'id' and not is_selected(name, fields, exclude):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_columns(cls, query_params):
+        """
+        Returns the model fields a response with these query params reads, or
+        None when every field is returned.
+        """
+        fields, exclude = get_fieldset(query_params)
+        if not fields and not exclude:
+            return None
+
+        model = cls.Meta.model
+        declared = set(cls().fields)
+        names = {name for name in (fields or declared) if name in declared and name not in exclude}
+
+        for name, sources in cls.computed_fields.items():
+            if is_selected(name, fields, exclude):
+                names.update(sources)
+
+        columns = {model._meta.pk.name}
+        for name in names:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.add(name)
+        return columns
+
+
+def sparse_queryset(qs, serializer_class, query_params, *required):
+    """
+    Restricts `qs` with .only() to the columns serializer_class returns for
+    these query params, plus `required` ones the view itself reads (such as
+    the pagination key), so unselected columns never leave the database.
+    """
+    columns = serializer_class.get_columns(query_params)
+    if columns is None:
+        return qs
+    return qs.only(*columns, *required)
+
+
+def sparse_dict(data, query_params):
+    """
+    Applies ?fields= and ?exclude= to an already serialized dict.
+    """
+    fields, exclude = get_fieldset(query_params)
+    return {name: value for name, value in data.items() if name == 'id' or is_selected(name, fields, exclude)}
@@ -0,0 +1,156 @@
+import logging
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import Manager, QuerySet
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+logger = logging.getLogger(__name__)
+
+LAZY_LOAD_WARNINGS = getattr(settings, 'SERIALIZER_LAZY_LOAD_WARNINGS', settings.DEBUG)
+
+
+def _relation_path(model, attrs):
+    """
+    Follows the leading relation names of `attrs` from `model` and returns
+    (orm_path, is_many, related_model) for them.
+    """
+    parts = []
+    many = False
+
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        parts.append(attr)
+        many = many or field.many_to_many or field.one_to_many
+        model = field.related_model
+
+    return '__'.join(parts), many, model
+
+
+def get_related_paths(serializer, model=None, prefix='', many=False):
+    """
+    Returns the (select_related, prefetch_related) paths `serializer` reads.
+
+    Paths come from the sources of its readable fields, nested serializers,
+    the `related_fields` a serializer declares for relations its
+    to_representation reads itself, and the selected `computed_fields` of
+    a SparseFieldsetMixin serializer.
+    """
+    model = model or serializer.Meta.model
+    select, prefetch = set(), set()
+
+    def add(path, is_many):
+        full = f'{prefix}__{path}' if prefix else path
+        (prefetch if many or is_many else select).add(full)
+        return full
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        attrs = field.source_attrs
+        path, is_many, related_model = _relation_path(model, attrs)
+        if not path:
+            continue
+
+        # A plain primary key field reads the local <name>_id column.
+        if isinstance(field, RelatedField) and len(attrs) == 1 and field.use_pk_only_optimization():
+            continue
+
+        full = add(path, is_many)
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.ModelSerializer) and not isinstance(field, ManyRelatedField):
+            nested_select, nested_prefetch = get_related_paths(nested, related_model, full, many or is_many)
+            select.update(nested_select)
+            prefetch.update(nested_prefetch)
+
+    paths = list(getattr(serializer, 'related_fields', ()))
+    for name in getattr(serializer, 'selected_computed_fields', ()):
+        paths.extend(serializer.computed_fields[name])
+
+    for path in paths:
+        relation, is_many, _ = _relation_path(model, path.split('__'))
+        if relation:
+            add(relation, is_many)
+
+    # A path that is prefetched already brings its select_related parents along.
+    return select - prefetch, prefetch
+
+
+def plan_queryset(qs, serializer_class, context=None):
+    """
+    Applies the select_related/prefetch_related that serializer_class needs
+    for the fields selected in `context` to `qs`.
+    """
+    select, prefetch = get_related_paths(serializer_class(context=context or {}))
+    if select:
+        qs = qs.select_related(*select)
+    if prefetch:
+        qs = qs.prefetch_related(*prefetch)
+    return qs
+
+
+class LazyLoadWatcher:
+
+    def __init__(self, serializer, active=False):
+        self.serializer = serializer
+        self.active = active
+        self.count = 0
+        self.sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.active:
+            self.count += 1
+            self.sql = self.sql or sql
+        return execute(sql, params, many, context)
+
+    def report(self):
+        if self.count:
+            logger.warning(
+                '%s ran %d queries while serializing, a relation is loaded lazily. First query: %s',
+                type(self.serializer).__name__, self.count, self.sql,
+            )
+
+
+@contextmanager
+def watch_lazy_loads(serializer, active=False):
+    """
+    Counts the queries run inside the block while `watcher.active` is set
+    and logs a warning when there were any. Callers that fetch rows inside
+    the block turn `active` on only around serializing them. Does nothing
+    unless SERIALIZER_LAZY_LOAD_WARNINGS (DEBUG by default) is on.
+    """
+    watcher = LazyLoadWatcher(serializer, active)
+    if not LAZY_LOAD_WARNINGS:
+        yield watcher
+        return
+
+    with connection.execute_wrapper(watcher):
+        yield watcher
+    watcher.report()
+
+
+class PlannedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer that evaluates the queryset, prefetches included, before
+    serializing so any query run while serializing rows is a lazy relation
+    load, and reports it.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, Manager) else data
+        if isinstance(iterable, QuerySet):
+            iterable = list(iterable)
+
+        with watch_lazy_loads(self.child, active=True):
+            return super().to_representation(iterable)
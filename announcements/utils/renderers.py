@@ -0,0 +1,86 @@
+import codecs
+
+from django.conf import settings
+from rest_framework import renderers, parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson writes microseconds where DRF cuts datetimes and times to milliseconds, so those are passed
+# through to DRF's encoder too.
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+# DRF's encoder covers what orjson does not, dates, decimals, lazy strings, querysets, so both render the same values.
+_default = JSONEncoder().default
+_fallback = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+# U+2028 and U+2029 are valid JSON but end a line in JavaScript, DRF escapes them too.
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def dumps(data):
+    """
+    Compact JSON for `data` as bytes, with orjson when it is installed. Dates,
+    UUIDs and decimals are encoded as DRF's JSONRenderer encodes them.
+    """
+    if orjson is not None:
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers wider than 64 bits, say.
+            pass
+        else:
+            if b'\xe2\x80' in ret:
+                for separator, escaped in LINE_SEPARATORS:
+                    ret = ret.replace(separator, escaped)
+            return ret
+
+    return _fallback.encode(data).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed. Indented
+    output (?indent= in the Accept header) and non unicode output settings
+    are left to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if orjson is None or not api_settings.UNICODE_JSON or not api_settings.COMPACT_JSON or not api_settings.STRICT_JSON:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    JSONParser that decodes with orjson when it is installed, straight from
+    the request bytes.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, LookupError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,118 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from departments import models as departments_models
+from organizations import models as organizations_models
+
+
+RESOLVER_TIMEOUT = getattr(settings, 'RESOLVER_CACHE_TIMEOUT', 300)
+
+# Cached for ids that match nothing so repeated misses never reach the database.
+MISSING = 0
+
+
+def _key(kind, value):
+    return f'resolvers:{kind}:' + hashlib.sha1(str(value).encode()).hexdigest()
+
+
+def organization_key(org_id):
+    return _key('organization', org_id)
+
+
+def department_key(dept_id):
+    return _key('department', dept_id)
+
+
+def _cached(key, load):
+    """
+    Returns the instance cached at `key`, loading and caching it on a miss.
+    """
+    instance = cache.get(key)
+
+    if instance is None:
+        instance = load()
+        cache.set(key, instance if instance is not None else MISSING, RESOLVER_TIMEOUT)
+
+    return instance or None
+
+
+def invalidate_organizations(*org_ids):
+    keys = [organization_key(org_id) for org_id in org_ids if org_id]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_departments(*dept_ids):
+    keys = [department_key(dept_id) for dept_id in dept_ids if dept_id]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class Resolver:
+    """
+    Resolves organizations, departments and role checks once per request.
+
+    Every lookup goes through a memo on the resolver first and then through
+    the cache, which is cleared by the save and delete signals of the
+    models, so stacked decorators and the view body share one query per
+    entity at most, and usually none.
+    """
+
+    def __init__(self):
+        self.memo = {}
+
+    def _get(self, key, load):
+        if key not in self.memo:
+            self.memo[key] = _cached(key, load)
+        return self.memo[key]
+
+    def organization(self, org_id):
+        if not org_id:
+            return None
+        return self._get(
+            organization_key(org_id),
+            lambda: organizations_models.Organization.objects.filter(org_id=str(org_id)).first(),
+        )
+
+    def department(self, dept_id):
+        if not dept_id:
+            return None
+        return self._get(
+            department_key(dept_id),
+            lambda: departments_models.Department.objects.filter(department_id=str(dept_id), is_active=True).first(),
+        )
+
+    def check(self, check, *args):
+        """
+        Memoizes a role check for the rest of the request, e.g.
+        resolver.check(validate_user_type, user_type, organization, user).
+        Results are not cached across requests so a revoked role is never
+        served from the cache.
+        """
+        key = (check, *args)
+        if key not in self.memo:
+            self.memo[key] = check(*args)
+        return self.memo[key]
+
+    def is_department_user(self, user, department):
+        """
+        Whether `user` is the user a department belongs to. Read from the
+        resolved department, so it costs no query.
+        """
+        return department is not None and department.user_id == user.id
+
+    def is_department_of(self, department, organization):
+        return department is not None and organization is not None and department.organization_id == organization.id
+
+
+def get_resolver(request):
+    """
+    Returns the Resolver of `request`, shared by the decorators and the view
+    whether they are handed the DRF Request or the HttpRequest under it.
+    """
+    request = getattr(request, '_request', request)
+    resolver = getattr(request, '_resolver', None)
+    if resolver is None:
+        resolver = request._resolver = Resolver()
+    return resolver
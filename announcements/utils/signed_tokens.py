@@ -0,0 +1,271 @@
+import functools
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import checks, signing
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+from rest_framework import authentication, exceptions, permissions, status
+from rest_framework.response import Response
+
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+ACCESS_TTL = getattr(settings, 'SIGNED_TOKEN_ACCESS_TTL', 15 * 60)
+REFRESH_TTL = getattr(settings, 'SIGNED_TOKEN_REFRESH_TTL', 7 * 24 * 60 * 60)
+SALT = 'utils.signed_tokens'
+
+# The denylist has to be seen by every worker, so this cache must be shared, e.g. memcached or Redis.
+CACHE_ALIAS = getattr(settings, 'SIGNED_TOKEN_CACHE', 'default')
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# (role, model, lookup of the user, lookup of the organization's org_id) for every role carried in a token.
+ROLE_SOURCES = getattr(settings, 'SIGNED_TOKEN_ROLE_SOURCES', (
+    ('org_admin', 'organizations.Organization', 'user', 'org_id'),
+    ('department_head', 'departments.Department', 'user', 'organization__org_id'),
+    ('teacher', 'teachers.Teacher', 'user', 'organization__org_id'),
+    ('student', 'students.Student', 'user', 'section__of_class__department__organization__org_id'),
+))
+
+
+def check_denylist_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get(CACHE_ALIAS, {}).get('BACKEND', PROCESS_LOCAL_CACHES[0])
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Warning(
+        f'The {CACHE_ALIAS!r} cache is local to each process, so a signed token revoked in one worker stays valid in the others.',
+        hint='Point SIGNED_TOKEN_CACHE at a cache shared by every worker, e.g. memcached or Redis.',
+        id='signed_tokens.W001',
+    )]
+
+
+def deny_key(jti):
+    return f'signed_tokens:deny:{jti}'
+
+
+def revoked_key(user_id):
+    return f'signed_tokens:revoked:{user_id}'
+
+
+def get_role_claims(user):
+    """
+    Returns {org_id: [roles]} for every organization `user` has a role in,
+    one query per entry of ROLE_SOURCES.
+    """
+    orgs = {}
+
+    for role, label, user_field, org_field in ROLE_SOURCES:
+        model = apps.get_model(label)
+        qs = model.objects.filter(**{user_field: user})
+        if any(field.name == 'is_active' for field in model._meta.fields):
+            qs = qs.filter(is_active=True)
+
+        for org_id in qs.values_list(org_field, flat=True).distinct():
+            if org_id:
+                orgs.setdefault(str(org_id), set()).add(role)
+
+    return {org_id: sorted(roles) for org_id, roles in orgs.items()}
+
+
+def get_request_roles(request):
+    """
+    Returns the role claims of the user of `request`: those carried by its
+    signed token, or else read once per request with get_role_claims().
+    """
+    if isinstance(request.auth, dict):
+        return request.auth['orgs']
+
+    from utils.resolvers import get_resolver
+    return get_resolver(request).check(get_role_claims, request.user)
+
+
+def _sign(claims):
+    return signing.dumps(claims, salt=SALT, compress=True)
+
+
+def issue_tokens(user):
+    """
+    Returns a short lived access token carrying the role claims of `user`
+    and a refresh token to get the next one with.
+    """
+    now = time.time()
+    access = {
+        'typ': ACCESS,
+        'jti': uuid.uuid4().hex,
+        'uid': user.pk,
+        'iat': now,
+        'orgs': get_role_claims(user),
+    }
+    refresh = {
+        'typ': REFRESH,
+        'jti': uuid.uuid4().hex,
+        'uid': user.pk,
+        'iat': now,
+    }
+    return {
+        'access': _sign(access),
+        'refresh': _sign(refresh),
+        'expires_in': ACCESS_TTL,
+    }
+
+
+def read_token(token, typ=ACCESS):
+    """
+    Verifies `token` and returns its claims. The signature and expiry are
+    checked in memory and the denylist with a single read of the shared cache, so no
+    query is made. Raises AuthenticationFailed.
+    """
+    try:
+        claims = signing.loads(token, salt=SALT, max_age=ACCESS_TTL if typ == ACCESS else REFRESH_TTL)
+    except signing.SignatureExpired:
+        raise exceptions.AuthenticationFailed('Token expired.')
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed('Invalid token.')
+
+    if not isinstance(claims, dict) or claims.get('typ', None) != typ:
+        raise exceptions.AuthenticationFailed('Invalid token.')
+
+    denied = caches[CACHE_ALIAS].get_many([deny_key(claims['jti']), revoked_key(claims['uid'])])
+    if deny_key(claims['jti']) in denied or claims['iat'] <= denied.get(revoked_key(claims['uid']), 0):
+        raise exceptions.AuthenticationFailed('Token revoked.')
+
+    return claims
+
+
+def deny(claims):
+    """
+    Puts one token on the denylist until it would have expired anyway.
+    """
+    ttl = ACCESS_TTL if claims['typ'] == ACCESS else REFRESH_TTL
+    timeout = int(claims['iat'] + ttl - time.time()) + 1
+    if timeout > 0:
+        caches[CACHE_ALIAS].set(deny_key(claims['jti']), True, timeout)
+
+
+def revoke_user(user_id):
+    """
+    Revokes every token issued to a user so far, e.g. when the user is
+    deactivated or changes their password.
+    """
+    caches[CACHE_ALIAS].set(revoked_key(user_id), time.time(), REFRESH_TTL)
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    The user of a token. Its id is known without a query; the first access
+    to anything else loads the whole user row with one query.
+    """
+
+    def __init__(self, user_id):
+        User = get_user_model()
+        super().__init__(lambda: User._default_manager.get(pk=user_id))
+        # Found on the instance before LazyObject's __getattr__ would load the user.
+        self.__dict__.update(pk=user_id, id=user_id, is_authenticated=True, is_anonymous=False)
+
+
+def token_user(user_id):
+    """
+    Returns the user of a token without a query, see TokenUser.
+    """
+    return TokenUser(user_id)
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates `Authorization: Bearer <access token>` headers issued by
+    issue_tokens(). request.user is a TokenUser and request.auth the claims
+    of the token.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+
+        claims = read_token(token, ACCESS)
+        return token_user(claims['uid']), claims
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+def get_org_id(request, view):
+    org_id = view.kwargs.get('org_id', None) or request.query_params.get('org_id', None)
+    if org_id is None and request.method not in permissions.SAFE_METHODS:
+        org_id = request.data.get('org_id', None)
+    return org_id
+
+
+def get_required_roles(request, view):
+    """
+    The `required_roles` of `view`, a tuple for every method or a dict of
+    tuples by method.
+    """
+    roles = getattr(view, 'required_roles', ())
+    if isinstance(roles, dict):
+        roles = roles.get(request.method, ())
+    return roles
+
+
+class HasOrganizationRole(permissions.BasePermission):
+    """
+    Allows a request signed with a token that carries one of the view's
+    `required_roles` for the org_id it passes. Requests authenticated any
+    other way are left to the checks of the view itself.
+    """
+
+    def has_permission(self, request, view):
+        roles = get_required_roles(request, view)
+        if not roles or not isinstance(request.auth, dict):
+            return True
+
+        return bool(set(roles) & set(request.auth['orgs'].get(str(get_org_id(request, view)), ())))
+
+
+def signed_roles(decorator):
+    """
+    Wraps a utils.decorators check, e.g. @signed_roles(is_organization), on
+    a method with `required_roles`. A request whose signed token passed
+    HasOrganizationRole skips the role queries of `decorator`: its
+    organization is resolved through the request's resolver and passed as
+    kwargs['organization']. Other requests go through `decorator`.
+    """
+    def wrap(function):
+        checked = decorator(function)
+
+        @functools.wraps(function)
+        def method(self, request, *args, **kwargs):
+            if not isinstance(request.auth, dict) or not get_required_roles(request, self):
+                return checked(self, request, *args, **kwargs)
+
+            from utils.resolvers import get_resolver
+
+            organization = get_resolver(request).organization(get_org_id(request, self))
+            if organization is None:
+                errors = [
+                    'Invalid org_id'
+                ]
+                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+            kwargs['organization'] = organization
+            return function(self, request, *args, **kwargs)
+
+        return method
+    return wrap
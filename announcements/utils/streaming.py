@@ -0,0 +1,108 @@
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from utils.prefetching import watch_lazy_loads
+from utils.renderers import dumps
+from utils.values import compile_serializer
+
+
+CHUNK_SIZE = 500
+BUFFER_SIZE = 64 * 1024
+
+# Largest page a streamed list endpoint returns, the rest is reached through its next cursor.
+MAX_STREAM_PAGE_SIZE = getattr(settings, 'STREAMING_MAX_PAGE_SIZE', 10000)
+
+
+def is_streaming(request):
+    return request.query_params.get('stream', None) == "true"
+
+
+def _iter_json(items):
+    """
+    Yields the JSON array of `items`, already converted to primitives, in
+    pieces of about BUFFER_SIZE characters.
+    """
+    buffer, size, separator = ['['], 1, ''
+    for data in items:
+        item = separator + dumps(data).decode()
+        buffer.append(item)
+        size += len(item)
+        separator = ','
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    buffer.append(']')
+    yield ''.join(buffer)
+
+
+def iter_json_list(qs, serializer, chunk_size=CHUNK_SIZE):
+    """
+    Yields `qs` as a JSON array, one serialized row at a time.
+
+    Rows come from a server-side cursor and are serialized with a single
+    `serializer` instance, so memory stays flat however many rows match.
+    Output is flushed in pieces of about BUFFER_SIZE characters. iterator()
+    ignores prefetch_related, so only select_related relations are loaded
+    without extra queries; the others are reported as lazy loads.
+    """
+    return iter_json_rows(qs.iterator(chunk_size=chunk_size), serializer.to_representation, serializer)
+
+
+def iter_json_rows(rows, represent, serializer=None):
+    """
+    Yields the JSON array of represent(row) for every row of the iterator
+    `rows`, reporting lazy loads of `serializer` while representing them.
+    """
+    def items():
+        with watch_lazy_loads(serializer) as watcher:
+            for row in rows:
+                watcher.active = True
+                data = represent(row)
+                watcher.active = False
+                yield data
+
+    return _iter_json(items())
+
+
+def stream_rows(rows, represent, envelope=None, serializer=None):
+    """
+    Returns a StreamingHttpResponse rendering represent(row) for every row
+    of the iterator `rows`, e.g. a page from KeysetPaginator.iterate_many.
+    Envelope values may be callables, called once the rows are written.
+    """
+    return _streaming_response(iter_json_rows(rows, represent, serializer), envelope)
+
+
+def stream_list(qs, serializer_class, context=None, envelope=None, chunk_size=CHUNK_SIZE):
+    """
+    Returns a StreamingHttpResponse rendering `qs` through serializer_class.
+
+    With `envelope`, a dict like {'details': None, 'next': None}, the array
+    is written as the value of its first key and the other keys follow it,
+    matching the shape of the paginated responses. Serializers that compile
+    are run over values_list() rows instead of model instances.
+    """
+    serializer = serializer_class(context=context or {})
+    compiled = compile_serializer(serializer, tuple(qs.query.annotations))
+    if compiled is not None:
+        qs, serializer = qs.values_list(*compiled.columns), compiled
+    return _streaming_response(iter_json_list(qs, serializer, chunk_size), envelope)
+
+
+def _streaming_response(rows, envelope):
+    def generate():
+        if envelope is None:
+            yield from rows
+            return
+
+        keys = list(envelope)
+        yield '{' + json.dumps(keys[0]) + ':'
+        yield from rows
+        for key in keys[1:]:
+            value = envelope[key]
+            yield ',' + json.dumps(key) + ':' + json.dumps(value() if callable(value) else value)
+        yield '}'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
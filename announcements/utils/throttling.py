@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class FixedWindowThrottle(BaseThrottle):
+    """
+    Per-client rate limit kept in the Django cache.
+
+    Every client, identified by BaseThrottle.get_ident, may send `limit`
+    requests per fixed window of `window` seconds. The windows are aligned
+    on the clock, so a client can send up to 2 * limit requests around the
+    end of one window and the start of the next. Subclasses set `scope`;
+    limit and window can be overridden per scope with
+    settings.THROTTLE_WINDOWS = {scope: (limit, window)}.
+
+    Requests are counted with cache.add and cache.incr, which are atomic on
+    the shared cache, so concurrent requests from one client cannot go over
+    the limit.
+    """
+
+    scope = None
+    limit = 10
+    window = 10
+
+    def __init__(self):
+        self.limit, self.window = getattr(settings, 'THROTTLE_WINDOWS', {}).get(self.scope, (self.limit, self.window))
+        self.wait_seconds = None
+
+    def get_cache_key(self, request, view):
+        return f'throttle:window:{self.scope}:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        now = time.time()
+        index = int(now // self.window)
+        key = f'{self.get_cache_key(request, view)}:{index}'
+        timeout = int(self.window) + 1
+
+        cache.add(key, 0, timeout)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # Expired or evicted since the add.
+            cache.add(key, 1, timeout)
+            count = 1
+
+        if count > self.limit:
+            self.wait_seconds = (index + 1) * self.window - now
+            return False
+
+        return True
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,147 @@
+import functools
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import FileField
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+
+# Fields whose to_representation returns a value read from the database unchanged.
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+IDENTITY_REPRESENTATIONS = {field.to_representation for field in IDENTITY_FIELDS}
+
+# Compiled serializers kept, one per serializer class, field selection and set of annotations.
+CACHE_SIZE = 128
+
+
+class CompiledSerializer:
+    """
+    Read only replacement for a serializer over values_list() rows.
+
+    Built once per serializer class, field selection and annotations by
+    compile_serializer(). Rows are turned into dicts with one zip() and the
+    few fields that need converting, dates, decimals and choices, are passed
+    through the to_representation of the DRF field they came from, so the
+    output is the same as the serializer's.
+    """
+
+    def __init__(self, names, columns, attnames, converters):
+        self.names = names
+        self.columns = columns
+        self.converters = converters
+        self.get_values = attrgetter(*attnames) if len(attnames) > 1 else lambda instance: (getattr(instance, attnames[0]),)
+
+    def to_representation(self, row):
+        data = dict(zip(self.names, row))
+        for index, name, convert in self.converters:
+            value = row[index]
+            if value is not None:
+                data[name] = convert(value)
+        return data
+
+    def serialize(self, qs):
+        return [self.to_representation(row) for row in qs.values_list(*self.columns)]
+
+    def serialize_instances(self, instances):
+        """
+        Same output for model instances that are already loaded.
+        """
+        return [self.to_representation(self.get_values(instance)) for instance in instances]
+
+
+def _column(serializer, name, field, annotations):
+    """
+    Returns (column, attname, converter) for one readable field, or None when
+    the field can only be rendered by the serializer itself.
+    """
+    model = serializer.Meta.model
+
+    if isinstance(field, serializers.SerializerMethodField):
+        # Methods that only return an annotation of the same name, like requesting_users_count.
+        if name in annotations:
+            return name, name, None
+        return None
+
+    if isinstance(field, (serializers.BaseSerializer, ManyRelatedField)) or field.source == '*' or '.' in field.source:
+        return None
+
+    try:
+        model_field = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return None
+
+    if not model_field.concrete or model_field.many_to_many or isinstance(model_field, FileField):
+        return None
+
+    if isinstance(field, PrimaryKeyRelatedField):
+        return field.source, model_field.attname, None
+    if model_field.is_relation:
+        return None
+
+    converter = None if type(field).to_representation in IDENTITY_REPRESENTATIONS else field.to_representation
+    return field.source, model_field.attname, converter
+
+
+def compile_serializer(serializer, annotations=()):
+    """
+    Returns a CompiledSerializer producing what `serializer`, an instance
+    whose fields are already narrowed by the request, produces, or None when
+    one of its fields or a to_representation override needs the full
+    serializer.
+    """
+    names = tuple(name for name, field in serializer.fields.items() if not field.write_only)
+    return _compile(type(serializer), names, tuple(sorted(annotations)))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _compile(serializer_class, names, annotations):
+    if serializer_class.to_representation is not serializers.Serializer.to_representation:
+        return None
+
+    # The converters are bound to the fields of a serializer built without a
+    # context, so the cache keeps no request or view alive.
+    serializer = serializer_class()
+
+    columns, attnames, converters = [], [], []
+    for index, name in enumerate(names):
+        column = _column(serializer, name, serializer.fields[name], annotations)
+        if column is None:
+            return None
+
+        if column[2] is not None:
+            converters.append((index, name, column[2]))
+        columns.append(column[0])
+        attnames.append(column[1])
+
+    return CompiledSerializer(names, tuple(columns), tuple(attnames), tuple(converters)) if names else None
+
+
+def values_data(qs, serializer_class, context=None):
+    """
+    Returns the serialized rows of `qs`, through values_list() when
+    serializer_class compiles and through the serializer otherwise.
+    """
+    serializer = serializer_class(context=context or {})
+    compiled = compile_serializer(serializer, tuple(qs.query.annotations))
+
+    if compiled is None:
+        return serializer_class(qs, many=True, context=context or {}).data
+    return compiled.serialize(qs)
+
+
+def instances_data(instances, serializer_class, context=None):
+    """
+    values_data() for a list of instances that is already loaded, e.g. a page.
+    """
+    serializer = serializer_class(context=context or {})
+    compiled = compile_serializer(serializer)
+
+    if compiled is None:
+        return serializer_class(instances, many=True, context=context or {}).data
+    return compiled.serialize_instances(instances)
@@ -1,22 +1,34 @@
 from django.shortcuts import render
 from rest_framework import status, permissions, authentication, views, viewsets
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, F, Exists, OuterRef
+from django.utils import timezone
+from django.core.cache import cache
+from django.utils.http import parse_etags
 
 # Swagger
 from drf_yasg2.utils import swagger_auto_schema
 from drf_yasg2 import openapi
 
 # CUSTOM
-from . import models, serializers
+from . import models, serializers, public_feed, search, files, archive
+from .signals import announcements_saved
+from .pagination import KeysetPaginator, InvalidCursor
 from departments import models as departments_models
 from teachers import models as teachers_models
 from organizations import models as organizations_models
 from sections import serializers as section_serializers
+from users import serializers as users_serializers
 
 # Utils
 import json
+import uuid
 from utils.utilities import validate_user_type, pop_from_data, validate_from
+from utils.fieldsets import sparse_queryset, sparse_dict
+from utils.streaming import MAX_STREAM_PAGE_SIZE, is_streaming, stream_rows
+from utils.values import instances_data
+from utils.signed_tokens import SignedTokenAuthentication
 from utils.decorators import (
     validate_org,
     validate_dept,
@@ -27,9 +39,51 @@ from utils.decorators import (
 )
 
 
+def get_sender_details(user_type, organization, user, From):
+    """
+    Validates the sender of an announcement and returns (fromDetail, sender, error)
+    where sender holds the sender foreign keys to store with it.
+    """
+    from1 = validate_from(user_type, organization, user, From)
+
+    if user_type == 'dept':
+        if from1 == False:
+            return None, None, 'Department user is not valid'
+
+        fromDetail = {
+            "class":str(from1.title),
+            "Departemnt":str(from1.department),
+        }
+        sender = {
+            "sender_class": from1.id,
+            "sender_department": from1.department_id,
+        }
+    elif user_type == 'teacher':
+        if from1 == False:
+            return None, None, 'Teacher user is not valid'
+
+        fromDetail = {
+            "subject":str(from1),
+            "teacher":str(user),
+        }
+        sender = {
+            "sender_teacher": user.id,
+        }
+    else:
+        if from1 == False:
+            return None, None, 'organization user is not valid'
+
+        fromDetail = {
+            "organization":str(from1),
+        }
+        sender = {}
+
+    return fromDetail, sender, None
+
+
 class AnnouncenmentViewSet(views.APIView):
 
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (SignedTokenAuthentication, authentication.TokenAuthentication)
     permission_classes = (permissions.IsAuthenticated,)
 
     @swagger_auto_schema(
@@ -44,6 +98,17 @@ class AnnouncenmentViewSet(views.APIView):
             openapi.Parameter(name="start_date", in_="query", type=openapi.FORMAT_DATE),
             openapi.Parameter(name="end_date", in_="query", type=openapi.FORMAT_DATE),
             openapi.Parameter(name="is_public", in_="query", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter(name="sender_dept_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="sender_class", in_="query", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(name="sender_teacher", in_="query", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(name="status", in_="query", type=openapi.TYPE_STRING, enum=["live", "scheduled", "expired"]),
+            openapi.Parameter(name="include_archived", in_="query", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter(name="q", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="cursor", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="page_size", in_="query", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(name="fields", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="exclude", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="stream", in_="query", type=openapi.TYPE_BOOLEAN),
         ]
     )
     def get(self, request,**kwargs):
@@ -54,30 +119,119 @@ class AnnouncenmentViewSet(views.APIView):
         start_date = query_params.get('start_date', None)
         end_date = query_params.get('end_date', None)
         is_public = query_params.get('is_public', None)
+        sender_dept_id = query_params.get('sender_dept_id', None)
+        sender_class = query_params.get('sender_class', None)
+        sender_teacher = query_params.get('sender_teacher', None)
+        announcement_status = query_params.get('status', models.LIVE)
+        include_archived = query_params.get('include_archived', None)
+        q = query_params.get('q', "").strip()
 
-        qs = models.Announcement.objects.filter(is_active=True)
+        if announcement_status not in (models.LIVE, models.SCHEDULED, models.EXPIRED):
+            errors = [
+                'invalid status options are live,scheduled,expired'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        filters = Q(is_active=True) & Q(status=announcement_status)
+
+        # Only the author sees announcements that are not live yet or anymore.
+        if announcement_status != models.LIVE:
+            filters &= Q(user=request.user)
 
         if id:
-            qs = qs.filter(id=int(id))
+            filters &= Q(id=int(id))
 
         if org_id:
-            qs = qs.filter(organization__org_id=org_id)
+            filters &= Q(organization__org_id=org_id)
 
         if start_date:
-            qs = qs.filter(date__gte=start_date)
+            filters &= Q(date__gte=start_date)
         
         if end_date:
-            qs = qs.filter(date__lte=end_date)
+            filters &= Q(date__lte=end_date)
         
         if is_public:
             if is_public == "true":
-                qs = qs.filter(is_public=True)
+                filters &= Q(is_public=True)
             if is_public == "false":
-                qs = qs.filter(is_public=False)
-        
+                filters &= Q(is_public=False)
 
-        serializer = serializers.AnnouncementSerializer(qs, many=True)
-        return Response({'details': serializer.data}, status.HTTP_200_OK)
+        if sender_dept_id:
+            filters &= Q(sender_department__department_id=sender_dept_id)
+
+        if sender_class:
+            if not sender_class.isdigit():
+                errors = [
+                    'invalid sender_class'
+                ]
+                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+            filters &= Q(sender_class_id=int(sender_class))
+
+        if sender_teacher:
+            if not sender_teacher.isdigit():
+                errors = [
+                    'invalid sender_teacher'
+                ]
+                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+            filters &= Q(sender_teacher_id=int(sender_teacher))
+
+        qs = sparse_queryset(models.Announcement.objects.filter(filters), serializers.AnnouncementSerializer, query_params, 'date')
+
+        if q:
+            try:
+                results, next_cursor = search.paginate(search.search(qs, q), query_params)
+            except InvalidCursor:
+                errors = [
+                    'invalid cursor'
+                ]
+                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+            data = serializers.AnnouncementSerializer(results, many=True, context={'request': request}).data
+            for item, result in zip(data, results):
+                item["rank"] = result.rank
+                item["snippet"] = search.render_snippet(result.snippet)
+            return Response({'details': data, 'next': next_cursor, 'previous': None}, status.HTTP_200_OK)
+
+        querysets = [qs]
+        if include_archived == "true":
+            querysets.append(models.AnnouncementArchive.objects.filter(filters))
+
+        # Streams read the same cursor and archive, in pages of up to MAX_STREAM_PAGE_SIZE rows.
+        if is_streaming(request):
+            paginator = KeysetPaginator(page_size=MAX_STREAM_PAGE_SIZE, max_page_size=MAX_STREAM_PAGE_SIZE)
+            try:
+                rows, get_cursors = paginator.iterate_many(querysets, query_params)
+            except InvalidCursor:
+                errors = [
+                    'invalid cursor'
+                ]
+                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+            serializer = serializers.AnnouncementSerializer(context={'request': request})
+
+            def represent(row):
+                if isinstance(row, models.Announcement):
+                    return serializer.to_representation(row)
+                return sparse_dict(dict(archive.decompress_announcement(row.payload), is_archived=True), query_params)
+
+            envelope = {'details': None, 'next': lambda: get_cursors()[0], 'previous': lambda: get_cursors()[1]}
+            return stream_rows(rows, represent, envelope, serializer)
+
+        try:
+            page, next_cursor, previous_cursor = KeysetPaginator().paginate_many(querysets, query_params)
+        except InvalidCursor:
+            errors = [
+                'invalid cursor'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        live = [row for row in page if isinstance(row, models.Announcement)]
+        serialized = dict(zip([row.id for row in live], instances_data(live, serializers.AnnouncementSerializer, {'request': request})))
+        details = [
+            serialized[row.id] if isinstance(row, models.Announcement) else sparse_dict(dict(archive.decompress_announcement(row.payload), is_archived=True), query_params)
+            for row in page
+        ]
+        return Response({'details': details, 'next': next_cursor, 'previous': previous_cursor}, status.HTTP_200_OK)
 
     @swagger_auto_schema(
         request_body = openapi.Schema(
@@ -88,6 +242,8 @@ class AnnouncenmentViewSet(views.APIView):
                 'org_id': openapi.Schema(type=openapi.TYPE_STRING),
                 'user_type': openapi.Schema(type=openapi.TYPE_STRING),
                 'from': openapi.Schema(type=openapi.TYPE_INTEGER),
+                'publish_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                'expire_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
             }
         ),
         responses={
@@ -118,62 +274,24 @@ class AnnouncenmentViewSet(views.APIView):
             ]
             return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-        if user_type == 'dept':
-            from1 = validate_from(user_type,organization,request.user, From)
-            if from1 == False:
-                errors = [
-                    'Department user is not valid'
-                ]
-                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
-
-            fromDetail = {
-                "class":str(from1.title),
-                "Departemnt":str(from1.department),
-            }
-            data_dict = {
-                "user": request.user.id,
-                "organization": organization.id,
-                "title": str(title),
-                "From":str(fromDetail)
-            }
-        if user_type == 'teacher':
-            from1 = validate_from(user_type,organization,request.user, From)
-            if from1 == False:
-                errors = [
-                    'Teacher user is not valid'
-                ]
-                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
-
-            fromDetail = {
-                "subject":str(from1),
-                "teacher":str(request.user),
-            }
-            data_dict = {
-                "user": request.user.id,
-                "organization": organization.id,
-                "title": str(title),
-                "From":str(fromDetail)
-            }
-        if user_type == 'org':
-            from1 = validate_from(user_type,organization,request.user, From)
-            if from1 == False:
-                errors = [
-                    'organization user is not valid'
-                ]
-                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+        fromDetail, sender, error = get_sender_details(user_type, organization, request.user, From)
+        if error:
+            errors = [
+                error
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
 
-            fromDetail = {
-                "organization":str(from1),
-            }
-            data_dict = {
-                "user": request.user.id,
-                "organization": organization.id,
-                "title": str(title),
-                "From":str(fromDetail)
-            }
+        data_dict = {
+            "user": request.user.id,
+            "organization": organization.id,
+            "title": str(title),
+            "publish_at": data.get('publish_at', None),
+            "expire_at": data.get('expire_at', None),
+        }
         serializer = serializers.AnnouncementSerializer(data=data_dict)
         if serializer.is_valid():
-            serializer.save()
+            # The sender fields are read only, only the validated sender is stored.
+            serializer.save(From=fromDetail, **{f'{field}_id': value for field, value in sender.items()})
             msgs = [
                 serializer.data
             ]
@@ -198,6 +316,8 @@ class AnnouncenmentViewSet(views.APIView):
                 'visible': openapi.Schema(type=openapi.TYPE_STRING),
                 'is_public': openapi.Schema(type=openapi.TYPE_BOOLEAN),
                 'acknowledge': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                'publish_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                'expire_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
             }
         ),
         responses={
@@ -285,4 +405,639 @@ class AnnouncenmentViewSet(views.APIView):
         msgs = [
             "Successfully deleted announcement"
         ]
-        return Response({'details': msgs}, status.HTTP_200_OK)
\ No newline at end of file
+        return Response({'details': msgs}, status.HTTP_200_OK)
+
+MAX_BULK_SIZE = 500
+
+
+def get_bulk_items(data, key):
+    items = data.get(key, None)
+
+    if isinstance(items, str):
+        try:
+            items = json.loads(items)
+        except ValueError:
+            items = None
+
+    if not isinstance(items, list) or not items:
+        return None, f'{key} should be a non empty list'
+
+    if len(items) > MAX_BULK_SIZE:
+        return None, f'at most {MAX_BULK_SIZE} {key} can be passed at once'
+
+    return items, None
+
+
+class AnnouncementBulkViewSet(views.APIView):
+
+    authentication_classes = (authentication.TokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        request_body = openapi.Schema(
+            title = "Bulk create Announcements",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'org_id': openapi.Schema(type=openapi.TYPE_STRING),
+                'user_type': openapi.Schema(type=openapi.TYPE_STRING),
+                'from': openapi.Schema(type=openapi.TYPE_INTEGER),
+                'announcements': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            422: openapi.Response("Unprocessable Entity- Make sure that all the required field values are passed"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    @validate_org
+    def post(self, request, **kwargs):
+        data = request.data
+        user_type = data.get('user_type', None)
+        From = data.get('from', None)
+
+        items, error = get_bulk_items(data, 'announcements')
+        if error or not user_type:
+            errors = [
+                error or 'user_type is required'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        organization = kwargs.get("organization")
+
+        if not validate_user_type(user_type, organization, request.user):
+            errors = [
+                'invalid user_type options are org,dept,teacher'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        fromDetail, sender, error = get_sender_details(user_type, organization, request.user, From)
+        if error:
+            errors = [
+                error
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        announcements = []
+        now = timezone.now()
+
+        for index, item in enumerate(items):
+            serializer = serializers.AnnouncementBulkSerializer(data=item)
+            if not serializer.is_valid():
+                results.append({"index": index, "id": None, "errors": serializer.errors})
+                continue
+
+            announcement = models.Announcement(
+                user=request.user,
+                organization=organization,
+                From=fromDetail,
+                **{f'{field}_id': value for field, value in sender.items()},
+                **serializer.validated_data
+            )
+            announcement.status = announcement.get_status(now)
+            announcements.append(announcement)
+            results.append({"index": index, "id": None, "errors": None})
+
+        with transaction.atomic():
+            announcements = models.Announcement.objects.bulk_create(announcements)
+
+            if announcements and announcements[0].pk is None:
+                # Backends that return no primary keys from bulk inserts, like SQLite, keep the write lock until
+                # the commit, so the newest rows of the user are the ones just inserted, in the same order.
+                ids = models.Announcement.objects.filter(user=request.user).order_by('-id').values_list('id', flat=True)[:len(announcements)]
+                for announcement, id in zip(announcements, reversed(list(ids))):
+                    announcement.id = id
+
+            announcements_saved(announcements, created=True)
+
+        created = iter(announcements)
+        for result in results:
+            if result["errors"] is None:
+                result["id"] = next(created).id
+
+        return Response({'details': results}, status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            title="Bulk update Announcements",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'org_id': openapi.Schema(type=openapi.TYPE_STRING),
+                'announcements': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response(
+                "Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            422: openapi.Response("Unprocessable Entity- Make sure that all the required field values are passed"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    @validate_org
+    def put(self, request, *args, **kwargs):
+        items, error = get_bulk_items(request.data, 'announcements')
+        if error:
+            errors = [
+                error
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        organization = kwargs.get("organization")
+
+        ids = []
+        for item in items:
+            try:
+                ids.append(int(item.get('id')))
+            except (AttributeError, TypeError, ValueError):
+                ids.append(None)
+
+        announcements = models.Announcement.objects.filter(
+            Q(id__in=[i for i in ids if i]) & Q(is_active=True) & Q(user=request.user) & Q(organization=organization)
+        ).in_bulk()
+
+        results = []
+        updated = []
+        fields = set()
+        now = timezone.now()
+
+        for index, (id, item) in enumerate(zip(ids, items)):
+            announcement = announcements.get(id)
+            if announcement is None:
+                results.append({"index": index, "id": id, "errors": ['invalid id']})
+                continue
+
+            serializer = serializers.AnnouncementBulkSerializer(instance=announcement, data=item, partial=True)
+            if not serializer.is_valid():
+                results.append({"index": index, "id": id, "errors": serializer.errors})
+                continue
+
+            for field, value in serializer.validated_data.items():
+                setattr(announcement, field, value)
+                fields.add(field)
+            announcement.organization = organization
+            announcement.updated_at = now
+            announcement.status = announcement.get_status(now)
+            updated.append(announcement)
+            results.append({"index": index, "id": id, "errors": None})
+
+        if updated:
+            with transaction.atomic():
+                models.Announcement.objects.bulk_update(updated, list(fields) + ['updated_at', 'status'], batch_size=MAX_BULK_SIZE)
+                announcements_saved(updated)
+
+        return Response({'details': results}, status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            title="Bulk deactivate Announcements",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'org_id': openapi.Schema(type=openapi.TYPE_STRING),
+                'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response(
+                "Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            422: openapi.Response("Unprocessable Entity- Make sure that all the required field values are passed"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    @validate_org
+    def delete(self, request, *args, **kwargs):
+        ids, error = get_bulk_items(request.data, 'ids')
+        if error:
+            errors = [
+                error
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            ids = [int(i) for i in ids]
+        except (TypeError, ValueError):
+            errors = [
+                "ids format should be like this. [1, 2, 3] where 1, 2 and 3 are announcement ID's"
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        organization = kwargs.get("organization")
+
+        with transaction.atomic():
+            announcements = list(models.Announcement.objects.select_for_update().filter(
+                Q(id__in=ids) & Q(is_active=True) & Q(user=request.user) & Q(organization=organization)
+            ))
+            models.Announcement.objects.filter(id__in=[a.id for a in announcements]).update(
+                is_active=False, updated_at=timezone.now()
+            )
+
+            for announcement in announcements:
+                announcement.is_active = False
+                announcement.organization = organization
+            announcements_saved(announcements)
+
+        deleted = {a.id for a in announcements}
+        results = [
+            {"id": id, "errors": None if id in deleted else ['invalid id']}
+            for id in ids
+        ]
+        return Response({'details': results}, status.HTTP_200_OK)
+
+
+class AnnouncementInboxView(views.APIView):
+
+    authentication_classes = (SignedTokenAuthentication, authentication.TokenAuthentication)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response("OK- Successful GET Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            500: openapi.Response("Internal Server Error- Error while processing the GET Request Function.")
+        },
+        manual_parameters = [
+            openapi.Parameter(name="org_id", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="cursor", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="page_size", in_="query", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(name="fields", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="exclude", in_="query", type=openapi.TYPE_STRING),
+        ]
+    )
+    def get(self, request, **kwargs):
+        query_params = self.request.query_params
+        org_id = query_params.get('org_id', None)
+
+        qs = models.AnnouncementInbox.objects.filter(user=request.user, is_active=True).select_related('announcement')
+
+        columns = serializers.AnnouncementSerializer.get_columns(query_params)
+        if columns is not None:
+            qs = qs.only('id', 'date', 'announcement', *[f'announcement__{column}' for column in columns])
+
+        if org_id:
+            qs = qs.filter(organization__org_id=org_id)
+
+        try:
+            page, next_cursor, previous_cursor = KeysetPaginator().paginate(qs, query_params)
+        except InvalidCursor:
+            errors = [
+                'invalid cursor'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        serializer = serializers.AnnouncementSerializer([entry.announcement for entry in page], many=True, context={'request': request})
+        return Response({'details': serializer.data, 'next': next_cursor, 'previous': previous_cursor}, status.HTTP_200_OK)
+
+
+class PublicAnnouncementFeed(views.APIView):
+
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response("OK- Successful GET Request"),
+            304: openapi.Response("Not Modified- The feed matches the ETag passed in If-None-Match"),
+            400: openapi.Response("Bad Request- Invalid cursor"),
+            500: openapi.Response("Internal Server Error- Error while processing the GET Request Function.")
+        },
+        manual_parameters = [
+            openapi.Parameter(name="cursor", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="page_size", in_="query", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(name="fields", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="exclude", in_="query", type=openapi.TYPE_STRING),
+        ]
+    )
+    def get(self, request, org_id, **kwargs):
+        query_params = self.request.query_params
+        paginator = KeysetPaginator()
+        cursor = query_params.get('cursor', "")
+        page_size = paginator.get_page_size(query_params)
+
+        version = public_feed.get_version(org_id)
+        etag = public_feed.get_etag(org_id, version, cursor, page_size, query_params.get('fields', ""), query_params.get('exclude', ""))
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', "")
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            return public_feed.set_cache_headers(Response(status=status.HTTP_304_NOT_MODIFIED), org_id, etag)
+
+        body = cache.get(public_feed.body_key(etag))
+
+        if body is None:
+            qs = models.Announcement.objects.filter(is_active=True, status=models.LIVE, is_public=True, organization__org_id=org_id)
+            qs = sparse_queryset(qs, serializers.AnnouncementSerializer, query_params, 'date')
+
+            try:
+                page, next_cursor, previous_cursor = paginator.paginate(qs, query_params)
+            except InvalidCursor:
+                errors = [
+                    'invalid cursor'
+                ]
+                return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+            serializer = serializers.AnnouncementSerializer(page, many=True, context={'request': request})
+            body = {'details': serializer.data, 'next': next_cursor, 'previous': previous_cursor}
+            cache.set(public_feed.body_key(etag), body, public_feed.PUBLIC_FEED_SURROGATE_MAX_AGE)
+
+        return public_feed.set_cache_headers(Response(body, status.HTTP_200_OK), org_id, etag)
+
+
+class AnnouncementUploadViewSet(views.APIView):
+
+    authentication_classes = (authentication.TokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response("OK- Successful GET Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            500: openapi.Response("Internal Server Error- Error while processing the GET Request Function.")
+        },
+        manual_parameters = [
+            openapi.Parameter(name="upload_id", in_="query", type=openapi.TYPE_STRING),
+        ]
+    )
+    def get(self, request, **kwargs):
+        upload_id = self.request.query_params.get('upload_id', None)
+
+        try:
+            upload_id = uuid.UUID(str(upload_id))
+        except ValueError:
+            upload_id = None
+
+        uploads = models.AnnouncementUpload.objects.filter(id=upload_id, user=request.user) if upload_id else []
+        if not len(uploads):
+            errors = [
+                'invalid upload_id'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        serializer = serializers.AnnouncementUploadSerializer(uploads[0])
+        return Response({'details': serializer.data}, status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        request_body = openapi.Schema(
+            title = "Start Announcement file upload",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                'filename': openapi.Schema(type=openapi.TYPE_STRING),
+                'size': openapi.Schema(type=openapi.TYPE_INTEGER),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            422: openapi.Response("Unprocessable Entity- Make sure that all the required field values are passed"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    def post(self, request, **kwargs):
+        data = request.data
+        id = data.get('id', None)
+        filename = data.get('filename', None)
+        size = data.get('size', None)
+
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            size = 0
+
+        if not id or not filename or size < 1:
+            errors = [
+                'id, filename and size are required'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        filename = files.clean_filename(filename)
+        if filename is None:
+            errors = [
+                'invalid filename'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        announcements = models.Announcement.objects.filter(Q(id=int(id)) & Q(is_active=True) & Q(user=request.user))
+        if not len(announcements):
+            errors = [
+                'invalid id'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        upload = models.AnnouncementUpload.objects.create(
+            user=request.user,
+            announcement=announcements[0],
+            filename=filename,
+            size=size,
+        )
+        serializer = serializers.AnnouncementUploadSerializer(upload)
+        return Response({'details': serializer.data}, status.HTTP_200_OK)
+
+
+class AnnouncementUploadChunk(views.APIView):
+
+    authentication_classes = (authentication.TokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        manual_parameters = [
+            openapi.Parameter(name="Content-Range", in_="header", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: openapi.Response("OK- Chunk stored, or upload completed"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            409: openapi.Response("Conflict- Chunk does not start at the current offset"),
+            500: openapi.Response("Internal Server Error- Error while processing the PUT Request Function.")
+        }
+    )
+    def put(self, request, upload_id, **kwargs):
+        uploads = models.AnnouncementUpload.objects.filter(id=upload_id, user=request.user, is_complete=False)
+        if not len(uploads):
+            errors = [
+                'invalid upload_id'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        upload = uploads[0]
+
+        content_range = files.parse_content_range(request.META.get('HTTP_CONTENT_RANGE'))
+        if content_range is None or content_range[2] != upload.size:
+            errors = [
+                f'Content-Range should be like this. bytes 0-1023/{upload.size}'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        start, end, total = content_range
+
+        try:
+            files.write_chunk(upload, request.stream, start, end)
+        except files.UploadError as e:
+            errors = [
+                str(e)
+            ]
+            return Response({'details': errors, 'offset': upload.offset}, status.HTTP_409_CONFLICT)
+
+        if upload.offset < upload.size:
+            return Response({'details': ['chunk stored'], 'offset': upload.offset}, status.HTTP_200_OK)
+
+        announcement_file = files.complete_upload(upload)
+        serializer = serializers.AnnouncementFileSerializer(announcement_file)
+        return Response({'details': [serializer.data], 'offset': upload.offset}, status.HTTP_200_OK)
+
+
+class AnnouncementFileDownload(views.APIView):
+
+    authentication_classes = (authentication.TokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        manual_parameters = [
+            openapi.Parameter(name="Range", in_="header", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: openapi.Response("OK- Successful GET Request"),
+            206: openapi.Response("Partial Content- Requested byte range"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            416: openapi.Response("Range Not Satisfiable"),
+        }
+    )
+    def get(self, request, file_id, **kwargs):
+        # Files of announcements the user wrote, receives in their inbox, or that are on the public feed.
+        in_inbox = models.AnnouncementInbox.objects.filter(
+            announcement_id=OuterRef('announcement_id'), user=request.user, is_active=True,
+        )
+        announcement_files = models.AnnouncementFile.objects.filter(
+            id=file_id, is_active=True, announcement__is_active=True,
+        ).annotate(in_inbox=Exists(in_inbox)).filter(
+            Q(in_inbox=True)
+            | Q(announcement__user=request.user)
+            | Q(announcement__is_public=True, announcement__status=models.LIVE)
+        )
+        if not len(announcement_files):
+            errors = [
+                'invalid file id'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        return files.serve(announcement_files[0], request.META.get('HTTP_RANGE'))
+
+
+class AnnouncementAcknowledgementViewSet(views.APIView):
+
+    authentication_classes = (SignedTokenAuthentication, authentication.TokenAuthentication)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response("OK- Successful GET Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            500: openapi.Response("Internal Server Error- Error while processing the GET Request Function.")
+        },
+        manual_parameters = [
+            openapi.Parameter(name="id", in_="query", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(name="status", in_="query", type=openapi.TYPE_STRING, enum=["acknowledged", "pending"]),
+            openapi.Parameter(name="cursor", in_="query", type=openapi.TYPE_STRING),
+            openapi.Parameter(name="page_size", in_="query", type=openapi.TYPE_INTEGER),
+        ]
+    )
+    def get(self, request, **kwargs):
+        query_params = self.request.query_params
+        id = query_params.get('id', None)
+        ack_status = query_params.get('status', 'acknowledged')
+
+        if not id or ack_status not in ('acknowledged', 'pending'):
+            errors = [
+                'id is required and status options are acknowledged,pending'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        announcements = models.Announcement.objects.filter(Q(id=int(id)) & Q(user=request.user))
+        if not len(announcements):
+            errors = [
+                'invalid id'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        announcement = announcements[0]
+
+        if ack_status == 'acknowledged':
+            qs = models.AnnouncementAcknowledgement.objects.filter(announcement=announcement)
+        else:
+            acknowledged = models.AnnouncementAcknowledgement.objects.filter(
+                announcement=announcement, user_id=OuterRef('user_id')
+            )
+            qs = models.AnnouncementInbox.objects.filter(announcement=announcement, is_active=True).filter(~Exists(acknowledged))
+
+        try:
+            page, next_cursor, previous_cursor = KeysetPaginator(date_field='created_at').paginate(qs.select_related('user'), query_params)
+        except InvalidCursor:
+            errors = [
+                'invalid cursor'
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        serializer = users_serializers.UserSerializer([row.user for row in page], many=True)
+        return Response({
+            'details': serializer.data,
+            'acknowledged': announcement.acknowledged_count,
+            'total': announcement.recipient_count,
+            'next': next_cursor,
+            'previous': previous_cursor,
+        }, status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        request_body = openapi.Schema(
+            title = "Acknowledge Announcements",
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+            }
+        ),
+        responses={
+            200: openapi.Response("OK- Successful POST Request"),
+            401: openapi.Response("Unauthorized- Authentication credentials were not provided. || Token Missing or Session Expired"),
+            422: openapi.Response("Unprocessable Entity- Make sure that all the required field values are passed"),
+            500: openapi.Response("Internal Server Error- Error while processing the POST Request Function.")
+        }
+    )
+    def post(self, request, **kwargs):
+        ids, error = get_bulk_items(request.data, 'ids')
+        if error:
+            errors = [
+                error
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            ids = {int(i) for i in ids}
+        except (TypeError, ValueError):
+            errors = [
+                "ids format should be like this. [1, 2, 3] where 1, 2 and 3 are announcement ID's"
+            ]
+            return Response({'details': errors}, status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            received = set(models.AnnouncementInbox.objects.filter(
+                user=request.user, is_active=True, announcement_id__in=ids
+            ).values_list('announcement_id', flat=True))
+
+            # Lock the announcements so concurrent acknowledgements of the same rows count exactly once.
+            list(models.Announcement.objects.select_for_update().filter(id__in=received).values_list('id', flat=True))
+
+            acknowledged = set(models.AnnouncementAcknowledgement.objects.filter(
+                user=request.user, announcement_id__in=received
+            ).values_list('announcement_id', flat=True))
+
+            new = received - acknowledged
+            models.AnnouncementAcknowledgement.objects.bulk_create(
+                [models.AnnouncementAcknowledgement(announcement_id=i, user=request.user) for i in new],
+                ignore_conflicts=True,
+            )
+            models.Announcement.objects.filter(id__in=new).update(acknowledged_count=F('acknowledged_count') + 1)
+
+        results = [
+            {"id": id, "errors": None if id in received else ['invalid id']}
+            for id in sorted(ids)
+        ]
+        return Response({'details': results}, status.HTTP_200_OK)